@@ -1,6 +1,6 @@
 """Main abTEM module."""
 
-from abtem import distributions, transfer
+from abtem import distributions, fft, transfer
 from abtem._version import __version__
 from abtem.array import concatenate, from_zarr, stack
 from abtem.atoms import orthogonalize_cell, standardize_cell
@@ -34,6 +34,7 @@ from abtem.waves import PlaneWave, Probe, Waves
 __all__ = [
     "__version__",
     "distributions",
+    "fft",
     "orthogonalize_cell",
     "standardize_cell",
     "ChargeDensityPotential",
@@ -57,6 +57,14 @@ class AntialiasAperture(HasGridMixin, CopyMixin, EqualityMixin):
         self._key = None
         self._array = None
 
+    def _cache_key(self) -> tuple:
+        # the identity of the aperture for process-wide caches of bandlimited arrays
+        return (
+            type(self).__name__,
+            config.get("antialias.cutoff"),
+            config.get("antialias.taper"),
+        )
+
     def get_array(self, x: Waves | TransmissionFunction):
         key = (
             x.gpts,
@@ -131,6 +131,8 @@ class ComputableList(list):
         compute: bool = True,
         overwrite: bool = False,
         progress_bar: Optional[bool] = None,
+        stream: bool = False,
+        resume: bool = False,
         **kwargs: Any,
     ):
         """Write data to a zarr file.
@@ -148,22 +150,43 @@ class ComputableList(list):
         progress_bar : bool
             Display a progress bar in the terminal or notebook during computation. The progress bar is only displayed
             with a local scheduler.
+        stream : bool
+            If true, each chunk is written to the zarr file as soon as it is computed and marked as completed in a
+            manifest stored next to the data, such that the completed part of an interrupted computation is kept on
+            disk. The manifest of the i'th array is a boolean array named "completed{i}" with an item for each chunk.
+        resume : bool
+            If true, an existing zarr file written with `stream=True` is opened and only the chunks that are not marked
+            as completed in its manifest are computed and written. Implies `stream=True`. If the file does not exist,
+            it is created.
         kwargs :
             Keyword arguments passed to `dask.array.to_zarr`.
         """
 
+        stream = stream or resume
+
         computables = []
-        with zarr.open(url, mode="w") as root:
+        with zarr.open(url, mode="a" if resume else "w") as root:
             for i, has_array in enumerate(self):
                 has_array = has_array.ensure_lazy()
 
                 array = has_array.copy_to_device("cpu").array
 
-                computables.append(
-                    array.to_zarr(
-                        url, compute=False, component=f"array{i}", overwrite=overwrite
+                if stream:
+                    computables.extend(
+                        _streaming_zarr_writers(
+                            root, array, url, i, overwrite=overwrite, resume=resume
+                        )
                     )
-                )
+                else:
+                    computables.append(
+                        array.to_zarr(
+                            url,
+                            compute=False,
+                            component=f"array{i}",
+                            overwrite=overwrite,
+                        )
+                    )
+
                 packed_kwargs = has_array._pack_kwargs(
                     has_array._copy_kwargs(exclude=("array",))
                 )
@@ -201,6 +224,97 @@ class ComputableList(list):
         return output
 
 
+def _regular_chunks(chunks: tuple[tuple[int, ...], ...]) -> bool:
+    return all(
+        all(c == dim_chunks[0] for c in dim_chunks[:-1])
+        and dim_chunks[-1] <= dim_chunks[0]
+        for dim_chunks in chunks
+    )
+
+
+def _write_zarr_block(
+    block: np.ndarray,
+    url: str,
+    component: str,
+    manifest_component: str,
+    region: tuple[slice, ...],
+    block_index: tuple[int, ...],
+) -> bool:
+    root = zarr.open(url, mode="r+")
+    root[component][region] = block
+    # the manifest has a zarr chunk for each block, hence concurrent tasks never
+    # write to the same chunk
+    root[manifest_component][block_index] = True
+    return True
+
+
+def _streaming_zarr_writers(
+    root: zarr.Group,
+    array: da.core.Array,
+    url: str,
+    index: int,
+    overwrite: bool = False,
+    resume: bool = False,
+) -> list:
+    if not _regular_chunks(array.chunks):
+        array = array.rechunk(tuple(max(c) for c in array.chunks))
+
+    component = f"array{index}"
+    manifest_component = f"completed{index}"
+    chunks = tuple(c[0] for c in array.chunks)
+
+    if resume and component in root and manifest_component in root:
+        stored = root[component]
+        if (
+            stored.shape != array.shape
+            or stored.chunks != chunks
+            or stored.dtype != array.dtype
+        ):
+            raise ValueError(
+                f"cannot resume writing {component} with shape {array.shape}, chunks "
+                f"{chunks} and dtype {array.dtype}, the stored array has shape "
+                f"{stored.shape}, chunks {stored.chunks} and dtype {stored.dtype}"
+            )
+        completed = root[manifest_component][:]
+    else:
+        root.create_dataset(
+            component,
+            shape=array.shape,
+            chunks=chunks,
+            dtype=array.dtype,
+            overwrite=overwrite or resume,
+        )
+        root.create_dataset(
+            manifest_component,
+            shape=array.numblocks,
+            chunks=(1,) * array.ndim,
+            dtype=bool,
+            fill_value=False,
+            overwrite=overwrite or resume,
+        )
+        completed = np.zeros(array.numblocks, dtype=bool)
+
+    # only the blocks needed by the writers are computed when the graph is culled
+    blocks = array.to_delayed()
+    writers = []
+    for block_index, region in iterate_chunk_ranges(array.chunks):
+        if completed[block_index]:
+            continue
+
+        writers.append(
+            dask.delayed(_write_zarr_block)(
+                blocks[block_index],
+                url=url,
+                component=component,
+                manifest_component=manifest_component,
+                region=region,
+                block_index=block_index,
+            )
+        )
+
+    return writers
+
+
 def _get_progress_bar(
     progress_bar: Optional[bool] = None,
 ) -> Union[ProgressBar, TqdmCallback, nullcontext]:
@@ -1194,7 +1308,13 @@ class ArrayObject(Ensemble, EqualityMixin, CopyMixin, metaclass=ABCMeta):
         return self.copy_to_device(device)
 
     def to_zarr(
-        self, url: str, compute: bool = True, overwrite: bool = False, **kwargs
+        self,
+        url: str,
+        compute: bool = True,
+        overwrite: bool = False,
+        stream: bool = False,
+        resume: bool = False,
+        **kwargs,
     ):
         """Write data to a zarr file.
 
@@ -1208,12 +1328,23 @@ class ArrayObject(Ensemble, EqualityMixin, CopyMixin, metaclass=ABCMeta):
         overwrite : bool
             If given array already exists, overwrite=False will cause an error, where overwrite=True will replace the
             existing data.
+        stream : bool
+            If true, each chunk is written as soon as it is computed and recorded in a completion manifest, see
+            :meth:`ComputableList.to_zarr`.
+        resume : bool
+            If true, only the chunks not recorded as completed in the manifest of an existing zarr file are computed
+            and written. Implies `stream=True`.
         kwargs :
             Keyword arguments passed to `dask.array.to_zarr`.
         """
 
         return ComputableList([self]).to_zarr(
-            url=url, compute=compute, overwrite=overwrite, **kwargs
+            url=url,
+            compute=compute,
+            overwrite=overwrite,
+            stream=stream,
+            resume=resume,
+            **kwargs,
         )
 
     @classmethod
@@ -1393,9 +1524,7 @@ class ArrayObject(Ensemble, EqualityMixin, CopyMixin, metaclass=ABCMeta):
             array_symbols = tuple_range(len(self.shape), len(transform.ensemble_shape))
 
             axes_args = tuple(
-                axis._to_blocks(
-                    (c,),
-                )
+                transform._ensemble_axis_blocks(axis, (c,))
                 for axis, c in zip(self.ensemble_axes_metadata, array_ensemble_chunks)
             )
 
@@ -1410,7 +1539,12 @@ class ArrayObject(Ensemble, EqualityMixin, CopyMixin, metaclass=ABCMeta):
 
             base_shape = transform._out_base_shape(self)[0]
             symbols = tuple_range(num_ensemble_dims + len(base_shape))
-            chunks = chunks[:num_ensemble_dims] + base_shape
+
+            # base axes of the output replacing chunked ensemble axes of the input, such
+            # as the scan axes of an annular detector, keep the chunks declared by the
+            # transform
+            base_chunks = transform._out_base_chunks(self, array_ensemble_chunks)[0]
+            chunks = chunks[:num_ensemble_dims] + base_chunks
             meta = transform._out_meta(self)[0]
 
             with warnings.catch_warnings():
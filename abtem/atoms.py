@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import itertools
 from numbers import Number
 
 import numpy as np
@@ -997,6 +998,47 @@ def cut_cell(
     return new_atoms
 
 
+def _pad_orthogonal_atoms(
+    atoms: Atoms, margins: tuple[float, float, float], reps: list[int]
+) -> Atoms:
+    # the images within the margins are selected with a mask along each axis, instead
+    # of repeating every atom in all directions and cropping with scaled positions,
+    # the images are kept in the order of repeating the atoms
+    lengths = np.diag(atoms.cell)
+
+    shifts, masks = [], []
+    for axis in range(3):
+        axis_shifts = np.arange(-(reps[axis] // 2), reps[axis] // 2 + 1)
+        axis_shifts = axis_shifts * lengths[axis]
+        scaled_margin = margins[axis] / lengths[axis]
+
+        axis_masks = []
+        for shift in axis_shifts:
+            scaled = (atoms.positions[:, axis] + shift) / lengths[axis]
+            axis_masks.append(
+                (scaled >= -scaled_margin - 1e-12) * (scaled < 1 + scaled_margin)
+            )
+
+        shifts.append(axis_shifts)
+        masks.append(axis_masks)
+
+    indices, offsets = [], []
+    for image in itertools.product(*(range(len(shift)) for shift in shifts)):
+        mask = masks[0][image[0]] * masks[1][image[1]] * masks[2][image[2]]
+        image_indices = np.flatnonzero(mask)
+        indices.append(image_indices)
+        offsets.append(
+            np.tile(
+                [shifts[axis][i] for axis, i in enumerate(image)],
+                (len(image_indices), 1),
+            )
+        )
+
+    padded = atoms[np.concatenate(indices)]
+    padded.positions[:] += np.concatenate(offsets)
+    return padded
+
+
 def pad_atoms(
     atoms: Atoms,
     margins: float | tuple[float, float, float],
@@ -1030,15 +1072,18 @@ def pad_atoms(
 
     assert isinstance(margins, tuple)
 
-    atoms = atoms.copy()
-    old_cell = atoms.cell.copy()
-
     axes = [{"x": 0, "y": 1, "z": 2}[direction] for direction in directions]
 
     reps = [1, 1, 1]
     for axis, margin in zip(axes, margins):
         reps[axis] = int(1 + 2 * np.ceil(margin / atoms.cell[axis, axis]))
 
+    if is_cell_orthogonal(atoms):
+        return _pad_orthogonal_atoms(atoms, margins, reps)
+
+    atoms = atoms.copy()
+    old_cell = atoms.cell.copy()
+
     if any([rep > 1 for rep in reps]):
         atoms = atoms * reps
         atoms.positions[:] -= old_cell.sum(axis=0) * [rep // 2 for rep in reps]
@@ -0,0 +1,227 @@
+"""Module for bounded, process-wide caches used to reuse expensive intermediate
+results."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_caches: dict[str, LRUCache] = {}
+
+
+def _nbytes(value: Any) -> int:
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+
+    if hasattr(value, "array"):
+        return _nbytes(value.array)
+
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+
+    return 0
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache bounded by the number of items and,
+    optionally, by the total size of the cached arrays.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        Maximum number of cached items. If None, the number of items is not limited.
+    max_bytes : int, optional
+        Maximum total size of the cached arrays [bytes]. If None, the memory is not
+        limited.
+    name : str, optional
+        If given, the cache is registered under this name and reported by
+        :func:`cache_info`.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = 128,
+        max_bytes: Optional[int] = None,
+        name: Optional[str] = None,
+    ):
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._items: OrderedDict[Hashable, Any] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._nbytes = 0
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+
+        if name is not None:
+            _caches[name] = self
+
+    @property
+    def max_size(self) -> Optional[int]:
+        """Maximum number of cached items."""
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value: Optional[int]):
+        with self._lock:
+            self._max_size = value
+            self._evict()
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        """Maximum total size of the cached arrays [bytes]."""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: Optional[int]):
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    @property
+    def hits(self) -> int:
+        """Number of lookups that found a cached item."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Number of lookups that did not find a cached item."""
+        return self._misses
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the cached arrays [bytes]."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def _evict(self):
+        while self._items and (
+            (self._max_size is not None and len(self._items) > self._max_size)
+            or (self._max_bytes is not None and self._nbytes > self._max_bytes)
+        ):
+            key, _ = self._items.popitem(last=False)
+            self._nbytes -= self._sizes.pop(key)
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """The cached keys and items, from the least to the most recently used, without
+        marking them as used."""
+        with self._lock:
+            return list(self._items.items())
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached item for a key and mark it as recently used.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the item.
+        default : any, optional
+            The value returned if the key is not cached.
+        """
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self._misses += 1
+                return default
+
+            self._items.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def insert(self, key: Hashable, value: Any) -> None:
+        """
+        Cache an item, evicting the least recently used items if the cache exceeds
+        its limits. Items larger than `max_bytes` are not cached.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the item.
+        value : any
+            The item to cache.
+        """
+        nbytes = _nbytes(value)
+
+        if self._max_bytes is not None and nbytes > self._max_bytes:
+            return
+
+        with self._lock:
+            if key in self._items:
+                self._nbytes -= self._sizes[key]
+
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._sizes[key] = nbytes
+            self._nbytes += nbytes
+            self._evict()
+
+    def get_or_insert(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Return the cached item for a key, calculating and caching it if missing.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the item.
+        func : callable
+            Function without arguments calculating the item.
+        """
+        missing = object()
+        value = self.get(key, missing)
+
+        if value is missing:
+            value = func()
+            self.insert(key, value)
+
+        return value
+
+    def clear(self) -> None:
+        """Remove all items and reset the hit and miss counters."""
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def cache_info(self) -> dict[str, Optional[int]]:
+        """Hits, misses, number of items and memory use of the cache."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._items),
+            "max_size": self._max_size,
+            "nbytes": self._nbytes,
+            "max_bytes": self._max_bytes,
+        }
+
+
+def cache_info() -> dict[str, dict[str, Optional[int]]]:
+    """
+    Hits, misses, number of items and memory use of every registered cache, useful for
+    profiling.
+
+    Returns
+    -------
+    info : dict
+        Dictionary mapping the name of each cache to its statistics.
+    """
+    return {name: cache.cache_info() for name, cache in _caches.items()}
+
+
+def clear_caches() -> None:
+    """Clear every registered cache."""
+    for cache in _caches.values():
+        cache.clear()
@@ -1,17 +1,22 @@
 """Module for handling Fourier transforms and convolution in *ab*TEM."""
 
+import atexit
+import os
+import threading
 import warnings
-from typing import Tuple
+from typing import Optional, Sequence, Tuple
 
 import dask.array as da
 import numpy as np
 from threadpoolctl import threadpool_limits  # type: ignore
 
 from abtem.core import config
+from abtem.core.config import PATH as CONFIG_PATH
 from abtem.core.backend import check_cupy_is_installed, get_array_module
+from abtem.core.cache import LRUCache
 from abtem.core.complex import complex_exponential
 from abtem.core.grid import spatial_frequencies
-from abtem.core.utils import get_dtype
+from abtem.core.utils import atomic_write, get_dtype
 
 try:
     import pyfftw  # type: ignore
@@ -71,30 +76,278 @@ def _new_fftw_object(array: np.ndarray, name: str, flags: tuple[str, ...] = ()):
     return fftw_object
 
 
+_wisdom_lock = threading.Lock()
+_wisdom_loaded = False
+_wisdom_unsaved = False
+
+# the wisdom of each precision exported by pyfftw is stored as it is, separated by null
+# bytes which never occur in the wisdom text
+_WISDOM_SEPARATOR = b"\0"
+
+
+def _default_wisdom_path() -> str:
+    return os.path.join(CONFIG_PATH, "fftw_wisdom.dat")
+
+
+def _persist_wisdom() -> bool:
+    return bool(config.get("fftw.persist_wisdom", False))
+
+
+def load_wisdom(path: Optional[str] = None) -> bool:
+    """
+    Import FFTW wisdom stored on disk, such that FFTW plans measured by earlier
+    processes can be reused without planning again.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to the wisdom file. Default is "fftw_wisdom.dat" in the abTEM
+        configuration directory, i.e. "~/.config/abtem" or the directory given by the
+        environment variable "ABTEM_CONFIG".
+
+    Returns
+    -------
+    bool
+        True if any wisdom was imported.
+    """
+    global _wisdom_loaded
+
+    if pyfftw is None:
+        _raise_fft_lib_not_present("pyfftw")
+
+    if path is None:
+        path = _default_wisdom_path()
+
+    with _wisdom_lock:
+        if path == _default_wisdom_path():
+            _wisdom_loaded = True
+
+        try:
+            with open(path, "rb") as f:
+                wisdom = tuple(f.read().split(_WISDOM_SEPARATOR))
+        except FileNotFoundError:
+            return False
+        except OSError:
+            warnings.warn(f"Could not read the FFTW wisdom file {path}.")
+            return False
+
+        if len(wisdom) != len(pyfftw.export_wisdom()):
+            warnings.warn(f"Could not read the FFTW wisdom file {path}.")
+            return False
+
+        return any(pyfftw.import_wisdom(wisdom))
+
+
+def save_wisdom(path: Optional[str] = None):
+    """
+    Export the FFTW wisdom of the current process to disk. The wisdom already stored
+    on disk is imported first, hence wisdom from different processes is merged.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path to the wisdom file. Default is "fftw_wisdom.dat" in the abTEM
+        configuration directory.
+    """
+    global _wisdom_unsaved
+
+    if pyfftw is None:
+        _raise_fft_lib_not_present("pyfftw")
+
+    if path is None:
+        path = _default_wisdom_path()
+
+    load_wisdom(path)
+
+    with _wisdom_lock:
+        with atomic_write(path) as f:
+            f.write(_WISDOM_SEPARATOR.join(pyfftw.export_wisdom()))
+
+        if path == _default_wisdom_path():
+            _wisdom_unsaved = False
+
+
+def _save_unsaved_wisdom():
+    if not (_wisdom_unsaved and _persist_wisdom()):
+        return
+
+    try:
+        save_wisdom()
+    except OSError:
+        warnings.warn("Could not write the FFTW wisdom file.")
+
+
+# the wisdom of new plans is written once when the process exits, rather than after
+# every plan
+atexit.register(_save_unsaved_wisdom)
+
+
+def warmup(
+    shapes: tuple[int, ...] | Sequence[tuple[int, ...]],
+    dtypes: Optional[str | np.dtype | Sequence[str | np.dtype]] = None,
+    threads: Optional[int] = None,
+    save: Optional[bool] = None,
+):
+    """
+    Plan the FFTs for the given array shapes ahead of a simulation, e.g. on a newly
+    started worker. The created wisdom is reused by every later FFT of the same shape
+    and data type and, if `save` is True, stored on disk for other processes.
+
+    Parameters
+    ----------
+    shapes : tuple of int or sequence of tuple of int
+        The shapes of the arrays to plan the 2D FFTs of the last two axes for,
+        including any batch dimensions.
+    dtypes : dtype or sequence of dtype, optional
+        The complex data types to plan the FFTs for. Default is the complex data type
+        given by the configured precision.
+    threads : int, optional
+        The number of threads to plan the FFTs for. Default is the configuration
+        "fftw.threads".
+    save : bool, optional
+        If True, the wisdom is exported to the default wisdom file. Default is given by
+        the configuration "fftw.persist_wisdom".
+    """
+    if pyfftw is None:
+        _raise_fft_lib_not_present("pyfftw")
+
+    if len(shapes) > 0 and isinstance(shapes[0], (int, np.integer)):
+        shapes = (shapes,)
+
+    if dtypes is None:
+        dtypes = (get_dtype(complex=True),)
+    elif isinstance(dtypes, (str, np.dtype, type)):
+        dtypes = (dtypes,)
+
+    if threads is None:
+        threads = config.get("fftw.threads")
+
+    if save is None:
+        save = _persist_wisdom()
+
+    if not _wisdom_loaded and _persist_wisdom():
+        load_wisdom()
+
+    with config.set({"fftw.threads": threads}):
+        for shape in shapes:
+            for dtype in dtypes:
+                array = pyfftw.empty_aligned(tuple(shape), dtype=dtype)
+                for name in ("fft2", "ifft2"):
+                    for overwrite_x in (False, True):
+                        get_fftw_object(array, name, overwrite_x=overwrite_x)
+
+    if save:
+        save_wisdom()
+
+
+def _new_fftw_plan(
+    shape: tuple[int, ...],
+    dtype: np.dtype,
+    name: str,
+    in_place: bool,
+    aligned: bool,
+):
+    input_array = pyfftw.empty_aligned(shape, dtype=dtype)
+
+    if in_place:
+        output_array = input_array
+    else:
+        output_array = pyfftw.empty_aligned(shape, dtype=dtype)
+
+    flags: tuple[str, ...] = (config.get("fftw.planning_effort"),)
+    if not aligned:
+        flags += ("FFTW_UNALIGNED",)
+
+    return pyfftw.FFTW(
+        input_array,
+        output_array,
+        axes=(-2, -1),
+        direction=_fft_name_to_fftw_direction(name),
+        threads=config.get("fftw.threads"),
+        flags=flags,
+        planning_timelimit=config.get("fftw.planning_timelimit"),
+    )
+
+
 class CachedFFTWConvolution:
-    def __init__(self):
-        self._fftw_objects = None
-        self._shape = None
+    """
+    Convolution of the last two axes of an array with a kernel using cached FFTW plans.
 
-    def __call__(self, array: np.ndarray, kernel: np.ndarray, overwrite_x: bool) -> np.ndarray:
-        if array.shape != self._shape:
-            self._fftw_objects = None
+    The plans are cached by the shape, data type, memory alignment and placement of
+    the array as well as by the number of threads and the planning effort, hence
+    alternating batch sizes, such as the final partial chunk of a scan, do not cause
+    repeated planning. The convolution is calculated without intermediate copies: the
+    forward transform writes either into the input array or, if it may not be
+    overwritten, directly into a newly allocated output array.
 
-        if self._fftw_objects is None:
-            fftw_objects = {
-                name: _new_fftw_object(array, name=name) for name in ("ifft2", "fft2")
-            }
-            self._fftw_objects = fftw_objects
+    Parameters
+    ----------
+    max_plans : int, optional
+        Maximum number of cached plans (default is 16).
+    """
+
+    def __init__(self, max_plans: int = 16):
+        self._plans = LRUCache(max_size=max_plans)
+        self._kernel = None
+        self._scaled_kernel = None
+
+    def cache_info(self) -> dict:
+        """Hits, misses and number of cached plans."""
+        return self._plans.cache_info()
+
+    def _get_plan(self, array: np.ndarray, name: str, in_place: bool):
+        aligned = pyfftw.is_byte_aligned(array)
+        key = (
+            name,
+            array.shape,
+            array.dtype.str,
+            in_place,
+            aligned,
+            config.get("fftw.threads"),
+            config.get("fftw.planning_effort"),
+        )
+        return self._plans.get_or_insert(
+            key,
+            lambda: _new_fftw_plan(
+                array.shape, array.dtype, name, in_place=in_place, aligned=aligned
+            ),
+        )
 
-        if not overwrite_x:
-            array = array.copy()
-            self._fftw_objects["fft2"].update_arrays(array, array)
-            self._fftw_objects["ifft2"].update_arrays(array, array)
+    def _get_scaled_kernel(self, kernel: np.ndarray, n: int) -> np.ndarray:
+        # the normalization of the inverse transform is folded into the kernel, the
+        # scaled kernel is reused as long as the same kernel is given
+        if kernel is not self._kernel:
+            self._kernel = kernel
+            self._scaled_kernel = kernel / n
+        return self._scaled_kernel
+
+    def __call__(
+        self, array: np.ndarray, kernel: np.ndarray, overwrite_x: bool
+    ) -> np.ndarray:
+        if (
+            array.dtype not in (np.complex64, np.complex128)
+            or not array.flags.c_contiguous
+            or (overwrite_x and not array.flags.writeable)
+            or np.broadcast_shapes(array.shape, kernel.shape) != array.shape
+        ):
+            return _fft2_convolve(array, kernel, overwrite_x=overwrite_x)
+
+        if overwrite_x:
+            out = array
+        else:
+            out = pyfftw.empty_aligned(array.shape, dtype=array.dtype)
+
+        forward = self._get_plan(array, "fft2", in_place=overwrite_x)
+        backward = self._get_plan(out, "ifft2", in_place=True)
+
+        forward.update_arrays(array, out)
+        forward.execute()
 
-        array = self._fftw_objects["fft2"]()
-        array *= kernel
-        array = self._fftw_objects["ifft2"]()
-        return array
+        out *= self._get_scaled_kernel(kernel, array.shape[-2] * array.shape[-1])
+
+        backward.update_arrays(out, out)
+        backward.execute()
+        return out
 
 
 def get_fftw_object(
@@ -124,6 +377,10 @@ def get_fftw_object(
     pyfftw.FFTW
         FFTW object.
     """
+    global _wisdom_unsaved
+
+    if not _wisdom_loaded and _persist_wisdom():
+        load_wisdom()
 
     direction = _fft_name_to_fftw_direction(name)
 
@@ -151,6 +408,7 @@ def get_fftw_object(
             raise
 
         _new_fftw_object(array, name, flags=flags)
+        _wisdom_unsaved = True
 
         return get_fftw_object(
             array, name, allow_new_wisdom=False, overwrite_x=overwrite_x, axes=axes
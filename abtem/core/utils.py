@@ -3,11 +3,14 @@
 from __future__ import annotations
 
 import copy
+import hashlib
 import inspect
 import itertools
 import os
+import tempfile
 import warnings
-from typing import Any, Optional, Sequence, TypeVar
+from contextlib import contextmanager
+from typing import IO, Any, Hashable, Iterator, Optional, Sequence, TypeVar
 
 import dask.array as da
 import numpy as np
@@ -336,6 +339,51 @@ def get_data_path(file: str) -> str:
     return os.path.join(this_file, "data")
 
 
+def hashed_path(directory: str, key: Hashable, suffix: str = "") -> str:
+    """
+    Path of a file in a directory named by a hash of a key, e.g. for storing derived
+    data between processes.
+
+    Parameters
+    ----------
+    directory : str
+        The directory of the file.
+    key : hashable
+        The key identifying the content of the file, its representation is hashed.
+    suffix : str, optional
+        The suffix of the file name, e.g. ".npz".
+    """
+    name = hashlib.sha1(repr(key).encode()).hexdigest()
+    return os.path.join(directory, f"{name}{suffix}")
+
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[IO[bytes]]:
+    """
+    Open a file for writing in binary mode, such that it is replaced at once when the
+    context exits. The content is written to a temporary file in the same directory and
+    renamed, hence concurrent readers never see a partially written file. The directory
+    is created if missing.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 def get_dtype(complex: bool = False) -> np.dtype:
     """
     Get the numpy dtype from the config precision setting.
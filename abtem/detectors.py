@@ -16,6 +16,7 @@ from abtem.core.backend import get_array_module
 from abtem.core.chunks import Chunks
 from abtem.core.energy import energy2wavelength
 from abtem.core.ensemble import _wrap_with_array
+from abtem.core.fft import fft_crop
 from abtem.core.units import units_type
 from abtem.core.utils import get_dtype
 from abtem.measurements import (
@@ -81,6 +82,79 @@ def validate_detectors(
     return detectors
 
 
+def _crop_diffraction_intensity(
+    waves: Waves,
+    diffraction_patterns: DiffractionPatterns,
+    max_angle: str | float,
+    parity: str,
+    fftshift: bool,
+) -> DiffractionPatterns:
+    array = diffraction_patterns.array
+    xp = get_array_module(array)
+
+    new_gpts = waves._gpts_within_angle(max_angle, parity=parity)
+
+    if array.shape[-2:] != new_gpts:
+        array = fft_crop(array, new_shape=array.shape[:-2] + new_gpts)
+
+    if fftshift:
+        array = xp.fft.fftshift(array, axes=(-1, -2))
+
+    return DiffractionPatterns(
+        array,
+        sampling=diffraction_patterns.sampling,
+        fftshift=fftshift,
+        ensemble_axes_metadata=diffraction_patterns.ensemble_axes_metadata,
+        metadata=diffraction_patterns.metadata,
+    )
+
+
+def detect_multiple(
+    waves: Waves, detectors: list[BaseDetector]
+) -> list[BaseMeasurements | Waves]:
+    """
+    Detect a batch of wave functions with a list of detectors. The diffraction
+    intensity is calculated once and shared by every detector measuring in reciprocal
+    space, instead of each detector running its own Fourier transform.
+
+    Parameters
+    ----------
+    waves : Waves
+        The waves to detect.
+    detectors : list of BaseDetector
+        The detectors used for detecting the waves.
+
+    Returns
+    -------
+    measurements : list of BaseMeasurements or Waves
+        A measurement for each detector.
+    """
+    detectors = validate_detectors(detectors, waves)
+
+    kwargs = [detector._diffraction_patterns_kwargs(waves) for detector in detectors]
+
+    if waves.is_lazy or sum(kwarg is not None for kwarg in kwargs) < 2:
+        return [detector.detect(waves) for detector in detectors]
+
+    intensity = waves.diffraction_patterns(
+        max_angle="full", parity="same", fftshift=False
+    )
+
+    measurements = []
+    for detector, kwarg in zip(detectors, kwargs):
+        if kwarg is None:
+            measurements.append(detector.detect(waves))
+            continue
+
+        diffraction_patterns = _crop_diffraction_intensity(waves, intensity, **kwarg)
+        new_array = detector._calculate_from_diffraction_patterns(
+            waves, diffraction_patterns
+        )
+        measurements.append(detector._pack_single_output(waves, new_array))
+
+    return measurements
+
+
 class BaseDetector(ArrayObjectTransform):
     """
     Base detector class.
@@ -171,6 +245,36 @@ class BaseDetector(ArrayObjectTransform):
         #    raise RuntimeError("Detector must return a measurement.")
         return measurements
 
+    def _diffraction_patterns_kwargs(self, waves: BaseWaves) -> Optional[dict]:
+        """
+        Keyword arguments for `Waves.diffraction_patterns` if the detector measures
+        the diffraction intensity, otherwise None.
+        """
+        return None
+
+    def _calculate_from_diffraction_patterns(
+        self, waves: BaseWaves, diffraction_patterns: DiffractionPatterns
+    ) -> np.ndarray:
+        """
+        Calculate the measurement array from precalculated diffraction patterns. By
+        default, the measurement is calculated from the waves with `detect`, ignoring
+        the diffraction patterns, detectors requesting diffraction patterns should
+        override this.
+
+        Parameters
+        ----------
+        waves : BaseWaves
+            The detected waves.
+        diffraction_patterns : DiffractionPatterns
+            The diffraction patterns of the waves created using the keyword arguments
+            given by `_diffraction_patterns_kwargs`.
+
+        Returns
+        -------
+        measurement : np.ndarray
+        """
+        return self.detect(waves).array
+
     @abstractmethod
     def angular_limits(self, waves: BaseWaves) -> tuple[float, float]:
         """
@@ -291,6 +395,12 @@ class AnnularDetector(BaseDetector):
     def _out_base_shape(self, waves: WavesType) -> tuple[tuple[int, ...]]:
         return (_scan_shape(waves),)
 
+    def _out_base_chunks(
+        self, waves: WavesType, ensemble_chunks: tuple[tuple[int, ...], ...]
+    ) -> tuple[tuple[tuple[int, ...], ...]]:
+        # the scan axes of the waves become the base axes of the measurement
+        return (tuple(ensemble_chunks[i] for i in _scan_axes(waves)),)
+
     def _out_dtype(self, waves: WavesType) -> tuple[np.dtype]:
         return (get_dtype(complex=False),)
 
@@ -312,14 +422,22 @@ class AnnularDetector(BaseDetector):
         -------
         measurement : DiffractionPatterns
         """
+        diffraction_patterns = waves.diffraction_patterns(
+            **self._diffraction_patterns_kwargs(waves)
+        )
+        return self._calculate_from_diffraction_patterns(waves, diffraction_patterns)
+
+    def _diffraction_patterns_kwargs(self, waves: WavesType) -> dict:
+        return {"max_angle": "full", "parity": "same", "fftshift": False}
+
+    def _calculate_from_diffraction_patterns(
+        self, waves: WavesType, diffraction_patterns: DiffractionPatterns
+    ) -> np.ndarray:
         if self.outer is None:
             outer = np.floor(min(waves.cutoff_angles))
         else:
             outer = self.outer
 
-        diffraction_patterns = waves.diffraction_patterns(
-            max_angle="full", parity="same", fftshift=False
-        )
         measurement = diffraction_patterns.integrate_radial(
             inner=self.inner, outer=outer
         )
@@ -518,11 +636,21 @@ class _AbstractRadialDetector(BaseDetector):
         -------
         measurement : PolarMeasurements
         """
-        inner, outer = self.angular_limits(waves)
+        diffraction_patterns = waves.diffraction_patterns(
+            **self._diffraction_patterns_kwargs(waves)
+        )
+        return self._calculate_from_diffraction_patterns(waves, diffraction_patterns)
 
-        measurement = waves.diffraction_patterns(max_angle=outer, parity="same")
+    def _diffraction_patterns_kwargs(self, waves: ArrayObject) -> dict:
+        _, outer = self.angular_limits(waves)
+        return {"max_angle": outer, "parity": "same", "fftshift": True}
 
-        measurement = measurement.polar_binning(
+    def _calculate_from_diffraction_patterns(
+        self, waves: ArrayObject, diffraction_patterns: DiffractionPatterns
+    ) -> np.ndarray:
+        inner, outer = self.angular_limits(waves)
+
+        measurement = diffraction_patterns.polar_binning(
             nbins_radial=self.nbins_radial,
             nbins_azimuthal=self.nbins_azimuthal,
             inner=inner,
@@ -1055,12 +1183,22 @@ class PixelatedDetector(BaseDetector):
 
         if self.reciprocal_space:
             measurements = waves.diffraction_patterns(
-                max_angle=self.max_angle, parity="same"
+                **self._diffraction_patterns_kwargs(waves)
             )
 
         else:
             measurements = waves.intensity()
 
+        return self._calculate_from_diffraction_patterns(waves, measurements)
+
+    def _diffraction_patterns_kwargs(self, waves: ArrayObject) -> Optional[dict]:
+        if not self.reciprocal_space:
+            return None
+        return {"max_angle": self.max_angle, "parity": "same", "fftshift": True}
+
+    def _calculate_from_diffraction_patterns(
+        self, waves: ArrayObject, measurements: Images | DiffractionPatterns
+    ) -> np.ndarray:
         if self._resample:
             assert isinstance(self._resample, (float, tuple))
             measurements = measurements.interpolate(sampling=self._resample)
@@ -0,0 +1,5 @@
+"""Module for planning the fast Fourier transforms ahead of a simulation."""
+
+from abtem.core.fft import load_wisdom, save_wisdom, warmup
+
+__all__ = ["warmup", "load_wisdom", "save_wisdom"]
@@ -1,24 +1,32 @@
 from __future__ import annotations
 
 import contextlib
+import hashlib
 import itertools
 import os
+import warnings
 from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from typing import TYPE_CHECKING
 
 import numpy as np
 from ase import Atom, Atoms, units
 from ase.data import chemical_symbols
+from dask.utils import parse_bytes
 from numba import jit
 from scipy.interpolate import interp1d
 from scipy.special import sph_harm, spherical_jn
 
 from abtem.measurements import Images, RealSpaceLineProfiles
 from abtem.array import ArrayObject
+from abtem.core import config
 from abtem.core.axes import AxisMetadata, OrdinalAxis
 from abtem.core.backend import copy_to_device, get_array_module
+from abtem.core.cache import LRUCache
 from abtem.core.chunks import validate_chunks
 from abtem.core.complex import abs2
+from abtem.core.config import PATH as CONFIG_PATH
 from abtem.core.electron_configurations import electron_configurations
 from abtem.core.energy import (
     Accelerator,
@@ -29,7 +37,7 @@ from abtem.core.energy import (
 )
 from abtem.core.fft import fft2, fft2_convolve, fft_shift_kernel, ifft2
 from abtem.core.grid import Grid, HasGridMixin, polar_spatial_frequencies
-from abtem.core.utils import CopyMixin
+from abtem.core.utils import CopyMixin, atomic_write, hashed_path
 from abtem.measurements import _polar_detector_bins
 
 if TYPE_CHECKING:
@@ -38,6 +46,14 @@ if TYPE_CHECKING:
 azimuthal_number = {"s": 0, "p": 1, "d": 2, "f": 3, "g": 4, "h": 5, "i": 6}
 azimuthal_letter = {value: key for key, value in azimuthal_number.items()}
 
+radial_wavefunctions_cache = LRUCache(max_size=64, name="radial_wavefunctions")
+
+form_factors_cache = LRUCache(
+    max_size=None,
+    max_bytes=parse_bytes(config.get("cache.form-factors", "256 MB")),
+    name="form_factors",
+)
+
 
 def config_str_to_config_tuples(config_str):
     config_tuples = []
@@ -129,6 +145,10 @@ class RadialWavefunction:
     def radial_grid(self):
         return self._radial_grid
 
+    @property
+    def radial_values(self):
+        return self._radial_values
+
     @property
     def n(self):
         return self._n
@@ -137,6 +157,16 @@ class RadialWavefunction:
     def l(self):
         return self._l
 
+    def _key(self):
+        # the radial wave functions are identified by their values, such that form
+        # factors are reused by every transition potential using the same states
+        if not hasattr(self, "_digest"):
+            digest = hashlib.sha1(np.ascontiguousarray(self._radial_grid).tobytes())
+            digest.update(np.ascontiguousarray(self._radial_values).tobytes())
+            self._digest = digest.hexdigest()
+
+        return self._n, self._l, float(self._energy), self._digest
+
     def to_lineprofiles(self, sampling=0.01):
         r = np.arange(0, self._radial_grid[-1], sampling)
         return RealSpaceLineProfiles(self(r), sampling=sampling)
@@ -276,6 +306,103 @@ def calculate_continuum_radial_wavefunction(Z, n, l, lprime, epsilon, xc="PBE"):
     )
 
 
+def _persist_wavefunctions() -> bool:
+    return bool(config.get("inelastic.persist_wavefunctions", False))
+
+
+def _radial_wavefunction_path(key: tuple) -> str:
+    return hashed_path(os.path.join(CONFIG_PATH, "radial_wavefunctions"), key, ".npz")
+
+
+def load_radial_wavefunction(path: str) -> RadialWavefunction:
+    """
+    Load a radial wave function stored on disk.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .npz file of the wave function.
+
+    Returns
+    -------
+    radial_wavefunction : RadialWavefunction
+    """
+    with np.load(path) as data:
+        n = int(data["n"])
+        return RadialWavefunction(
+            n=n if n > 0 else None,
+            l=int(data["l"]),
+            energy=float(data["energy"]),
+            radial_grid=data["radial_grid"],
+            radial_values=data["radial_values"],
+        )
+
+
+def save_radial_wavefunction(wave_function: RadialWavefunction, path: str):
+    """
+    Store a radial wave function on disk.
+
+    Parameters
+    ----------
+    wave_function : RadialWavefunction
+        The wave function to store.
+    path : str
+        Path to the .npz file of the wave function.
+    """
+    with atomic_write(path) as f:
+        np.savez(
+            f,
+            n=0 if wave_function.n is None else wave_function.n,
+            l=wave_function.l,
+            energy=wave_function.energy,
+            radial_grid=wave_function.radial_grid,
+            radial_values=wave_function.radial_values,
+        )
+
+
+def _load_or_calculate_radial_wavefunction(key: tuple, func) -> RadialWavefunction:
+    if not _persist_wavefunctions():
+        return func()
+
+    path = _radial_wavefunction_path(key)
+
+    try:
+        return load_radial_wavefunction(path)
+    except (OSError, KeyError, ValueError):
+        pass
+
+    wave_function = func()
+
+    try:
+        save_radial_wavefunction(wave_function, path)
+    except OSError:
+        warnings.warn("Could not write the radial wave function file.")
+
+    return wave_function
+
+
+def cached_radial_wavefunction(key: tuple, func) -> RadialWavefunction:
+    """
+    Return a radial wave function from the process-wide cache, calculating it if missing. If
+    "inelastic.persist_wavefunctions" is set in the user configuration, the wave functions are also stored in the
+    configuration directory, such that new processes skip solving for them.
+
+    Parameters
+    ----------
+    key : tuple
+        The key identifying the wave function, i.e. the arguments of the solver.
+    func : callable
+        Function without arguments solving for the wave function.
+
+    Returns
+    -------
+    radial_wavefunction : RadialWavefunction
+    """
+    return radial_wavefunctions_cache.get_or_insert(
+        key, lambda: _load_or_calculate_radial_wavefunction(key, func)
+    )
+
+
 class BaseTransitionCollection:
     def __init__(self, Z):
         self._Z = Z
@@ -352,15 +479,39 @@ class SubshellTransitions(BaseTransitionCollection):
         return np.arange(min_new_l, self.l + self.order + 1)
 
     def get_bound_wave_function(self):
-        wave_functions = calculate_bound_radial_wavefunction(
-            Z=self.Z, n=self.n, l=self.l, xc=self.xc
+        wave_functions = cached_radial_wavefunction(
+            ("bound", self.Z, self.n, self.l, self.xc),
+            partial(
+                calculate_bound_radial_wavefunction,
+                Z=self.Z,
+                n=self.n,
+                l=self.l,
+                xc=self.xc,
+            ),
         )
         return wave_functions
 
     def get_excited_wave_functions(self):
         wave_functions = [
-            calculate_continuum_radial_wavefunction(
-                Z=self.Z, n=self.n, l=self.l, lprime=lprime, epsilon=self.epsilon
+            cached_radial_wavefunction(
+                (
+                    "continuum",
+                    self.Z,
+                    self.n,
+                    self.l,
+                    int(lprime),
+                    self.epsilon,
+                    self.xc,
+                ),
+                partial(
+                    calculate_continuum_radial_wavefunction,
+                    Z=self.Z,
+                    n=self.n,
+                    l=self.l,
+                    lprime=lprime,
+                    epsilon=self.epsilon,
+                    xc=self.xc,
+                ),
             )
             for lprime in self.lprimes
         ]
@@ -424,6 +575,117 @@ class SubshellTransitions(BaseTransitionCollection):
         )
 
 
+def _overlap_integral(lprimeprime, bound, excited, k, extent):
+    dk = 1 / max(extent)
+    radial_grid = np.arange(0, np.max(k) * 1.05 + dk, dk)
+    integration_grid = np.linspace(0, bound.radial_grid[-1], 20000)
+
+    values = (
+        bound(integration_grid)
+        * spherical_jn(
+            lprimeprime,
+            2 * np.pi * units.Bohr * radial_grid[:, None] * integration_grid[None],
+        )
+        * excited(integration_grid)
+    )
+
+    integral = np.trapz(values, integration_grid, axis=1) / (
+        units.Bohr * np.sqrt(units.Rydberg)
+    )
+
+    return interp1d(radial_grid, integral)(k)
+
+
+def _form_factor(bound, excited, k, phi, theta, overlap_integrals):
+    from sympy.physics.wigner import wigner_3j
+
+    Hn0 = np.zeros_like(k, dtype=complex)
+    l = bound.l
+    lprime = excited.l
+    ml = bound.ml
+    mlprime = excited.ml
+
+    mask = k <= np.max(k) * 2 / 3
+
+    for lprimeprime in range(abs(l - lprime), abs(l + lprime) + 1):
+        jq = overlap_integrals(lprimeprime)
+
+        for mlprimeprime in range(-lprimeprime, lprimeprime + 1):
+            if ml - mlprime - mlprimeprime != 0:
+                continue
+
+            prefactor = (
+                np.sqrt(4 * np.pi)
+                * ((-1j) ** lprimeprime)
+                * np.sqrt((2 * lprime + 1) * (2 * lprimeprime + 1) * (2 * l + 1))
+                * (-1.0) ** (mlprime + mlprimeprime)
+                * float(wigner_3j(lprime, lprimeprime, l, 0, 0, 0))
+                * float(wigner_3j(lprime, lprimeprime, l, -mlprime, -mlprimeprime, ml))
+            )
+
+            if np.abs(prefactor) < 1e-12:
+                continue
+
+            Ylm = sph_harm(mlprimeprime, lprimeprime, phi, theta)
+            Hn0[mask] += prefactor * (jq * Ylm)[mask]
+
+    return Hn0
+
+
+def _calculate_form_factors(
+    bound: RadialWavefunction,
+    excited: RadialWavefunction,
+    magnetic_numbers: list[tuple[int, int]],
+    energy: float,
+    gpts: tuple[int, int],
+    sampling: tuple[float, float],
+    orbital_filling_factor: bool,
+) -> list[np.ndarray]:
+    # the transitions between a pair of radial wave functions share the energy loss and
+    # the overlap integrals, hence they are calculated together
+    extent = (gpts[0] * sampling[0], gpts[1] * sampling[1])
+
+    k0 = 1 / energy2wavelength(energy)
+    energy_loss = bound.energy - excited.energy
+    kn = 1 / energy2wavelength(energy + energy_loss)
+    kz = k0 - kn
+
+    kxy, phi = polar_spatial_frequencies(gpts, sampling)
+    kxy, phi = kxy.astype(float), phi.astype(float)
+    k = np.sqrt(kxy**2 + kz**2)
+    theta = np.pi - np.arctan(kxy / kz)
+
+    integrals = {}
+
+    def overlap_integrals(lprimeprime):
+        if lprimeprime not in integrals:
+            integrals[lprimeprime] = _overlap_integral(
+                lprimeprime, bound, excited, k, extent
+            )
+        return integrals[lprimeprime]
+
+    scale = relativistic_mass_correction(energy) / (
+        2 * np.pi**2 * kn * k**2 * energy2sigma(energy)
+    )
+    if orbital_filling_factor:
+        scale = scale * np.sqrt(4 * bound.l + 2)
+
+    form_factors = []
+    for ml, mlprime in magnetic_numbers:
+        form_factor = _form_factor(
+            AtomicWaveFunction(bound, ml),
+            AtomicWaveFunction(excited, mlprime),
+            k,
+            phi,
+            theta,
+            overlap_integrals,
+        )
+        form_factor = form_factor * scale / np.prod(sampling)
+        form_factors.append(form_factor.astype(np.complex64))
+
+    return form_factors
+
+
 class BaseTransitionPotential(HasAcceleratorMixin, HasGridMixin, CopyMixin):
     def __init__(
         self, Z, extent, gpts, sampling, energy, double_channel: bool = True, **kwargs
@@ -509,62 +771,6 @@ class TransitionPotential(BaseTransitionPotential):
             for (bound, excited) in self._transitions
         ]
 
-    def _calculate_overlap_integral(self, lprimeprime, bound, excited, k):
-        radial_grid = np.arange(0, np.max(k) * 1.05, 1 / max(self.extent))
-        integration_grid = np.linspace(0, bound.radial_grid[-1], 20000)
-
-        values = (
-            bound(integration_grid)
-            * spherical_jn(
-                lprimeprime,
-                2 * np.pi * units.Bohr * radial_grid[:, None] * integration_grid[None],
-            )
-            * excited(integration_grid)
-        )
-
-        integral = np.trapz(values, integration_grid, axis=1) / (
-            units.Bohr * np.sqrt(units.Rydberg)
-        )
-
-        return interp1d(radial_grid, integral)(k)
-
-    def _calculate_form_factor(self, bound, excited, k, phi, theta):
-        from sympy.physics.wigner import wigner_3j
-
-        Hn0 = np.zeros_like(k, dtype=complex)
-        l = bound.l
-        lprime = excited.l
-        ml = bound.ml
-        mlprime = excited.ml
-
-        mask = k <= np.max(k) * 2 / 3
-
-        for lprimeprime in range(abs(l - lprime), abs(l + lprime) + 1):
-            jq = self._calculate_overlap_integral(lprimeprime, bound, excited, k)
-
-            for mlprimeprime in range(-lprimeprime, lprimeprime + 1):
-                if ml - mlprime - mlprimeprime != 0:
-                    continue
-
-                prefactor = (
-                    np.sqrt(4 * np.pi)
-                    * ((-1j) ** lprimeprime)
-                    * np.sqrt((2 * lprime + 1) * (2 * lprimeprime + 1) * (2 * l + 1))
-                    * (-1.0) ** (mlprime + mlprimeprime)
-                    * float(wigner_3j(lprime, lprimeprime, l, 0, 0, 0))
-                    * float(
-                        wigner_3j(lprime, lprimeprime, l, -mlprime, -mlprimeprime, ml)
-                    )
-                )
-
-                if np.abs(prefactor) < 1e-12:
-                    continue
-
-                Ylm = sph_harm(mlprimeprime, lprimeprime, phi, theta)
-                Hn0[mask] += prefactor * (jq * Ylm)[mask]
-
-        return Hn0
-
     def integrated_intensities(self):
         intensities = self.build().to_images().intensity()
         return intensities.array.sum((-2, -1)) * np.prod(self.sampling)
@@ -587,36 +793,87 @@ class TransitionPotential(BaseTransitionPotential):
 
         return self.__class__(**kwargs)
 
+    def _form_factor_key(self, bound, excited) -> tuple:
+        return (
+            self.Z,
+            bound._radial_wavefunction._key(),
+            int(bound.ml),
+            excited._radial_wavefunction._key(),
+            int(excited.ml),
+            float(self.energy),
+            tuple(int(n) for n in self.gpts),
+            tuple(float(d) for d in self.sampling),
+            self._orbital_filling_factor,
+        )
+
     def build(self):
+        """
+        Build the transition potentials. The form factors are cached process-wide, and the missing form factors are
+        calculated in parallel using the number of processes given by "inelastic.workers" in the user configuration.
+
+        Returns
+        -------
+        transition_potential_array : TransitionPotentialArray
+        """
         self.grid.check_is_defined()
         self.accelerator.check_is_defined()
 
         array = np.zeros((len(self._transitions),) + self.gpts, dtype=np.complex64)
-        k0 = 1 / energy2wavelength(self.energy)
 
+        # the missing transitions are grouped by their pair of radial wave functions
+        keys = {}
+        groups = {}
         for i, (bound, excited) in enumerate(self._transitions):
-            energy_loss = bound.energy - excited.energy
-
-            kn = 1 / energy2wavelength(self.energy + energy_loss)
-
-            kz = k0 - kn
-
-            kxy, phi = polar_spatial_frequencies(self.gpts, self.sampling, dtype=float)
-            k = np.sqrt(kxy**2 + kz**2)
-            theta = np.pi - np.arctan(kxy / kz)
-
-            array[i] = self._calculate_form_factor(bound, excited, k, phi, theta)
-
-            if self._orbital_filling_factor:
-                array[i] *= np.sqrt(4 * bound.l + 2)
+            key = self._form_factor_key(bound, excited)
+            form_factor = form_factors_cache.get(key)
+
+            if form_factor is not None:
+                array[i] = form_factor
+                continue
+
+            keys[i] = key
+            pair = (key[1], key[3])
+            if pair not in groups:
+                groups[pair] = (
+                    bound._radial_wavefunction,
+                    excited._radial_wavefunction,
+                    [],
+                )
+            groups[pair][2].append(i)
 
-            array[i] *= relativistic_mass_correction(self.energy) / (
-                2 * np.pi**2 * kn * k**2 * energy2sigma(self.energy)
+        args = [
+            (
+                bound,
+                excited,
+                [
+                    (self._transitions[i][0].ml, self._transitions[i][1].ml)
+                    for i in indices
+                ],
+                self.energy,
+                self.gpts,
+                self.sampling,
+                self._orbital_filling_factor,
             )
+            for bound, excited, indices in groups.values()
+        ]
+
+        workers = min(config.get("inelastic.workers", 1), len(args))
 
-        array = array / np.prod(self.sampling)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_calculate_form_factors, *arg) for arg in args
+                ]
+                form_factors = [future.result() for future in futures]
+        else:
+            form_factors = [_calculate_form_factors(*arg) for arg in args]
 
-        # array = array.astype(xp.complex64)
+        for (_, _, indices), group_form_factors in zip(
+            groups.values(), form_factors
+        ):
+            for i, form_factor in zip(indices, group_form_factors):
+                form_factors_cache.insert(keys[i], form_factor)
+                array[i] = form_factor
 
         return TransitionPotentialArray(
             self.Z,
@@ -638,39 +895,6 @@ class TransitionPotential(BaseTransitionPotential):
         return self.build().to_images().show(**kwargs)
 
 
-# @njit(fastmath=True)
-def fast_roll(array, shifts):
-    xp = get_array_module(array)
-    output = xp.empty((len(shifts),) + array.shape, dtype=array.dtype)
-
-    for i in range(len(shifts)):
-        if np.all(shifts[i] > 0):
-            output[i, : shifts[i, 0], : shifts[i, 1]] = array[
-                -shifts[i, 0] :, -shifts[i, 1] :
-            ]
-            output[i, : shifts[i, 0], shifts[i, 1] :] = array[
-                -shifts[i, 0] :, : -shifts[i, 1]
-            ]
-            output[i, shifts[i, 0] :, : shifts[i, 1]] = array[
-                : -shifts[i, 0], -shifts[i, 1] :
-            ]
-            output[i, shifts[i, 0] :, shifts[i, 1] :] = array[
-                : -shifts[i, 0], : -shifts[i, 1]
-            ]
-        elif shifts[i, 1] > 0:
-            output[i, :, : shifts[i, 1]] = array[:, -shifts[i, 1] :]
-            output[i, :, shifts[i, 1] :] = array[:, : -shifts[i, 1] :]
-        elif shifts[i, 0] > 0:
-            output[i, : shifts[i, 0], :] = array[-shifts[i, 0] :, :]
-            output[i, shifts[i, 0] :, :] = array[: -shifts[i, 0] :, :]
-        elif (shifts[i, 0] == 0) and (shifts[i, 1] == 0):
-            output[i] = array
-        else:
-            raise RuntimeError()
-
-    return output
-
-
 class TransitionPotentialArray(BaseTransitionPotential, ArrayObject):
     _base_dims = 2
 
@@ -698,6 +922,27 @@ class TransitionPotentialArray(BaseTransitionPotential, ArrayObject):
         self._local_potential = self.local_potential(space="real").sum(0)
         self._threshold = None
 
+    @classmethod
+    def from_array_and_metadata(
+        cls,
+        array: np.ndarray,
+        axes_metadata: list[AxisMetadata],
+        metadata: dict = None,
+    ) -> TransitionPotentialArray:
+        if metadata is None or "Z" not in metadata:
+            raise ValueError(
+                "metadata must contain the atomic number 'Z' to create a "
+                "TransitionPotentialArray"
+            )
+
+        return cls(
+            metadata["Z"],
+            array,
+            energy=metadata.get("energy", None),
+            ensemble_axes_metadata=axes_metadata[:-2],
+            metadata=metadata,
+        )
+
     def set_threshold(self, wave, threshold):
         local_potentials = self.local_potential(space="real")
         local_potential = local_potentials.sum(0)
@@ -816,6 +1061,12 @@ class TransitionPotentialArray(BaseTransitionPotential, ArrayObject):
         sites = np.array(sites, dtype=np.float32)
         return sites
 
+    def _window_indices(self, corners: np.ndarray, window_gpts: tuple[int, int]):
+        xp = get_array_module(corners)
+        rows = (corners[:, 0, None] + xp.arange(window_gpts[0])) % self.gpts[0]
+        cols = (corners[:, 1, None] + xp.arange(window_gpts[1])) % self.gpts[1]
+        return rows[:, :, None], cols[:, None, :]
+
     def filter_sites(self, waves, sites, threshold):
         if hasattr(waves, "build"):
             waves = waves.build(lazy=False)
@@ -826,96 +1077,141 @@ class TransitionPotentialArray(BaseTransitionPotential, ArrayObject):
             xp = get_array_module(waves.array)
             validated_sites = copy_to_device(validated_sites, waves.array)
 
+            window_gpts = self.support_gpts()
+
             rounded_sites = xp.round(
                 (validated_sites / xp.array(self.sampling))
             ).astype(int)
+            corners = rounded_sites - xp.array(window_gpts) // 2
 
+            # the local potential in a window centered on the origin
             local_potential = copy_to_device(self._local_potential, waves.array)
-
-            shifted_local_potential = fast_roll(local_potential, rounded_sites)
-
-            shifted_local_potential = shifted_local_potential.reshape(
-                (len(validated_sites),)
-                + (1,) * (len(waves.shape) - 2)
-                + shifted_local_potential.shape[-2:]
+            rows, cols = self._window_indices(
+                -(xp.array(window_gpts)[None] // 2), window_gpts
             )
+            local_potential = local_potential[rows[0], cols[0]]
 
-            overlaps = shifted_local_potential * abs2(waves.array[None])
+            # the intensity of the waves in the windows centered on the sites
+            rows, cols = self._window_indices(corners, window_gpts)
+            overlaps = local_potential * abs2(waves.array[..., rows, cols])
             overlaps = overlaps.sum(axis=(-2, -1))
 
             mask = overlaps > threshold
 
-            mask = mask.any(tuple(range(1, len(overlaps.shape))))
+            mask = mask.any(tuple(range(len(overlaps.shape) - 1)))
 
             mask = copy_to_device(mask, "cpu")
-            # if np.any(mask):
-            #     print(shifted_local_potential.shape, waves.shape)
-            #
-            #     plt.imshow(
-            #         shifted_local_potential[0, 0, 0]
-            #         / shifted_local_potential[0, 0, 0].max()
-            #         + abs2(waves.array).sum((0,1)) / abs2(waves.array[0, 0]).max()
-            #     )
-            #     plt.title("include")
-            #     # plt.show()
-            #     # plt.imshow(abs2(waves.array[0, 0]))
-            #     plt.show()
-            # else:
-            #     plt.imshow(
-            #         shifted_local_potential[0, 0, 0]
-            #         / shifted_local_potential[0, 0, 0].max()
-            #         + abs2(waves.array).sum((0,1)) / abs2(waves.array[0, 0]).max()
-            #     )
-            #     plt.title("skip")
-            #     # plt.show()
-            #     # plt.imshow(abs2(waves.array[0, 0]))
-            #     plt.show()
-
-            # print(type(mask), type(sites))
 
             sites = sites[mask]
 
         return sites
 
-    def scatter(
-        self, waves: Waves, sites: Atoms | Atom | np.ndarray, threshold: float = None
-    ) -> Waves:
-        self.grid.match(waves)
-        self.accelerator.match(waves)
-        self.grid.check_is_defined()
-        self.accelerator.check_is_defined()
-        xp = get_array_module(waves.array)
+    def support_gpts(self, tolerance: float = 1e-6) -> tuple[int, int]:
+        """
+        The number of grid points of a window centered on a site containing the support of the transition potentials,
+        i.e. all grid points where the summed real-space intensity of the transition potentials exceeds the tolerance
+        relative to its maximum, with a margin of a grid point for sites between grid points.
 
-        sites = self.validate_sites(sites)
-        sites = self.filter_sites(waves, sites, threshold=threshold)
+        Parameters
+        ----------
+        tolerance : float, optional
+            The intensity relative to the maximum below which the transition potentials are negligible.
 
-        if len(sites) == 0:
-            array = waves.array[None][[False]]
+        Returns
+        -------
+        gpts : two int
+            The number of grid points of the window. Limited to the number of grid points of the transition potential.
+        """
+        local_potential = copy_to_device(self._local_potential, "cpu")
+        mask = local_potential >= tolerance * local_potential.max()
 
-        else:
-            self._array = copy_to_device(self.array, waves.array)
-            sites = copy_to_device(sites, waves.array)
+        gpts = ()
+        for axis, n in enumerate(self.gpts):
+            indices = np.nonzero(mask.any(axis=1 - axis))[0]
+            distance = np.minimum(indices, n - indices).max()
+            gpts += (min(2 * int(distance) + 3, n),)
 
-            sites = sites / xp.array(self.sampling, dtype=xp.float32)
+        return gpts
 
-            array = ifft2(
-                self.array[None]
-                * fft_shift_kernel(sites, self.gpts)[:, None]
-                * energy2sigma(self.energy)
-            )
+    def windowed_potentials(
+        self, sites: np.ndarray, window_gpts: tuple[int, int] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The transition potentials in real space, including the interaction parameter, in windows centered on the given
+        sites. The potentials are shifted to the sites within the windows, hence the windows should contain the
+        support of the transition potentials.
 
-            array = array.reshape(
-                (
-                    len(sites),
-                    len(self),
-                )
+        Parameters
+        ----------
+        sites : np.ndarray
+            The xy-positions of the sites [Å], given as an array of shape (N, 2).
+        window_gpts : two int, optional
+            The number of grid points of the windows. Default is given by `support_gpts`.
+
+        Returns
+        -------
+        array : np.ndarray
+            The windowed transition potentials as an array of shape (N, number of transitions, *window_gpts).
+        corners : np.ndarray
+            The grid indices of the lower corners of the windows as an array of shape (N, 2). The windows wrap around
+            the periodic boundaries.
+        """
+        if window_gpts is None:
+            window_gpts = self.support_gpts()
+
+        xp = get_array_module(self.array)
+        sites = xp.asarray(sites, dtype=xp.float32).reshape((-1, 2)) / xp.array(
+            self.sampling, dtype=xp.float32
+        )
+        rounded_sites = xp.round(sites).astype(int)
+        corners = rounded_sites - xp.array(window_gpts) // 2
+
+        # the potentials in a window centered on the origin
+        rows, cols = self._window_indices(
+            -(xp.array(window_gpts)[None] // 2), window_gpts
+        )
+        array = ifft2(self.array)[..., rows[0], cols[0]] * energy2sigma(self.energy)
+
+        # the sites are shifted by less than half a grid point from the window center
+        array = ifft2(
+            fft2(array)[None]
+            * fft_shift_kernel(
+                (sites - rounded_sites).astype(xp.float32), window_gpts
+            )[:, None]
+        )
+        return array, corners
+
+    def _scattered_windows(self, waves: Waves, sites: np.ndarray):
+        # the scattered waves of every site in a window-sized buffer, the waves in the
+        # windows are gathered with the sites first
+        xp = get_array_module(waves.array)
+        self._array = copy_to_device(self.array, waves.array)
+        sites = copy_to_device(sites, waves.array)
+
+        potentials, corners = self.windowed_potentials(sites)
+        rows, cols = self._window_indices(corners, potentials.shape[-2:])
+
+        windows = xp.moveaxis(waves.array[..., rows, cols], -3, 0)
+        windows = (
+            potentials.reshape(
+                potentials.shape[:2]
                 + (1,) * (len(waves.shape) - 2)
-                + array.shape[-2:]
+                + potentials.shape[-2:]
             )
+            * windows[:, None]
+        )
+        return windows, rows, cols
 
-            array = array * waves.array[None, None]
+    def _scattered_waves(
+        self, waves: Waves, windows: np.ndarray, rows: np.ndarray, cols: np.ndarray
+    ) -> Waves:
+        # the scattered waves on the full grid vanish outside the windows
+        xp = get_array_module(windows)
+        array = xp.zeros(windows.shape[:-2] + waves.shape[-2:], dtype=windows.dtype)
+        for i in range(len(windows)):
+            array[i][..., rows[i], cols[i]] = windows[i]
 
-            array = array.reshape((-1,) + array.shape[2:])
+        array = array.reshape((-1,) + array.shape[2:])
 
         d = waves._copy_kwargs(exclude=("array",))
         d["array"] = array
@@ -927,6 +1223,27 @@ class TransitionPotentialArray(BaseTransitionPotential, ArrayObject):
         )
         return waves.__class__(**d)
 
+    def scatter(
+        self, waves: Waves, sites: Atoms | Atom | np.ndarray, threshold: float = None
+    ) -> Waves:
+        self.grid.match(waves)
+        self.accelerator.match(waves)
+        self.grid.check_is_defined()
+        self.accelerator.check_is_defined()
+
+        sites = self.validate_sites(sites)
+        sites = self.filter_sites(waves, sites, threshold=threshold)
+
+        if len(sites) == 0:
+            xp = get_array_module(waves.array)
+            windows = xp.zeros(
+                (0, len(self)) + waves.shape[:-2] + (0, 0), dtype=waves.dtype
+            )
+            return self._scattered_waves(waves, windows, None, None)
+
+        windows, rows, cols = self._scattered_windows(waves, sites)
+        return self._scattered_waves(waves, windows, rows, cols)
+
     def generate_scattered_waves(
         self,
         waves: Waves,
@@ -934,7 +1251,20 @@ class TransitionPotentialArray(BaseTransitionPotential, ArrayObject):
         max_batch: int = "auto",
         threshold=None,
     ):
+        self.grid.match(waves)
+        self.accelerator.match(waves)
+        self.grid.check_is_defined()
+        self.accelerator.check_is_defined()
+
         sites = self.validate_sites(sites)
+        sites = self.filter_sites(waves, sites, threshold=threshold)
+
+        if len(sites) == 0:
+            return
+
+        # the scattered waves of all sites are calculated in windows, only the sites of
+        # a single batch are written to the full grid at once
+        windows, rows, cols = self._scattered_windows(waves, sites)
 
         if isinstance(max_batch, int):
             limit = int(max_batch * np.prod(waves.shape) * len(self))
@@ -954,12 +1284,12 @@ class TransitionPotentialArray(BaseTransitionPotential, ArrayObject):
             if end - start == 0:
                 break
 
-            sites_chunk = sites[start:end]
+            scattered_waves = self._scattered_waves(
+                waves, windows[start:end], rows[start:end], cols[start:end]
+            )
+            yield sites[start:end], scattered_waves
             start = end
 
-            scattered_waves = self.scatter(waves, sites_chunk, threshold=threshold)
-            yield sites_chunk, scattered_waves
-
     def to_images(self):
         array = np.fft.fftshift(ifft2(self.array), axes=(-2, -1))
         return Images(
@@ -970,120 +1300,3 @@ class TransitionPotentialArray(BaseTransitionPotential, ArrayObject):
 
     def show(self, **kwargs):
         self.to_images().show(**kwargs)
-
-
-# def linear_scaling_transition_multislice(
-#     S1: "SMatrix", S2: "SMatrix", scan, transition_potentials, reverse_multislice=False
-# ):
-#     xp = get_array_module(S1._device)
-#     from tqdm.auto import tqdm
-#
-#     positions = scan.get_positions(lazy=False).reshape((-1, 2))
-#
-#     prism_region = (
-#         S1.extent[0] / S1.interpolation[0] / 2,
-#         S1.extent[1] / S1.interpolation[1] / 2,
-#     )
-#
-#     positions = xp.asarray(positions, dtype=np.float32)
-#
-#     wave_vectors = xp.asarray(S1.wave_vectors)
-#     coefficients = complex_exponential(
-#         -2.0 * xp.float32(xp.pi) * positions[:, 0, None] * wave_vectors[None, :, 0]
-#     )
-#     coefficients *= complex_exponential(
-#         -2.0 * xp.float32(np.pi) * positions[:, 1, None] * wave_vectors[None, :, 1]
-#     )
-#     coefficients = coefficients / xp.sqrt(coefficients.shape[1]).astype(np.float32)
-#
-#     potential = S1.potential
-#
-#     sites = validate_sites(potential, sites=None)
-#     chunks = S1.chunks
-#     stream = S1._device == "gpu" and S1._store_on_host
-#
-#     S1 = S1.build(lazy=False, stop=0)
-#
-#     if reverse_multislice:
-#         S2_multislice = S2.build(lazy=False, start=len(potential), stop=0)
-#     else:
-#         S2_multislice = S2
-#
-#     images = np.zeros(len(positions), dtype=np.float32)
-#     for i in tqdm(range(len(potential))):
-#
-#         # if stream:
-#         #     S1 = S1.streaming_multislice(potential, chunks=chunks, start=max(i - 1, 0), stop=i)
-#         #     # if hasattr(S2_multislice, 'build'):
-#         #     S2 = S2.streaming_multislice(potential, chunks=chunks, start=max(i - 1, 0), stop=i)
-#         #     # else:
-#         #     #    S2_multislice = S2_multislice.build(potential, chunks=chunks, start=max(i - 1, 0),
-#         #     #                                                       stop=i)
-#         # else:
-#         S1 = S1.multislice(potential, chunks=chunks, start=max(i - 1, 0), stop=i)
-#         # S2_multislice = S2.build(start=len(potential), stop=i, lazy=False)
-#
-#         if reverse_multislice:
-#             S2_multislice = S2_multislice.multislice(
-#                 potential, chunks=chunks, start=max(i - 1, 0), stop=i, conjugate=True
-#             )
-#         else:
-#             S2_multislice = S2.build(lazy=False, start=len(potential), stop=i)
-#
-#         sites_slice = transition_potentials.validate_sites(sites[i])
-#
-#         for site in sites_slice:
-#             # S2_crop = S2.crop_to_positions(site)
-#             S2_crop = S2_multislice.crop_to_positions(site)
-#             scattered_S1 = S1.crop_to_positions(site)
-#
-#             if stream:
-#                 S2_crop = S2_crop.copy("gpu")
-#                 scattered_S1 = scattered_S1.copy("gpu")
-#
-#             shifted_site = site - np.array(scattered_S1.crop_offset) * np.array(
-#                 scattered_S1.sampling
-#             )
-#             scattered_S1 = transition_potentials.scatter(scattered_S1, shifted_site)
-#
-#             if S1.interpolation == (1, 1):
-#                 cropped_coefficients = coefficients
-#                 mask = None
-#             else:
-#                 mask = xp.ones(len(coefficients), dtype=bool)
-#                 if S1.interpolation[0] > 1:
-#                     mask *= (
-#                         xp.abs(positions[:, 0] - site[0])
-#                         % (S1.extent[0] - prism_region[0])
-#                     ) <= prism_region[0]
-#                 if S1.interpolation[1] > 1:
-#                     mask *= (
-#                         xp.abs(positions[:, 1] - site[1])
-#                         % (S1.extent[1] - prism_region[1])
-#                     ) <= prism_region[1]
-#
-#                 cropped_coefficients = coefficients[mask]
-#
-#             a = S2_crop.array.reshape((1, len(S2), -1))
-#             b = xp.swapaxes(
-#                 scattered_S1.array.reshape((len(scattered_S1.array), len(S1), -1)), 1, 2
-#             )
-#
-#             SHn0 = xp.dot(a, b)
-#             SHn0 = xp.swapaxes(SHn0[0], 0, 1)
-#
-#             new_values = copy_to_device(
-#                 (xp.abs(xp.dot(SHn0, cropped_coefficients.T[None])) ** 2).sum(
-#                     (0, 1, 2)
-#                 ),
-#                 np,
-#             )
-#             if mask is not None:
-#                 images[mask] += new_values
-#             else:
-#                 images += new_values
-#
-#     images *= np.prod(S1.interpolation).astype(np.float32) ** 2
-#
-#     images = Images(images.reshape(scan.gpts), sampling=scan.sampling)
-#     return images
@@ -497,7 +497,7 @@ class FrozenPhonons(BaseFrozenPhonons):
                 raise RuntimeError(f"Directions must be 'x', 'y' or 'z', not {axes}.")
         return axes
 
-    def randomize(self, atoms: Atoms) -> Atoms:
+    def _validated_sigmas_array(self, atoms: Atoms) -> tuple[np.ndarray, bool]:
         sigmas, anisotropic = self._validate_sigmas(atoms)
 
         if isinstance(sigmas, dict):
@@ -505,20 +505,56 @@ class FrozenPhonons(BaseFrozenPhonons):
 
         assert isinstance(sigmas, np.ndarray)
 
-        atoms = atoms.copy()
+        if not anisotropic:
+            sigmas = sigmas[..., None] * np.ones(3, dtype=sigmas.dtype)
+
+        return sigmas, anisotropic
 
-        rng = np.random.default_rng(self.seed[0])
+    def _displacements(
+        self, sigmas: np.ndarray, anisotropic: bool, seed: int
+    ) -> np.ndarray:
+        rng = np.random.default_rng(seed)
 
         if anisotropic:
-            r = rng.normal(size=(len(atoms), 3))
-            for axis in self._axes:
-                atoms.positions[:, axis] += sigmas[:, axis] * r[:, axis]
+            r = rng.normal(size=(len(sigmas), 3))
         else:
-            r = rng.normal(size=(len(atoms), 3)) / np.sqrt(3)
+            r = rng.normal(size=(len(sigmas), 3)) / np.sqrt(3)
+
+        mask = np.zeros(3, dtype=bool)
+        mask[self._axes] = True
+        return np.where(mask, sigmas * r, 0.0)
+
+    def displacements(self, atoms: Optional[Atoms] = None) -> np.ndarray:
+        """
+        The random displacements of the atoms in every frozen phonon configuration, calculated for all atoms and
+        directions at once without copying the atoms.
 
-            for axis in self._axes:
-                atoms.positions[:, axis] += sigmas * r[:, axis]
+        Parameters
+        ----------
+        atoms : Atoms, optional
+            The atoms to displace. Default is the atoms of the frozen phonons.
 
+        Returns
+        -------
+        displacements : np.ndarray
+            The displacements with shape `(num_configs, len(atoms), 3)` [Å].
+        """
+        if atoms is None:
+            atoms = self.atoms
+
+        sigmas, anisotropic = self._validated_sigmas_array(atoms)
+
+        displacements = np.zeros((len(self.seed), len(atoms), 3))
+        for i, seed in enumerate(self.seed):
+            displacements[i] = self._displacements(sigmas, anisotropic, seed)
+
+        return displacements
+
+    def randomize(self, atoms: Atoms) -> Atoms:
+        sigmas, anisotropic = self._validated_sigmas_array(atoms)
+
+        atoms = atoms.copy()
+        atoms.positions[:] += self._displacements(sigmas, anisotropic, self.seed[0])
         return atoms
 
     @classmethod
@@ -563,9 +599,10 @@ class FrozenPhonons(BaseFrozenPhonons):
         atoms_ensemble : AtomsEnsemble
         """
         trajectory = []
-        for _, _, block in self.generate_blocks(1):
-            block = block.item()
-            trajectory.append(block.randomize(block.atoms))
+        for displacements in self.displacements():
+            atoms = self.atoms.copy()
+            atoms.positions[:] += displacements
+            trajectory.append(atoms)
         return AtomsEnsemble(trajectory)
 
 
@@ -2,18 +2,23 @@
 
 from __future__ import annotations
 
+import os
+import warnings
 from abc import ABCMeta, abstractmethod
-from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Sequence
 
 import numpy as np
 from ase import Atoms
 from ase.data import chemical_symbols
+from dask.utils import parse_bytes
 from numba import jit
-from scipy import integrate
 from scipy.interpolate import interp1d
 from scipy.optimize import brentq
-from scipy.special import erf
+from scipy.special import erf, roots_legendre
 
+from abtem.core import config
+from abtem.core.config import PATH as CONFIG_PATH
 from abtem.core.backend import (
     cp,
     cupyx,
@@ -21,13 +26,21 @@ from abtem.core.backend import (
     get_array_module,
     get_ndimage_module,
 )
+from abtem._version import __version__
+from abtem.core.cache import LRUCache
 from abtem.core.fft import fft2, ifft2
 from abtem.core.grid import (
     disk_meshgrid,
     polar_spatial_frequencies,
     spatial_frequencies,
 )
-from abtem.core.utils import CopyMixin, EqualityMixin, get_dtype
+from abtem.core.utils import (
+    CopyMixin,
+    EqualityMixin,
+    atomic_write,
+    get_dtype,
+    hashed_path,
+)
 from abtem.parametrizations import validate_parametrization
 
 if cp is not None:
@@ -39,6 +52,65 @@ else:
 
 if TYPE_CHECKING:
     from abtem.parametrizations import Parametrization
+    from abtem.slicing import BaseSlicedAtoms
+
+projection_integrals_cache = LRUCache(
+    max_size=None,
+    max_bytes=parse_bytes(config.get("cache.projection-integrals", "512 MB")),
+    name="projection_integrals",
+)
+
+
+def _parametrization_key(parametrization: Parametrization, symbol: str) -> tuple:
+    parameters = parametrization.parameters.get(symbol)
+    if parameters is not None:
+        parameters = np.asarray(parameters, dtype=float).tobytes()
+
+    sigma = parametrization.sigmas.get(symbol)
+    return type(parametrization).__name__, parameters, sigma
+
+
+def _projection_integrals_key(
+    kind: str,
+    parametrizations: tuple[Parametrization, ...],
+    symbol: str,
+    gpts: tuple[int, int] | None,
+    sampling: tuple[float, float] | None,
+    device: str,
+    *args,
+) -> tuple:
+    # the scattering factors and integral tables are cached process-wide, hence they are
+    # shared by every integrator and potential using the same parametrizations and grid
+    return (
+        kind,
+        *(_parametrization_key(p, symbol) for p in parametrizations),
+        symbol,
+        None if gpts is None else tuple(int(n) for n in gpts),
+        None if sampling is None else tuple(float(d) for d in sampling),
+        device,
+        np.dtype(get_dtype(complex=False)).str,
+        *args,
+    )
+
+
+def _cached_projection_integrals(
+    kind: str, parametrizations: tuple[Parametrization, ...], *args
+) -> dict:
+    # the cached items of an integrator by symbol, the most recently used grid of a symbol
+    # takes precedence
+    n = len(parametrizations)
+    items = {}
+    for key, value in projection_integrals_cache.items():
+        if key[0] != kind or len(key) != n + 6 + len(args):
+            continue
+
+        symbol, gpts, sampling, device = key[n + 1 : n + 5]
+        if key == _projection_integrals_key(
+            kind, parametrizations, symbol, gpts, sampling, device, *args
+        ):
+            items[symbol] = value
+
+    return items
 
 
 class FieldIntegrator(EqualityMixin, CopyMixin, metaclass=ABCMeta):
@@ -93,6 +165,67 @@ class FieldIntegrator(EqualityMixin, CopyMixin, metaclass=ABCMeta):
             configuration file.
         """
 
+    def integrate_slices(
+        self,
+        sliced_atoms: BaseSlicedAtoms,
+        first_slice: int,
+        last_slice: int,
+        gpts: tuple[int, int],
+        sampling: tuple[float, float],
+        device: str = "cpu",
+    ) -> np.ndarray:
+        """
+        Integrate radial potential for a range of slices of sliced atoms. The slices are integrated one at a time,
+        integrators able to integrate several slices at once may override this method.
+
+        Parameters
+        ----------
+        sliced_atoms : BaseSlicedAtoms
+            The atoms grouped into slices.
+        first_slice : int
+            Index of the first slice to integrate.
+        last_slice : int
+            Index of the last slice to integrate (exclusive).
+        gpts : two int
+            Number of grid points in `x` and `y` describing each slice of the potential.
+        sampling : two float
+            Sampling of the potential in `x` and `y` [1 / Å].
+        device : str, optional
+            The device used for calculating the potential, 'cpu' or 'gpu'. The default is determined by the user
+            configuration file.
+
+        Returns
+        -------
+        array : np.ndarray
+            The integrated slices as an array with shape (last_slice - first_slice, *gpts).
+        """
+        xp = get_array_module(device)
+
+        if last_slice - first_slice == 1:
+            return self.integrate_on_grid(
+                sliced_atoms.get_atoms_in_slices(first_slice),
+                a=sliced_atoms.slice_limits[first_slice][0],
+                b=sliced_atoms.slice_limits[first_slice][1],
+                gpts=gpts,
+                sampling=sampling,
+                device=device,
+            )[None]
+
+        array = xp.zeros(
+            (last_slice - first_slice,) + tuple(gpts), dtype=get_dtype(complex=False)
+        )
+        for i, slice_idx in enumerate(range(first_slice, last_slice)):
+            array[i] = self.integrate_on_grid(
+                sliced_atoms.get_atoms_in_slices(slice_idx),
+                a=sliced_atoms.slice_limits[slice_idx][0],
+                b=sliced_atoms.slice_limits[slice_idx][1],
+                gpts=gpts,
+                sampling=sampling,
+                device=device,
+            )
+
+        return array
+
     @property
     def periodic(self) -> bool:
         """True indicates that the created projection integrators are implemented only for periodic potentials."""
@@ -186,9 +319,6 @@ class GaussianProjectionIntegrals(FieldIntegrator):
 
         super().__init__(periodic=True, finite=True)
 
-        self._gaussians = {}
-        self._corrections = {}
-
     @property
     def cutoff_tolerance(self):
         """The error tolerance used for deciding the radial cutoff distance of the potential [eV / e]."""
@@ -204,59 +334,90 @@ class GaussianProjectionIntegrals(FieldIntegrator):
         return self._correction_parametrization
 
     def cutoff(self, symbol: str) -> float:
-        return optimize_cutoff(
-            self.gaussian_parametrization.potential(symbol),
+        key = _projection_integrals_key(
+            "cutoff",
+            (self.gaussian_parametrization,),
+            symbol,
+            None,
+            None,
+            "cpu",
             self.cutoff_tolerance,
-            a=1e-3,
-            b=1e3,
-        )  # noqa
-
-    def get_gaussians(self, symbol, gpts, sampling):
-        if symbol in self._gaussians:
-            return self._gaussian[(symbol, gpts, sampling)]
-
-        return gaussian_projected_scattering_factors(symbol, gpts, sampling)
+        )
+        return projection_integrals_cache.get_or_insert(
+            key,
+            lambda: optimize_cutoff(
+                self.gaussian_parametrization.potential(symbol),
+                self.cutoff_tolerance,
+                a=1e-3,
+                b=1e3,
+            ),
+        )
 
-    def get_corrections(self, symbol, gpts, sampling):
-        if symbol in self._corrections:
-            return self._corrections[(symbol, gpts, sampling)]
+    def get_gaussians(self, symbol, gpts, sampling, device="cpu"):
+        """Projected scattering factors of the Gaussian terms of an element on a 2D grid."""
 
-        return correction_projected_scattering_factors(symbol, gpts, sampling)
+        def calculate_gaussians():
+            xp = get_array_module(device)
+            gaussians = gaussian_projected_scattering_factors(
+                symbol, gpts, sampling, parametrization=self.gaussian_parametrization
+            )
+            return xp.asarray(gaussians, dtype=get_dtype(complex=False))
 
-    def _integrate_gaussians(self, positions, symbol, a, b, gpts, sampling, device):
-        gaussians = self.get_gaussians(symbol, gpts, sampling)
+        key = _projection_integrals_key(
+            "gaussians", (self.gaussian_parametrization,), symbol, gpts, sampling, device
+        )
+        return projection_integrals_cache.get_or_insert(key, calculate_gaussians)
+
+    def get_corrections(self, symbol, gpts, sampling, device="cpu"):
+        """Difference between the projected scattering factor of the correction parametrization and the Gaussian
+        parametrization of an element on a 2D grid."""
+
+        def calculate_corrections():
+            xp = get_array_module(device)
+            corrections = correction_projected_scattering_factors(
+                symbol,
+                gpts,
+                sampling,
+                short_range=self.correction_parametrization,
+                long_range=self.gaussian_parametrization,
+            )
+            return xp.asarray(corrections, dtype=get_dtype(complex=False))
+
+        key = _projection_integrals_key(
+            "corrections",
+            (self.correction_parametrization, self.gaussian_parametrization),
+            symbol,
+            gpts,
+            sampling,
+            device,
+        )
+        return projection_integrals_cache.get_or_insert(key, calculate_corrections)
 
+    def _superpose_gaussians(self, deltas, positions, symbol, a, b, sampling):
         shifted_a = a - positions[:, 2]
         shifted_b = b - positions[:, 2]
 
-        weights = gaussian_projection_weights(symbol, shifted_a, shifted_b)
+        weights = gaussian_projection_weights(
+            symbol, shifted_a, shifted_b, parametrization=self.gaussian_parametrization
+        )
 
-        xp = get_array_module(device)
+        xp = get_array_module(deltas)
         positions = (positions[:, :2] / sampling).astype(xp.float32)
 
-        array = xp.zeros(gpts, dtype=xp.complex64)
-        for i in range(5):
-            temp = xp.zeros_like(array, dtype=xp.complex64)
-            superpose_deltas(positions, temp, weights=weights[i])
-            array += fft2(temp, overwrite_x=False) * gaussians[i].astype(xp.complex64)
+        for i in range(len(weights)):
+            superpose_deltas(positions, deltas[i], weights=weights[i])
 
-        return array
+        return deltas
 
-    def _integrate_corrections(self, positions, symbol, a, b, gpts, sampling, device):
-        corrections = self.get_corrections(symbol, gpts, sampling)
-
-        xp = get_array_module(device)
+    def _superpose_corrections(self, deltas, positions, a, b, sampling):
+        xp = get_array_module(deltas)
 
         positions = positions[(positions[:, 2] >= a) * (positions[:, 2] < b)]
         positions = (positions[:, :2] / sampling).astype(xp.float32)
 
-        array = xp.zeros(gpts, dtype=xp.complex64)
-
-        superpose_deltas(positions, array)
-
-        corrections = fft2(array, overwrite_x=False) * corrections
+        superpose_deltas(positions, deltas)
 
-        return corrections
+        return deltas
 
     def integrate_on_grid(
         self,
@@ -270,19 +431,43 @@ class GaussianProjectionIntegrals(FieldIntegrator):
     ) -> np.ndarray:
         xp = get_array_module(device)
 
-        array = xp.zeros(gpts, dtype=get_dtype(complex=True))
+        species = []
         for number in np.unique(atoms.numbers):
-            positions = atoms.positions[atoms.numbers == number]
             symbol = chemical_symbols[number]
-
-            array += self._integrate_gaussians(
-                positions, symbol, a, b, gpts, sampling, device
+            gaussians = self.get_gaussians(symbol, gpts, sampling, device)
+            corrections = self.get_corrections(symbol, gpts, sampling, device)
+            species.append(
+                (atoms.positions[atoms.numbers == number], symbol, gaussians, corrections)
             )
-            array += self._integrate_corrections(
-                positions, symbol, a, b, gpts, sampling, device
+
+        if not species:
+            return xp.zeros(gpts, dtype=get_dtype(complex=False))
+
+        num_stacked = max(len(gaussians) + 1 for _, _, gaussians, _ in species)
+
+        # the delta functions of the Gaussian terms and the correction of a species are
+        # stacked in a scratch buffer reused for every species, such that they are
+        # transformed by a single batched fft without holding every species at once
+        scratch = xp.empty((num_stacked,) + tuple(gpts), dtype=get_dtype(complex=True))
+        array = xp.zeros(gpts, dtype=get_dtype(complex=True))
+
+        for positions, symbol, gaussians, corrections in species:
+            num_terms = len(gaussians)
+            deltas = scratch[: num_terms + 1]
+            deltas[:] = 0.0
+
+            self._superpose_gaussians(
+                deltas[:num_terms], positions, symbol, a, b, sampling
             )
+            self._superpose_corrections(deltas[num_terms], positions, a, b, sampling)
+
+            deltas = fft2(deltas, overwrite_x=True)
+            deltas[:num_terms] *= gaussians
+            deltas[num_terms] *= corrections
+            array += deltas.sum(0)
 
-        return ifft2(array / sinc(gpts, sampling, device)).real
+        array /= sinc(gpts, sampling, device)
+        return ifft2(array, overwrite_x=True).real
 
 
 def sinc(
@@ -348,6 +533,13 @@ def superpose_deltas(
 
     positions = xp.array(positions)
 
+    if device_name_from_array_module(xp) == "cpu":
+        if weights is None:
+            weights = np.ones(len(positions), dtype=get_dtype(complex=False))
+
+        _superpose_deltas_cpu(array, positions, weights, round_positions)
+        return array
+
     if round_positions:
         rounded = xp.round(positions).astype(xp.int32)
         i, j = rounded[:, 0][None] % shape[0], rounded[:, 1][None] % shape[1]
@@ -367,9 +559,7 @@ def superpose_deltas(
     if weights is not None:
         v = v * weights[None]
 
-    if device_name_from_array_module(xp) == "cpu":
-        xp.add.at(array, (i, j), v)
-    elif device_name_from_array_module(xp) == "gpu":
+    if device_name_from_array_module(xp) == "gpu":
         cupyx.scatter_add(array, (i, j), v)
     else:
         raise RuntimeError()
@@ -377,6 +567,75 @@ def superpose_deltas(
     return array
 
 
+_MIN_DELTAS_PER_THREAD = 16384
+
+
+@jit(nopython=True, nogil=True, fastmath=True)
+def _add_deltas(
+    array: np.ndarray,
+    positions: np.ndarray,
+    weights: np.ndarray,
+    round_positions: bool,
+    start: int,
+    stop: int,
+):
+    n, m = array.shape
+    for k in range(start, stop):
+        if round_positions:
+            i = int(np.round(positions[k, 0])) % n
+            j = int(np.round(positions[k, 1])) % m
+            array[i, j] += weights[k]
+            continue
+
+        row = np.floor(positions[k, 0])
+        col = np.floor(positions[k, 1])
+        x = positions[k, 0] - row
+        y = positions[k, 1] - col
+        i = int(row) % n
+        j = int(col) % m
+        i1 = (i + 1) % n
+        j1 = (j + 1) % m
+        array[i, j] += (1 - x) * (1 - y) * weights[k]
+        array[i1, j] += x * (1 - y) * weights[k]
+        array[i, j1] += (1 - x) * y * weights[k]
+        array[i1, j1] += x * y * weights[k]
+
+
+def _superpose_deltas_cpu(
+    array: np.ndarray,
+    positions: np.ndarray,
+    weights: np.ndarray,
+    round_positions: bool,
+):
+    # the deltas are split into chunks of at least _MIN_DELTAS_PER_THREAD deltas, added
+    # by the threads of "integrals.threads"; the first chunk is added to the array, the
+    # others to thread-local buffers summed into the array afterwards
+    num_positions = len(positions)
+    num_chunks = min(
+        config.get("integrals.threads"),
+        max(1, num_positions // _MIN_DELTAS_PER_THREAD),
+    )
+
+    if num_chunks <= 1:
+        _add_deltas(array, positions, weights, round_positions, 0, num_positions)
+        return array
+
+    buffers = np.zeros((num_chunks - 1,) + array.shape, dtype=array.dtype)
+    chunk_size = -(-num_positions // num_chunks)
+
+    def add_chunk(i):
+        start = i * chunk_size
+        stop = min(start + chunk_size, num_positions)
+        target = array if i == 0 else buffers[i - 1]
+        _add_deltas(target, positions, weights, round_positions, start, stop)
+
+    with ThreadPoolExecutor(max_workers=num_chunks) as executor:
+        list(executor.map(add_chunk, range(num_chunks)))
+
+    array += buffers.sum(axis=0)
+    return array
+
+
 class ScatteringFactorProjectionIntegrals(FieldIntegrator):
     """
     A FieldIntegrator calculating infinite projections of radial potential parametrizations. The hybrid real and
@@ -394,7 +653,6 @@ class ScatteringFactorProjectionIntegrals(FieldIntegrator):
 
     def __init__(self, parametrization: str | Parametrization = "lobato"):
         self._parametrization = validate_parametrization(parametrization)
-        self._scattering_factors = {}
         super().__init__(periodic=True, finite=False)
 
     @property
@@ -428,20 +686,19 @@ class ScatteringFactorProjectionIntegrals(FieldIntegrator):
         return f
 
     def get_scattering_factor(self, symbol, gpts, sampling, device):
-        try:
-            scattering_factor = self.scattering_factors[symbol]
-        except KeyError:
-            scattering_factor = self._calculate_scattering_factor(
-                symbol, gpts, sampling, device
-            )
-            self._scattering_factors[symbol] = scattering_factor
-
-        return scattering_factor
+        """Projected scattering factor of an element on a 2D grid."""
+        key = _projection_integrals_key(
+            "scattering_factor", (self.parametrization,), symbol, gpts, sampling, device
+        )
+        return projection_integrals_cache.get_or_insert(
+            key,
+            lambda: self._calculate_scattering_factor(symbol, gpts, sampling, device),
+        )
 
     @property
     def scattering_factors(self) -> dict[str, np.ndarray]:
-        """Projected scattering factor array on a 2D grid."""
-        return self._scattering_factors
+        """Projected scattering factor arrays on a 2D grid of the cached elements."""
+        return _cached_projection_integrals("scattering_factor", (self.parametrization,))
 
     def integrate_on_grid(
         self,
@@ -483,6 +740,65 @@ class ScatteringFactorProjectionIntegrals(FieldIntegrator):
 
         return array
 
+    def integrate_slices(
+        self,
+        sliced_atoms: BaseSlicedAtoms,
+        first_slice: int,
+        last_slice: int,
+        gpts: tuple[int, int],
+        sampling: tuple[float, float],
+        device: str = "cpu",
+    ) -> np.ndarray:
+        # the deltas of each species in all the slices containing the species are
+        # transformed by a single batched fft, the species are summed in reciprocal space
+        # and all the slices containing atoms are transformed back by a single batched
+        # inverse fft
+        xp = get_array_module(device)
+
+        array = xp.zeros(
+            (last_slice - first_slice,) + tuple(gpts), dtype=get_dtype(complex=False)
+        )
+
+        atoms_in_slices = {}
+        for i, slice_idx in enumerate(range(first_slice, last_slice)):
+            atoms = sliced_atoms.get_atoms_in_slices(slice_idx)
+            if len(atoms):
+                atoms_in_slices[i] = atoms
+
+        if not atoms_in_slices:
+            return array
+
+        occupied = list(atoms_in_slices.keys())
+        reciprocal = xp.zeros((len(occupied),) + tuple(gpts), dtype=get_dtype(complex=True))
+
+        for number in np.unique(sliced_atoms.atoms.numbers):
+            positions = {}
+            for j, atoms in enumerate(atoms_in_slices.values()):
+                in_slice = atoms.positions[atoms.numbers == number]
+                if len(in_slice):
+                    positions[j] = (in_slice[:, :2] / sampling).astype(
+                        get_dtype(complex=False)
+                    )
+
+            if not positions:
+                continue
+
+            deltas = xp.zeros(
+                (len(positions),) + tuple(gpts), dtype=get_dtype(complex=True)
+            )
+            for k, species_positions in enumerate(positions.values()):
+                superpose_deltas(species_positions, deltas[k])
+
+            deltas = fft2(deltas, overwrite_x=True)
+            deltas *= self.get_scattering_factor(
+                chemical_symbols[number], gpts, sampling, device
+            )
+            reciprocal[list(positions.keys())] += deltas
+
+        reciprocal /= sinc(gpts, sampling, device)
+        array[occupied] = ifft2(reciprocal, overwrite_x=True).real
+        return array
+
 
 @jit(nopython=True, nogil=True)
 def interpolate_radial_functions(
@@ -544,6 +860,11 @@ class ProjectionIntegralTable:
         self._limits = limits
         self._values = values
 
+    @property
+    def nbytes(self) -> int:
+        """Total size of the arrays of the table [bytes]."""
+        return self._radial_gpts.nbytes + self._limits.nbytes + self._values.nbytes
+
     @property
     def radial_gpts(self) -> np.ndarray:
         return self._radial_gpts
@@ -563,6 +884,56 @@ class ProjectionIntegralTable:
         return f(b) - f(a)
 
 
+def _persist_integral_tables() -> bool:
+    return bool(config.get("integrals.persist_tables", False))
+
+
+def _integral_table_path(key: tuple) -> str:
+    # the tables are stored per version of abTEM, such that tables built by another
+    # version are never loaded
+    directory = os.path.join(CONFIG_PATH, "integral_tables", __version__)
+    return hashed_path(directory, key, ".npz")
+
+
+def load_integral_table(path: str) -> ProjectionIntegralTable:
+    """
+    Load a projection integral table stored on disk.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .npz file of the table.
+
+    Returns
+    -------
+    projection_integral_table : ProjectionIntegralTable
+    """
+    with np.load(path) as data:
+        return ProjectionIntegralTable(
+            data["radial_gpts"], data["limits"], data["values"]
+        )
+
+
+def save_integral_table(table: ProjectionIntegralTable, path: str):
+    """
+    Store a projection integral table on disk.
+
+    Parameters
+    ----------
+    table : ProjectionIntegralTable
+        The table to store.
+    path : str
+        Path to the .npz file of the table.
+    """
+    with atomic_write(path) as f:
+        np.savez(
+            f,
+            radial_gpts=table.radial_gpts,
+            limits=table.limits,
+            values=table.values,
+        )
+
+
 def optimize_cutoff(func: callable, tolerance: float, a: float, b: float) -> float:
     """
     Calculate the point where a function becomes lower than a given tolerance within a given bracketing interval.
@@ -613,7 +984,7 @@ class QuadratureProjectionIntegrals(FieldIntegrator):
     integration_step : float, optional
         The step size between integration limits used for calculating the integral table. Default is 0.02.
     quad_order : int, optional
-        Order of quadrature integration passed to scipy.integrate.fixed_quad. Default is 8.
+        Order of the Gauss-Legendre quadrature rule, as used by scipy.integrate.fixed_quad. Default is 8.
     """
 
     def __init__(
@@ -631,7 +1002,6 @@ class QuadratureProjectionIntegrals(FieldIntegrator):
         self._cutoff_tolerance = cutoff_tolerance
         self._inner_cutoff_factor = inner_cutoff_factor
         self._integration_step = integration_step
-        self._tables = {}
 
         super().__init__(periodic=False, finite=True)
 
@@ -646,8 +1016,17 @@ class QuadratureProjectionIntegrals(FieldIntegrator):
         return self._quad_order
 
     @property
-    def tables(self):
-        return self._tables
+    def tables(self) -> dict[str, ProjectionIntegralTable]:
+        """Projection integral tables of the cached elements."""
+        return _cached_projection_integrals(
+            "integral_table",
+            (self.parametrization,),
+            self._cutoff_tolerance,
+            self._inner_cutoff_factor,
+            self._taper,
+            self._integration_step,
+            self._quad_order,
+        )
 
     @property
     def cutoff_tolerance(self) -> float:
@@ -660,8 +1039,23 @@ class QuadratureProjectionIntegrals(FieldIntegrator):
         return self._integration_step
 
     def cutoff(self, symbol: str) -> float:
-        return optimize_cutoff(
-            self.parametrization.potential(symbol), self.cutoff_tolerance, a=1e-3, b=1e3
+        key = _projection_integrals_key(
+            "cutoff",
+            (self.parametrization,),
+            symbol,
+            None,
+            None,
+            "cpu",
+            self.cutoff_tolerance,
+        )
+        return projection_integrals_cache.get_or_insert(
+            key,
+            lambda: optimize_cutoff(
+                self.parametrization.potential(symbol),
+                self.cutoff_tolerance,
+                a=1e-3,
+                b=1e3,
+            ),
         )
 
     @staticmethod
@@ -716,45 +1110,144 @@ class QuadratureProjectionIntegrals(FieldIntegrator):
         )
         # * np.exp(-(radial_gpts[:, None] ** 2) / 10000)
 
-        table = np.zeros((len(limits) - 1, len(radial_gpts)))
-        table[0, :] = integrate.fixed_quad(
-            projection, -limits[0] * 2, limits[0], n=self._quad_order
-        )[0]
-
-        for j, (a, b) in enumerate(zip(limits[1:-1], limits[2:])):
-            table[j + 1] = (
-                table[j] + integrate.fixed_quad(projection, a, b, n=self._quad_order)[0]
+        # the first interval extends from twice the cutoff to the first limit, the
+        # integrals over all the intervals are evaluated with the same Gauss-Legendre
+        # rule as integrate.fixed_quad and accumulated along the projection direction
+        a = np.concatenate(([-limits[0] * 2], limits[1:-1]))
+        b = np.concatenate(([limits[0]], limits[2:]))
+        x, w = roots_legendre(self._quad_order)
+
+        # the limits are symmetric around zero and the integrand is even, hence only
+        # the intervals below zero and the last interval are evaluated and the remaining
+        # intervals are their mirror images
+        half = (len(limits) - 1) // 2
+        evaluated = np.concatenate((np.arange(half), [len(a) - 1]))
+
+        # the intervals are evaluated in blocks to bound the memory of the evaluation
+        block_size = max(2**22 // (len(radial_gpts) * self._quad_order), 1)
+
+        integrals = np.zeros((len(limits) - 1, len(radial_gpts)))
+        for start in range(0, len(evaluated), block_size):
+            indices = evaluated[start : start + block_size]
+            block_a, block_b = a[indices, None], b[indices, None]
+            z = (block_b - block_a) * (x + 1) / 2.0 + block_a
+
+            values = projection(z.ravel()).reshape((len(radial_gpts),) + z.shape)
+            integrals[indices] = (
+                (block_b - block_a) / 2.0 * np.sum(w * values, axis=-1).T
             )
 
+        integrals[half:-1] = integrals[half - 1 : 0 : -1]
+
+        table = np.cumsum(integrals, axis=0)
+
         table = table * self._taper_values(radial_gpts, cutoff, self._taper)[None]
 
-        self._tables[symbol] = ProjectionIntegralTable(radial_gpts, limits[1:], table)
+        return ProjectionIntegralTable(radial_gpts, limits[1:], table)
+
+    def _integral_table_key(self, symbol: str, sampling: tuple[float, float]):
+        return _projection_integrals_key(
+            "integral_table",
+            (self.parametrization,),
+            symbol,
+            None,
+            sampling,
+            "cpu",
+            self._cutoff_tolerance,
+            self._inner_cutoff_factor,
+            self._taper,
+            self._integration_step,
+            self._quad_order,
+        )
+
+    def _load_or_calculate_integral_table(
+        self, symbol: str, sampling: tuple[float, float]
+    ) -> ProjectionIntegralTable:
+        if not _persist_integral_tables():
+            return self._calculate_integral_table(symbol, sampling)
+
+        path = _integral_table_path(self._integral_table_key(symbol, sampling))
+
+        try:
+            return load_integral_table(path)
+        except (OSError, KeyError, ValueError):
+            pass
 
-        return self._tables[symbol]
+        table = self._calculate_integral_table(symbol, sampling)
+
+        try:
+            save_integral_table(table, path)
+        except OSError:
+            warnings.warn("Could not write the projection integral table file.")
+
+        return table
+
+    def get_integral_tables(
+        self, symbols: Sequence[str], sampling: tuple[float, float]
+    ) -> dict[str, ProjectionIntegralTable]:
+        """
+        Build tables of projection integrals of the radial atomic potential for several elements. The missing tables
+        are built in parallel using the number of threads given by "integrals.threads" in the user configuration.
+
+        Parameters
+        ----------
+        symbols : sequence of str
+            Chemical symbols to build the integral tables.
+        sampling : two float
+            Sampling of the potential in `x` and `y` [1 / Å].
+
+        Returns
+        -------
+        projection_integral_tables : dict
+            Mapping from chemical symbols to ProjectionIntegralTable.
+        """
+        missing = object()
+        keys = {symbol: self._integral_table_key(symbol, sampling) for symbol in symbols}
+        tables = {
+            symbol: projection_integrals_cache.get(key, missing)
+            for symbol, key in keys.items()
+        }
+        missing_symbols = [symbol for symbol in keys if tables[symbol] is missing]
+
+        if not missing_symbols:
+            return tables
+
+        threads = min(config.get("integrals.threads"), len(missing_symbols))
+
+        def calculate(symbol):
+            return self._load_or_calculate_integral_table(symbol, sampling)
+
+        if threads > 1:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                new_tables = list(executor.map(calculate, missing_symbols))
+        else:
+            new_tables = [calculate(symbol) for symbol in missing_symbols]
+
+        for symbol, table in zip(missing_symbols, new_tables):
+            projection_integrals_cache.insert(keys[symbol], table)
+            tables[symbol] = table
+
+        return tables
 
     def get_integral_table(self, symbol, sampling):
         """
-        Build table of projection integrals of the radial atomic potential.
+        Build table of projection integrals of the radial atomic potential. The tables are cached process-wide,
+        such that each table is built only once for a given parametrization, integration settings and sampling.
 
         Parameters
         ----------
         symbol : str
             Chemical symbol to build the integral table.
-        inner_limit : float, optional
-            Smallest radius from the core at which to calculate the projection integral [Å].
+        sampling : two float
+            Sampling of the potential in `x` and `y` [1 / Å]. The smallest radius from the core at which the
+            projection integrals are calculated is derived from the sampling.
 
         Returns
         -------
         projection_integral_table :
             ProjectionIntegralTable
         """
-        try:
-            scattering_factor = self.tables[symbol]
-        except KeyError:
-            scattering_factor = self._calculate_integral_table(symbol, sampling)
-            self._tables[symbol] = scattering_factor
-
-        return scattering_factor
+        return self.get_integral_tables((symbol,), sampling)[symbol]
 
     def integrate_on_grid(
         self,
@@ -768,8 +1261,13 @@ class QuadratureProjectionIntegrals(FieldIntegrator):
         xp = get_array_module(device)
 
         array = xp.zeros(gpts, dtype=get_dtype(complex=False))
+
+        tables = self.get_integral_tables(
+            [chemical_symbols[number] for number in np.unique(atoms.numbers)], sampling
+        )
+
         for number in np.unique(atoms.numbers):
-            table = self.get_integral_table(chemical_symbols[number], sampling)
+            table = tables[chemical_symbols[number]]
 
             positions = atoms.positions[atoms.numbers == number]
 
@@ -37,7 +37,14 @@ from abtem.core.axes import (
     ScaleAxis,
     ScanAxis,
 )
-from abtem.core.backend import asnumpy, cp, get_array_module, get_ndimage_module
+from abtem.core.backend import (
+    asnumpy,
+    cp,
+    device_name_from_array_module,
+    get_array_module,
+    get_ndimage_module,
+)
+from abtem.core.cache import LRUCache
 from abtem.core.complex import abs2
 from abtem.core.energy import energy2wavelength
 from abtem.core.fft import fft_crop, fft_interpolate
@@ -210,6 +217,24 @@ def _scan_extent(measurement):
     return extent
 
 
+detector_geometry_cache = LRUCache(
+    max_size=config.get("cache.detector-geometry", 64), name="detector_geometry"
+)
+
+
+def _detector_geometry_key(kind: str, gpts, sampling, xp, **kwargs) -> tuple:
+    return (
+        kind,
+        tuple(gpts),
+        tuple(float(d) for d in sampling),
+        *(
+            (name, tuple(value) if isinstance(value, (list, tuple)) else value)
+            for name, value in kwargs.items()
+        ),
+        device_name_from_array_module(xp),
+    )
+
+
 def _annular_detector_mask(
     gpts: tuple[int, int],
     sampling: tuple[float, float],
@@ -2958,21 +2983,40 @@ class DiffractionPatterns(_BaseMeasurement2D):
     ):
         xp = get_array_module(array)
 
-        indices = _polar_detector_bins(
-            gpts=array.shape[-2:],
-            sampling=sampling,
+        def _calculate_bin_indices():
+            indices = _polar_detector_bins(
+                gpts=array.shape[-2:],
+                sampling=sampling,
+                inner=inner,
+                outer=outer,
+                nbins_radial=nbins_radial,
+                nbins_azimuthal=nbins_azimuthal,
+                fftshift=fftshift,
+                rotation=rotation,
+                offset=offset,
+                return_indices=True,
+            )
+
+            separators = xp.concatenate(
+                (xp.array([0]), xp.cumsum(xp.array([len(i) for i in indices])))
+            )
+            return xp.asarray(np.concatenate(indices)), separators
+
+        key = _detector_geometry_key(
+            "polar",
+            array.shape[-2:],
+            sampling,
+            xp,
             inner=inner,
             outer=outer,
             nbins_radial=nbins_radial,
             nbins_azimuthal=nbins_azimuthal,
-            fftshift=fftshift,
             rotation=rotation,
             offset=offset,
-            return_indices=True,
+            fftshift=fftshift,
         )
-
-        separators = xp.concatenate(
-            (xp.array([0]), xp.cumsum(xp.array([len(i) for i in indices])))
+        indices, separators = detector_geometry_cache.get_or_insert(
+            key, _calculate_bin_indices
         )
 
         new_shape = array.shape[:-2] + (nbins_radial, nbins_azimuthal)
@@ -2982,12 +3026,12 @@ class DiffractionPatterns(_BaseMeasurement2D):
                 -1,
                 array.shape[-2] * array.shape[-1],
             )
-        )[..., np.concatenate(indices)]
+        )[..., indices]
 
         result = xp.zeros(
             (
                 array.shape[0],
-                len(indices),
+                len(separators) - 1,
             ),
             dtype=xp.float32,
         )
@@ -3132,14 +3176,27 @@ class DiffractionPatterns(_BaseMeasurement2D):
     def _integrate_fourier_space(array, sampling, inner, outer, fftshift, offset):
         xp = get_array_module(array)
 
-        bins = _annular_detector_mask(
-            gpts=array.shape[-2:],
-            sampling=sampling,
+        key = _detector_geometry_key(
+            "annular",
+            array.shape[-2:],
+            sampling,
+            xp,
             inner=inner,
             outer=outer,
-            fftshift=fftshift,
             offset=offset,
-            xp=xp,
+            fftshift=fftshift,
+        )
+        bins = detector_geometry_cache.get_or_insert(
+            key,
+            lambda: _annular_detector_mask(
+                gpts=array.shape[-2:],
+                sampling=sampling,
+                inner=inner,
+                outer=outer,
+                fftshift=fftshift,
+                offset=offset,
+                xp=xp,
+            ),
         )
 
         return xp.sum(array * bins, axis=(-2, -1))
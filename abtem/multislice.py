@@ -3,26 +3,45 @@
 from __future__ import annotations
 
 import copy
+import dataclasses
+import os
+import shutil
+import tempfile
+import threading
 from bisect import bisect_left
 from functools import partial
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
+import dask.array as da
+import numba as nb
 import numpy as np
 from ase import Atoms
+from dask.utils import parse_bytes
 
 from abtem.antialias import AntialiasAperture, antialias_aperture
 from abtem.core import config
-from abtem.core.axes import AxisMetadata
-from abtem.core.backend import get_array_module
-from abtem.core.chunks import validate_chunks
+from abtem.core.axes import AxisMetadata, PositionsAxis, ScanAxis
+from abtem.core.backend import asnumpy, copy_to_device, get_array_module
+from abtem.core.cache import LRUCache
+from abtem.core.chunks import iterate_chunk_ranges, validate_chunks
 from abtem.core.complex import complex_exponential
 from abtem.core.diagnostics import TqdmWrapper
 from abtem.core.energy import energy2wavelength
 from abtem.core.ensemble import _wrap_with_array, unpack_blockwise_args
-from abtem.core.fft import CachedFFTWConvolution, fft2_convolve
+from abtem.core.fft import (
+    CachedFFTWConvolution,
+    _raise_fft_lib_not_present,
+    fft2_convolve,
+    pyfftw,
+)
 from abtem.core.grid import spatial_frequencies
 from abtem.core.utils import expand_dims_to_broadcast
-from abtem.detectors import BaseDetector, WavesDetector, validate_detectors
+from abtem.detectors import (
+    BaseDetector,
+    WavesDetector,
+    detect_multiple,
+    validate_detectors,
+)
 from abtem.finite_difference import LaplaceOperator
 from abtem.finite_difference import multislice_step as realspace_multislice_step
 from abtem.inelastic.core_loss import BaseTransitionPotential
@@ -34,6 +53,7 @@ from abtem.potentials.iam import (
     TransmissionFunction,
     validate_potential,
 )
+from abtem.prism.utils import batch_crop_2d, minimum_crop, wrapped_crop_2d
 from abtem.slicing import SliceIndexedAtoms
 from abtem.tilt import _get_tilt_axes
 from abtem.transform import ArrayObjectTransform
@@ -222,6 +242,280 @@ class FresnelPropagator:
         return waves
 
 
+class SliceCache:
+    """
+    Memory-bounded cache of the bandlimited transmission functions of the slices of a
+    single potential configuration. Repeated passes through the same slices, such as
+    the inelastic branches of a double-channel multislice simulation, reuse the cached
+    transmission functions instead of recalculating the potential slices.
+
+    Slices calculated after the memory budget is exhausted are either recalculated on
+    every request or, if `spill_to_disk` is True, written to a temporary directory and
+    read back as memory-mapped arrays.
+
+    Parameters
+    ----------
+    potential : BasePotential
+        A potential without ensemble axes, i.e. a single frozen phonon configuration.
+    energy : float
+        Electron energy [eV].
+    antialias_aperture : AntialiasAperture, optional
+        The antialias aperture used for bandlimiting the transmission functions.
+    max_bytes : int or str, optional
+        The in-memory budget of the cache given in bytes or as a string such as
+        "1 GB". Default is given by the configuration "cache.transmission-functions".
+    spill_to_disk : bool, optional
+        If True, transmission functions that do not fit in memory are stored on disk
+        (default is False).
+    device : str, optional
+        The device of the returned transmission functions. Default is the device of
+        the potential.
+    """
+
+    def __init__(
+        self,
+        potential: BasePotential,
+        energy: float,
+        antialias_aperture: Optional[AntialiasAperture] = None,
+        max_bytes: Optional[int | str] = None,
+        spill_to_disk: bool = False,
+        device: Optional[str] = None,
+    ):
+        if max_bytes is None:
+            max_bytes = config.get("cache.transmission-functions")
+
+        if isinstance(max_bytes, str):
+            max_bytes = parse_bytes(max_bytes)
+
+        if antialias_aperture is None:
+            antialias_aperture = AntialiasAperture()
+
+        if device is None:
+            device = potential.device
+
+        self._potential = potential
+        self._energy = energy
+        self._antialias_aperture = antialias_aperture
+        self._max_bytes = max_bytes
+        self._spill_to_disk = spill_to_disk
+        self._device = device
+        self._in_memory: dict[int, TransmissionFunction] = {}
+        self._on_disk: dict[int, str] = {}
+        self._directory: Optional[str] = None
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def potential(self) -> BasePotential:
+        """The potential of the cached transmission functions."""
+        return self._potential
+
+    @property
+    def energy(self) -> float:
+        """Electron energy [eV]."""
+        return self._energy
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the transmission functions cached in memory [bytes]."""
+        return self._nbytes
+
+    def cache_info(self) -> dict[str, int]:
+        """Hits, misses and the number of slices cached in memory and on disk."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "in_memory": len(self._in_memory),
+            "on_disk": len(self._on_disk),
+            "nbytes": self._nbytes,
+        }
+
+    def _calculate(
+        self, index: int, potential_slice: Optional[PotentialArray] = None
+    ) -> TransmissionFunction:
+        if potential_slice is None:
+            potential_slice = next(
+                self._potential.generate_slices(first_slice=index, last_slice=index + 1)
+            )
+
+        if potential_slice.device != self._device:
+            potential_slice = potential_slice.copy_to_device(self._device)
+
+        if isinstance(potential_slice, TransmissionFunction):
+            return potential_slice
+
+        transmission_function = potential_slice.transmission_function(self._energy)
+        return self._antialias_aperture.bandlimit(transmission_function, in_place=False)
+
+    def _store(self, index: int, transmission_function: TransmissionFunction):
+        nbytes = transmission_function.array.nbytes
+
+        with self._lock:
+            # a shared cache may be filled by several threads at once
+            if index in self._in_memory or index in self._on_disk:
+                return
+
+            if self._nbytes + nbytes <= self._max_bytes:
+                self._in_memory[index] = transmission_function
+                self._nbytes += nbytes
+
+            elif self._spill_to_disk:
+                if self._directory is None:
+                    self._directory = tempfile.mkdtemp(prefix="abtem-slices-")
+
+                path = os.path.join(self._directory, f"{index}.npy")
+                np.save(path, asnumpy(transmission_function.array))
+                self._on_disk[index] = path
+
+    def _load(self, index: int) -> TransmissionFunction:
+        array = np.load(self._on_disk[index], mmap_mode="r")
+        return TransmissionFunction(
+            copy_to_device(array, self._device),
+            slice_thickness=self._potential.slice_thickness[index : index + 1],
+            extent=self._potential.extent,
+            energy=self._energy,
+        )
+
+    def get(
+        self, index: int, potential_slice: Optional[PotentialArray] = None
+    ) -> TransmissionFunction:
+        """
+        Get the bandlimited transmission function of a slice, calculating and caching
+        it if it is not already cached.
+
+        Parameters
+        ----------
+        index : int
+            Index of the slice.
+        potential_slice : PotentialArray, optional
+            The potential slice, if already calculated. If not given, it is generated
+            from the potential when required.
+
+        Returns
+        -------
+        transmission_function : TransmissionFunction
+        """
+        if index in self._in_memory:
+            self._hits += 1
+            return self._in_memory[index]
+
+        if index in self._on_disk:
+            self._hits += 1
+            return self._load(index)
+
+        self._misses += 1
+        transmission_function = self._calculate(index, potential_slice)
+        self._store(index, transmission_function)
+        return transmission_function
+
+    def generate_slices(
+        self, first_slice: int = 0, last_slice: Optional[int] = None
+    ) -> Iterator[TransmissionFunction]:
+        """
+        Generate the bandlimited transmission functions of the slices.
+
+        Parameters
+        ----------
+        first_slice : int, optional
+            Index of the first generated slice.
+        last_slice : int, optional
+            Index of the last generated slice.
+
+        Yields
+        ------
+        transmission_function : TransmissionFunction
+        """
+        if last_slice is None:
+            last_slice = self._potential.num_slices
+
+        for index in range(first_slice, last_slice):
+            yield self.get(index)
+
+    @classmethod
+    def shared(
+        cls,
+        potential: BasePotential,
+        energy: float,
+        antialias_aperture: Optional[AntialiasAperture] = None,
+        max_bytes: Optional[int | str] = None,
+    ) -> SliceCache:
+        """
+        The slice cache of a potential configuration shared by every call in the process.
+
+        Every chunk of a lazy scan computed by the same worker thereby reuses the transmission functions of a given
+        potential configuration, energy and antialias aperture. The shared caches are kept in a least-recently-used
+        registry whose total memory, accounted whenever a cache is looked up, is bounded by the configuration
+        "cache.transmission-functions".
+
+        Parameters
+        ----------
+        potential : BasePotential
+            A potential without ensemble axes, i.e. a single frozen phonon configuration.
+        energy : float
+            Electron energy [eV].
+        antialias_aperture : AntialiasAperture, optional
+            The antialias aperture used for bandlimiting the transmission functions.
+        max_bytes : int or str, optional
+            The in-memory budget of a cache created by this call, it is capped by the budget of the registry. The
+            budget of an existing cache is not changed. Default is given by the configuration
+            "cache.transmission-functions".
+
+        Returns
+        -------
+        slice_cache : SliceCache
+        """
+        if antialias_aperture is None:
+            antialias_aperture = AntialiasAperture()
+
+        key = (potential._cache_key(), energy, antialias_aperture._cache_key())
+
+        cache = _shared_slice_caches.get(key)
+
+        if cache is None:
+            if max_bytes is None:
+                max_bytes = config.get("cache.transmission-functions")
+
+            if isinstance(max_bytes, str):
+                max_bytes = parse_bytes(max_bytes)
+
+            if _shared_slice_caches.max_bytes is not None:
+                max_bytes = min(max_bytes, _shared_slice_caches.max_bytes)
+
+            cache = cls(
+                potential,
+                energy,
+                antialias_aperture=antialias_aperture,
+                max_bytes=max_bytes,
+            )
+
+        # (re)inserting updates the memory accounted for the cache
+        _shared_slice_caches.insert(key, cache)
+        return cache
+
+    def clear(self):
+        """Remove all cached transmission functions, including those on disk."""
+        self._in_memory = {}
+        self._on_disk = {}
+        self._nbytes = 0
+
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+    def __del__(self):
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+
+
+_shared_slice_caches = LRUCache(
+    max_size=None,
+    max_bytes=parse_bytes(config.get("cache.transmission-functions")),
+    name="transmission_functions",
+)
+
+
 def allocate_measurement(
     waves: BaseWaves,
     detector: BaseDetector,
@@ -395,6 +689,268 @@ def conventional_multislice_step(
     return waves
 
 
+@nb.jit(nopython=True, nogil=True, parallel=True, fastmath=True)
+def _multiply_in_place(array, factor, conjugate):
+    # the factor is either a single array broadcast over the batch or one array for
+    # each item of the batch
+    for i in nb.prange(array.shape[0]):
+        k = i % factor.shape[0]
+        for j in range(array.shape[1]):
+            for l in range(array.shape[2]):
+                if conjugate:
+                    array[i, j, l] *= factor[k, j, l].conjugate()
+                else:
+                    array[i, j, l] *= factor[k, j, l]
+
+
+class FusedMultisliceStep:
+    """
+    CPU multislice step operating in place on a single wave function buffer.
+
+    The transmission function is multiplied into the buffer that is the input of an
+    in-place FFTW forward transform and the Fresnel propagator, with the normalization
+    of the inverse transform folded in, is multiplied between the forward and the
+    inverse transform. The elementwise products are parallel numba kernels, hence a
+    step makes two passes over the wave functions besides the transforms and creates
+    no temporary arrays.
+
+    Parameters
+    ----------
+    antialias_aperture : AntialiasAperture
+        The antialias aperture used for bandlimiting the transmission functions.
+    conjugate : bool, optional
+        If True, use the complex conjugate of the transmission function (default is False).
+    transpose : bool, optional
+        If True, reverse the order of propagation and transmission (default is False).
+    """
+
+    def __init__(
+        self,
+        antialias_aperture: AntialiasAperture,
+        conjugate: bool = False,
+        transpose: bool = False,
+    ):
+        if pyfftw is None:
+            _raise_fft_lib_not_present("pyfftw")
+
+        self._antialias_aperture = antialias_aperture
+        self._conjugate = conjugate
+        self._transpose = transpose
+        self._propagator = FresnelPropagator()
+        self._convolution = CachedFFTWConvolution()
+        self._kernel = None
+        self._kernel_stack = None
+
+    def _get_kernel_stack(self, kernel: np.ndarray, shape: tuple[int, ...]):
+        if kernel is not self._kernel:
+            scaled_kernel = kernel / (shape[-2] * shape[-1])
+            if scaled_kernel.ndim > 2:
+                scaled_kernel = np.broadcast_to(scaled_kernel, shape)
+
+            self._kernel = kernel
+            self._kernel_stack = np.ascontiguousarray(
+                scaled_kernel.reshape((-1,) + shape[-2:])
+            )
+        return self._kernel_stack
+
+    def __call__(
+        self, waves: Waves, potential_slice: PotentialArray | TransmissionFunction
+    ) -> Waves:
+        if waves.device != "cpu":
+            raise RuntimeError("The fused multislice method is only available on cpu.")
+
+        if isinstance(potential_slice, TransmissionFunction):
+            transmission_function = potential_slice
+        else:
+            transmission_function = potential_slice.transmission_function(
+                energy=waves.energy
+            )
+            transmission_function = self._antialias_aperture.bandlimit(
+                transmission_function, in_place=False
+            )
+
+        thickness = transmission_function.slice_thickness[0]
+
+        if self._conjugate:
+            thickness = -thickness
+
+        array = waves._array
+        if not pyfftw.is_byte_aligned(array) or not array.flags.c_contiguous:
+            array = pyfftw.byte_align(np.ascontiguousarray(array))
+
+        stack = array.reshape((-1,) + array.shape[-2:])
+        transmission = transmission_function.array[:1]
+
+        kernel = self._propagator.get_array(waves, thickness)
+        kernel = self._get_kernel_stack(kernel, array.shape)
+
+        forward = self._convolution._get_plan(stack, "fft2", in_place=True)
+        backward = self._convolution._get_plan(stack, "ifft2", in_place=True)
+        forward.update_arrays(stack, stack)
+        backward.update_arrays(stack, stack)
+
+        if not self._transpose:
+            _multiply_in_place(stack, transmission, self._conjugate)
+
+        forward.execute()
+        _multiply_in_place(stack, kernel, False)
+        backward.execute()
+
+        if self._transpose:
+            _multiply_in_place(stack, transmission, self._conjugate)
+
+        waves._array = array
+        return waves
+
+
+def _scan_positions(waves: Waves) -> np.ndarray:
+    ensemble_axes_metadata = waves.ensemble_axes_metadata
+    num_ensemble_axes = len(ensemble_axes_metadata)
+
+    if num_ensemble_axes and isinstance(ensemble_axes_metadata[-1], PositionsAxis):
+        return np.array(ensemble_axes_metadata[-1].values, dtype=float).reshape(
+            (-1, 2)
+        )
+
+    if (
+        num_ensemble_axes > 1
+        and isinstance(ensemble_axes_metadata[-2], ScanAxis)
+        and isinstance(ensemble_axes_metadata[-1], ScanAxis)
+    ):
+        x, y = (
+            axis.coordinates(n)
+            for axis, n in zip(ensemble_axes_metadata[-2:], waves.ensemble_shape[-2:])
+        )
+        return np.stack(np.meshgrid(x, y, indexing="ij"), axis=-1)
+
+    raise ValueError(
+        "windowed multislice requires wave functions with the scan positions as their "
+        "last ensemble axes, i.e. probes built with a GridScan or a CustomScan"
+    )
+
+
+def _validate_window_gpts(
+    window_gpts: int | tuple[int, int], gpts: tuple[int, int]
+) -> tuple[int, int]:
+    if isinstance(window_gpts, int):
+        window_gpts = (window_gpts, window_gpts)
+
+    window_gpts = (int(window_gpts[0]), int(window_gpts[1]))
+
+    if window_gpts[0] > gpts[0] or window_gpts[1] > gpts[1]:
+        raise ValueError(
+            f"window gpts {window_gpts} exceeds the gpts of the potential {gpts}"
+        )
+
+    return window_gpts
+
+
+class _ProbeWindows:
+    def __init__(
+        self, waves: Waves, window_gpts: int | tuple[int, int], gpts: tuple[int, int]
+    ):
+        self._window_gpts = _validate_window_gpts(window_gpts, gpts)
+
+        if waves.gpts != self._window_gpts:
+            raise ValueError(
+                f"windowed multislice requires wave functions built on the windows, "
+                f"got gpts {waves.gpts} for windows of gpts {self._window_gpts}"
+            )
+
+        positions = _scan_positions(waves)
+        pixel_positions = positions / np.array(waves.sampling)
+        self._positions_shape = positions.shape[:-1]
+
+        self._crop_corner, self._size, self._corners = minimum_crop(
+            pixel_positions, self._window_gpts
+        )
+
+    @property
+    def window_gpts(self) -> tuple[int, int]:
+        return self._window_gpts
+
+    def crop(self, array: np.ndarray) -> np.ndarray:
+        xp = get_array_module(array)
+
+        array = wrapped_crop_2d(array, self._crop_corner, self._size)
+
+        if len(array.shape) == 2:
+            array = xp.broadcast_to(array, self._positions_shape + array.shape)
+
+        return batch_crop_2d(array, self._corners, self._window_gpts)
+
+
+def windowed_multislice_step(
+    waves: Waves,
+    potential_slice: PotentialArray | TransmissionFunction,
+    windows: _ProbeWindows,
+    propagator: FresnelPropagator,
+    antialias_aperture: AntialiasAperture,
+    conjugate: bool = False,
+    transpose: bool = False,
+) -> Waves:
+    """
+    Calculate one step of the multislice algorithm for a batch of probe wave functions, each cropped to a periodic
+    window around its scan position, through a potential slice cropped to the same windows.
+
+    Parameters
+    ----------
+    waves : Waves
+        A batch of probe wave functions cropped to their windows.
+    potential_slice : PotentialArray or TransmissionFunction
+        A potential slice covering the full potential.
+    windows : _ProbeWindows
+        The windows around the scan positions.
+    propagator : FresnelPropagator
+        A Fresnel propagator matching the cropped wave functions.
+    antialias_aperture : AntialiasAperture
+        An antialias aperture used for bandlimiting the transmission functions on the windows.
+    conjugate : bool, optional
+        If True, use the conjugate of the transmission function (default is False).
+    transpose : bool, optional
+        If True, reverse the order of propagation and transmission (default is False).
+
+    Returns
+    -------
+    forward_stepped_waves : Waves
+        Wave functions propagated and transmitted through the potential slice.
+    """
+    if waves.device != potential_slice.device:
+        potential_slice = potential_slice.copy_to_device(device=waves.device)
+
+    if isinstance(potential_slice, TransmissionFunction):
+        transmission = windows.crop(potential_slice.array[0])
+    else:
+        # the potential slice is cropped before the transmission functions are
+        # calculated and bandlimited on the windows, such that the cost of a step scales
+        # with the windows instead of the full potential
+        transmission = PotentialArray._transmission_function(
+            windows.crop(potential_slice.array[0]), energy=waves.energy
+        )
+        transmission = fft2_convolve(
+            transmission, antialias_aperture.get_array(waves), overwrite_x=True
+        )
+
+    xp = get_array_module(waves.device)
+
+    if conjugate:
+        transmission = xp.conjugate(transmission)
+
+    thickness = potential_slice.slice_thickness[0]
+
+    if conjugate:
+        thickness = -thickness
+
+    if transpose:
+        waves = propagator.propagate(waves, thickness=thickness, in_place=True)
+        waves._array *= transmission
+    else:
+        waves._array *= transmission
+        waves = propagator.propagate(waves, thickness=thickness, in_place=True)
+
+    return waves
+
+
 def _update_measurements(
     waves: Waves,
     detectors: list[BaseDetector],
@@ -407,9 +963,9 @@ def _update_measurements(
 
     assert len(detectors) == len(measurements)
 
-    for i, detector in enumerate(detectors):
-        new_measurement = detector.detect(waves)
+    new_measurements = detect_multiple(waves, detectors)
 
+    for i, new_measurement in enumerate(new_measurements):
         if additive:
             measurements[i].array[measurement_index] += new_measurement.array
         else:
@@ -438,6 +994,94 @@ def _validate_potential_ensemble_indices(
     return measurement_indices
 
 
+def _validate_streamed_ensemble(potential: BasePotential):
+    for axis in potential.ensemble_axes_metadata:
+        if not getattr(axis, "_ensemble_mean", False):
+            raise ValueError(
+                "streaming the ensemble reduction requires that every ensemble axis of "
+                f"the potential is averaged, {axis.__class__.__name__} is not"
+            )
+
+
+class _StreamingEnsembleMean:
+    """
+    Running mean and variance of the measurements of a sequence of potential configurations, updated with Welford's
+    algorithm, such that the memory is independent of the number of configurations.
+    """
+
+    def __init__(self):
+        self._num_samples = 0
+        self._means = None
+        self._squared_deviations = None
+
+    @property
+    def num_samples(self) -> int:
+        """The number of accumulated configurations."""
+        return self._num_samples
+
+    def update(self, measurements: list[BaseMeasurements | Waves]):
+        """Add the measurements of a new configuration to the running mean and variance."""
+        self._num_samples += 1
+
+        if self._means is None:
+            self._means = [measurement.copy() for measurement in measurements]
+            self._squared_deviations = [
+                get_array_module(measurement.array).zeros(
+                    measurement.shape, dtype=measurement.array.real.dtype
+                )
+                for measurement in measurements
+            ]
+            return
+
+        for mean, squared_deviations, measurement in zip(
+            self._means, self._squared_deviations, measurements
+        ):
+            xp = get_array_module(measurement.array)
+            delta = measurement.array - mean.array
+            mean.array[...] += delta / self._num_samples
+            squared_deviations += (
+                xp.conjugate(delta) * (measurement.array - mean.array)
+            ).real
+
+    def means(self) -> list[BaseMeasurements | Waves]:
+        """The mean of the measurements over the accumulated configurations."""
+        return self._means
+
+    def variances(self) -> list[BaseMeasurements]:
+        """
+        The variance of the mean of the measurements, i.e. the squared standard error. The variance is zero if only
+        a single configuration was accumulated.
+        """
+        normalization = max(self._num_samples * (self._num_samples - 1), 1)
+
+        variances = []
+        for mean, squared_deviations in zip(self._means, self._squared_deviations):
+            variance = mean.copy()
+            variance.array[...] = squared_deviations / normalization
+            variances.append(variance)
+
+        return variances
+
+    def relative_standard_error(self) -> float:
+        """
+        The largest standard error of the mean relative to the mean of any of the measurements, measured as the ratio
+        of their 2-norms. Infinite until at least two configurations are accumulated.
+        """
+        if self._num_samples < 2:
+            return np.inf
+
+        normalization = self._num_samples * (self._num_samples - 1)
+
+        errors = []
+        for mean, squared_deviations in zip(self._means, self._squared_deviations):
+            xp = get_array_module(mean.array)
+            norm = float(xp.sqrt(xp.sum(xp.abs(mean.array) ** 2)))
+            error = float(xp.sqrt(xp.sum(squared_deviations) / normalization))
+            errors.append(error / norm if norm > 0.0 else 0.0)
+
+        return max(errors)
+
+
 def _generate_potential_configurations(potential):
     for potential_index, _, potential_configuration in potential.generate_blocks():
         potential_configuration = potential_configuration.item()
@@ -458,6 +1102,11 @@ def multislice_and_detect(
     transpose: bool = False,
     pbar: bool = False,
     method: str = "conventional",
+    slice_cache: bool | int | str = False,
+    window_gpts: Optional[int | tuple[int, int]] = None,
+    stream_ensemble: bool = False,
+    precision: Optional[float] = None,
+    return_variance: bool = False,
     **kwargs,
 ) -> list[BaseMeasurements | Waves] | BaseMeasurements | Waves:
     """
@@ -477,6 +1126,43 @@ def multislice_and_detect(
         If True, use the complex conjugate of the transmission function (default is False).
     transpose : bool, optional
         If True, reverse the order of propagation and transmission (default is False).
+    method : {'conventional', 'fft', 'fused', 'realspace'}, optional
+        The multislice algorithm. 'conventional' and 'fft' use the FFT-based Fresnel
+        propagator, 'fused' is the same algorithm calculated in place on cpu with numba
+        and FFTW (see :class:`.FusedMultisliceStep`) and 'realspace' uses the
+        real-space finite difference propagator (default is 'conventional').
+    slice_cache : bool or int or str, optional
+        If given, the transmission functions of each potential configuration are stored
+        in a :class:`.SliceCache` shared by every call in the process (see
+        :meth:`.SliceCache.shared`) and reused by later calls with the same potential,
+        energy and antialias aperture, e.g. by the other chunks of a lazy scan computed
+        on the same worker. An integer or a string such as "2 GB" sets the memory budget
+        of the cache, if True the budget is given by the configuration
+        "cache.transmission-functions" (default is False).
+    window_gpts : int or two int, optional
+        If given, the wave functions are probes built on periodic windows of this
+        number of grid points centred on their scan positions (see
+        :meth:`.Probe.multislice`), which are propagated through the potential slices
+        cropped to the same windows, such that the cost scales with the window instead
+        of the full potential. The wave functions must have the scan positions as
+        their last ensemble axes. Only available with the conventional method.
+    stream_ensemble : bool, optional
+        If True, the measurements of the potential configurations (e.g. frozen phonons)
+        are averaged as they are calculated, instead of being stacked along the ensemble
+        axes of the potential, such that the memory is independent of the number of
+        configurations. The ensemble axes of the potential must all be averaged
+        (default is False).
+    precision : float, optional
+        If given, the ensemble is streamed and the calculation stops before the last
+        configuration once the standard error of the mean of every measurement relative
+        to the mean, measured as the ratio of their 2-norms, is below this value. At
+        least two configurations are always calculated. The decision is made for the
+        given batch of wave functions, hence the chunks of a lazy scan stop
+        independently and may average different numbers of configurations.
+    return_variance : bool, optional
+        If True, the ensemble is streamed and the variance of the mean (i.e. the squared
+        standard error) of every measurement is returned after the means. Not available
+        for exit waves (default is False).
 
     Returns
     -------
@@ -487,7 +1173,37 @@ def multislice_and_detect(
     detectors = validate_detectors(detectors)
     waves = waves.copy()
 
-    if method in ("conventional", "fft"):
+    stream_ensemble = stream_ensemble or precision is not None or return_variance
+    if stream_ensemble:
+        _validate_streamed_ensemble(potential)
+
+    if return_variance and any(
+        isinstance(detector, WavesDetector) for detector in detectors
+    ):
+        raise ValueError("the variance is not available for exit waves")
+
+    if window_gpts is not None:
+        if method not in ("conventional", "fft"):
+            raise ValueError(
+                "windowed multislice is only available with the conventional method"
+            )
+
+        windows = _ProbeWindows(waves, window_gpts, potential.gpts)
+        antialias_aperture = AntialiasAperture()
+        propagator = FresnelPropagator()
+
+        def multislice_step(waves, potential_slice):
+            return windowed_multislice_step(
+                waves,
+                potential_slice=potential_slice,
+                windows=windows,
+                antialias_aperture=antialias_aperture,
+                propagator=propagator,
+                conjugate=conjugate,
+                transpose=transpose,
+            )
+
+    elif method in ("conventional", "fft"):
         antialias_aperture = AntialiasAperture()
         propagator = FresnelPropagator()
 
@@ -501,6 +1217,12 @@ def multislice_and_detect(
                 transpose=transpose,
             )
 
+    elif method in ("fused",):
+        antialias_aperture = AntialiasAperture()
+        multislice_step = FusedMultisliceStep(
+            antialias_aperture, conjugate=conjugate, transpose=transpose
+        )
+
     elif method in ("realspace",):
         derivative_accuracy = kwargs.get("derivative_accuracy", 6)
         laplace_operator = LaplaceOperator(derivative_accuracy)
@@ -517,11 +1239,32 @@ def multislice_and_detect(
     else:
         raise ValueError()
 
+    if slice_cache is not False and method in ("conventional", "fft", "fused"):
+
+        def generate_slices(potential_configuration):
+            return SliceCache.shared(
+                potential_configuration,
+                energy=waves.energy,
+                antialias_aperture=antialias_aperture,
+                max_bytes=None if slice_cache is True else slice_cache,
+            ).generate_slices()
+
+    else:
+
+        def generate_slices(potential_configuration):
+            return potential_configuration.generate_slices()
+
     (
         extra_ensemble_axes_shape,
         extra_ensemble_axes_metadata,
     ) = _potential_ensemble_shape_and_metadata(potential)
 
+    if stream_ensemble:
+        num_ensemble_axes = len(potential.ensemble_shape)
+        extra_ensemble_axes_shape = extra_ensemble_axes_shape[num_ensemble_axes:]
+        extra_ensemble_axes_metadata = extra_ensemble_axes_metadata[num_ensemble_axes:]
+        ensemble_mean = _StreamingEnsembleMean()
+
     if sum(extra_ensemble_axes_shape) == 1:
         measurements = None
     else:
@@ -538,11 +1281,16 @@ def multislice_and_detect(
         enabled=pbar, total=int(n_slices), leave=False, desc="multislice"
     )
 
+    initial_waves = waves
     for potential_index, potential_configuration in _generate_potential_configurations(
         potential
     ):
+        waves = initial_waves.copy()
         exit_plane_index = 0
 
+        if stream_ensemble:
+            potential_index = ()
+
         if potential.exit_planes[0] == -1:
             measurement_index = _validate_potential_ensemble_indices(
                 potential_index, exit_plane_index, potential
@@ -555,7 +1303,7 @@ def multislice_and_detect(
             exit_plane_index += 1
 
         depth = 0.0
-        for potential_slice in potential_configuration.generate_slices():
+        for potential_slice in generate_slices(potential_configuration):
             waves = multislice_step(
                 waves,
                 potential_slice,
@@ -579,10 +1327,25 @@ def multislice_and_detect(
                 )
                 exit_plane_index += 1
 
-    if measurements is None:
+        if stream_ensemble:
+            ensemble_mean.update(measurements)
+
+            if (
+                precision is not None
+                and ensemble_mean.relative_standard_error() < precision
+            ):
+                break
+
+    if stream_ensemble:
+        measurements = ensemble_mean.means()
+
+        if return_variance:
+            measurements = measurements + ensemble_mean.variances()
+
+    elif measurements is None:
         measurements = [
-            detector.detect(waves)[(None,) * len(potential.ensemble_shape)]
-            for detector in detectors
+            measurement[(None,) * len(potential.ensemble_shape)]
+            for measurement in detect_multiple(waves, detectors)
         ]
 
     # measurements[0] += potential.num_slices
@@ -604,6 +1367,8 @@ def transition_potential_multislice_and_detect(
     conjugate: bool = False,
     transpose: bool = False,
     pbar=None,
+    slice_cache: bool | int | str = False,
+    spill_to_disk: bool = False,
 ) -> list[BaseMeasurements | Waves] | BaseMeasurements | Waves:
     """
     Calculate the full multislice algorithm for the given batch of wave functions through a given potential, detecting
@@ -622,8 +1387,12 @@ def transition_potential_multislice_and_detect(
         If True, use the complex conjugate of the transmission function (default is False).
     transpose : bool, optional
         If True, reverse the order of propagation and transmission (default is False).
-
-
+    slice_cache : bool or int or str, optional
+        If given, the transmission functions of each frozen phonon configuration are cached in a :class:`.SliceCache`
+        and reused by every inelastic branch. An int or a string such as "2 GB" sets the memory budget of the cache,
+        if True the budget is given by the configuration "cache.transmission-functions". Default is False.
+    spill_to_disk : bool, optional
+        If True, cached transmission functions exceeding the memory budget are stored on disk (default is False).
 
     Returns
     -------
@@ -641,8 +1410,7 @@ def transition_potential_multislice_and_detect(
                 potential_index, exit_plane_index, potential
             )
 
-            for i, detector in enumerate(detectors):
-                new_measurement = detector.detect(waves)
+            for i, new_measurement in enumerate(detect_multiple(waves, detectors)):
                 new_measurement = new_measurement.sum((0,))
                 measurements[i].array[measurement_index] += new_measurement.array
 
@@ -704,6 +1472,20 @@ def transition_potential_multislice_and_detect(
         potential_index,
         potential_configuration,
     ) in _generate_potential_configurations(potential):
+        if slice_cache is not False and double_channel:
+            cache = SliceCache(
+                potential_configuration,
+                energy=waves.energy,
+                antialias_aperture=antialias_aperture,
+                max_bytes=None if slice_cache is True else slice_cache,
+                spill_to_disk=spill_to_disk,
+                device=waves.device,
+            )
+            generate_slices = cache.generate_slices
+        else:
+            cache = None
+            generate_slices = potential_configuration.generate_slices
+
         if potential.exit_planes[0] == -1:
             measurement_index = _validate_potential_ensemble_indices(
                 potential_index, 0, potential
@@ -713,9 +1495,8 @@ def transition_potential_multislice_and_detect(
             )
 
         depth = 0.0
-        for scatter_index, potential_slice in enumerate(
-            potential_configuration.generate_slices()
-        ):
+        # the slices reached by the inner branches are taken from the cache
+        for scatter_index, potential_slice in enumerate(generate_slices()):
             waves = conventional_multislice_step(
                 waves,
                 potential_slice,
@@ -760,9 +1541,7 @@ def transition_potential_multislice_and_detect(
                     #    break
 
                     for inner_slice_index, inner_potential_slice in enumerate(
-                        potential_configuration.generate_slices(
-                            first_slice=scatter_index + 1
-                        )
+                        generate_slices(first_slice=scatter_index + 1)
                     ):
                         scattered_waves = conventional_multislice_step(
                             scattered_waves,
@@ -794,14 +1573,19 @@ def transition_potential_multislice_and_detect(
                     else:
                         measurement_index = ()
 
-                    for i, detector in enumerate(detectors):
-                        new_measurement = detector.detect(scattered_waves).sum((0,))
+                    for i, new_measurement in enumerate(
+                        detect_multiple(scattered_waves, detectors)
+                    ):
+                        new_measurement = new_measurement.sum((0,))
                         measurements[i].array[
                             measurement_index
                         ] += new_measurement.array[(None,) * len(measurement_index)]
 
                     # np.exp((potential.thickness - depth) / 700)
 
+        if cache is not None:
+            cache.clear()
+
     pbar.close_if_exists()
 
     return measurements
@@ -921,7 +1705,9 @@ class MultisliceTransform(ArrayObjectTransform):
     multislice_func : callable, optional
         The multislice function defining the multislice algorithm used (default is :func:`.multislice_and_detect`).
     **multislice_func_kwargs
-        Additional keyword arguments passed to the multislice function.
+        Additional keyword arguments passed to the multislice function. If `stream_ensemble`, `precision` or
+        `return_variance` is given (see :func:`.multislice_and_detect`), the ensemble of the potential is averaged
+        within each task and the ensemble axes of the potential are not added to the outputs.
     """
 
     def __init__(
@@ -942,6 +1728,19 @@ class MultisliceTransform(ArrayObjectTransform):
 
         detectors = validate_detectors(detectors)
 
+        if multislice_func_kwargs.get("precision", None) is not None or (
+            multislice_func_kwargs.get("return_variance", False)
+        ):
+            multislice_func_kwargs["stream_ensemble"] = True
+
+        if multislice_func_kwargs.get("stream_ensemble", False):
+            _validate_streamed_ensemble(potential)
+
+        if multislice_func_kwargs.get("return_variance", False) and any(
+            isinstance(detector, WavesDetector) for detector in detectors
+        ):
+            raise ValueError("the variance is not available for exit waves")
+
         if "pbar" not in multislice_func_kwargs:
             multislice_func_kwargs["pbar"] = config.get(
                 "diagnostics.task_progress", False
@@ -960,7 +1759,32 @@ class MultisliceTransform(ArrayObjectTransform):
 
     @property
     def _num_outputs(self):
-        return len(self._detectors)
+        return len(self._detectors) * (2 if self._return_variance else 1)
+
+    @property
+    def _stream_ensemble(self) -> bool:
+        return self._multislice_func_kwargs.get("stream_ensemble", False)
+
+    @property
+    def _return_variance(self) -> bool:
+        return self._multislice_func_kwargs.get("return_variance", False)
+
+    @property
+    def _potential_ensemble_shape(self) -> tuple[int, ...]:
+        if self._stream_ensemble:
+            return ()
+        return self._potential.ensemble_shape
+
+    @property
+    def _potential_ensemble_axes_metadata(self) -> list[AxisMetadata]:
+        if self._stream_ensemble:
+            return []
+        return self._potential.ensemble_axes_metadata
+
+    def _per_output(self, values: tuple) -> tuple:
+        if self._return_variance:
+            return values + values
+        return values
 
     @property
     def potential(self) -> BasePotential:
@@ -984,7 +1808,10 @@ class MultisliceTransform(ArrayObjectTransform):
 
     @property
     def _default_ensemble_chunks(self):
-        chunks = self._potential._default_ensemble_chunks
+        if self._stream_ensemble:
+            chunks = ()
+        else:
+            chunks = self._potential._default_ensemble_chunks
         num_exit_planes = len(self._potential.exit_planes)
         if num_exit_planes > 1:
             chunks = chunks + (num_exit_planes,)
@@ -992,7 +1819,7 @@ class MultisliceTransform(ArrayObjectTransform):
 
     @property
     def ensemble_axes_metadata(self):
-        ensemble_axes_metadata = self.potential.ensemble_axes_metadata
+        ensemble_axes_metadata = self._potential_ensemble_axes_metadata
 
         if len(self.potential.exit_planes) > 1:
             exit_planes_metadata = [self.potential._get_exit_planes_axes_metadata()]
@@ -1010,63 +1837,92 @@ class MultisliceTransform(ArrayObjectTransform):
 
     @property
     def ensemble_shape(self):
-        ensemble_shape = self._potential.ensemble_shape
+        ensemble_shape = self._potential_ensemble_shape
         if len(self._potential.exit_planes) > 1:
             ensemble_shape = (*ensemble_shape, len(self._potential.exit_planes))
         return ensemble_shape
 
     def _out_metadata(self, waves: BaseWaves):
-        return tuple(detector._out_metadata(waves)[0] for detector in self.detectors)
+        return self._per_output(
+            tuple(detector._out_metadata(waves)[0] for detector in self.detectors)
+        )
 
     def _out_dtype(self, waves: BaseWaves):
-        return tuple(detector._out_dtype(waves)[0] for detector in self.detectors)
+        return self._per_output(
+            tuple(detector._out_dtype(waves)[0] for detector in self.detectors)
+        )
 
     def _out_meta(self, waves: BaseWaves):
-        return tuple(detector._out_meta(waves)[0] for detector in self.detectors)
+        return self._per_output(
+            tuple(detector._out_meta(waves)[0] for detector in self.detectors)
+        )
 
     def _out_type(self, waves: BaseWaves):
-        return tuple(detector._out_type(waves)[0] for detector in self.detectors)
+        return self._per_output(
+            tuple(detector._out_type(waves)[0] for detector in self.detectors)
+        )
 
     def _out_ensemble_shape(self, waves: BaseWaves):
         shape = tuple(
             self.ensemble_shape + detector._out_ensemble_shape(waves)[0]
             for detector in self.detectors
         )
-        return shape
+        return self._per_output(shape)
 
     def _out_base_shape(self, waves: BaseWaves):
         base_shape = tuple(
             detector._out_base_shape(waves)[0] for detector in self.detectors
         )
-        return base_shape
+        return self._per_output(base_shape)
+
+    def _out_base_chunks(self, waves: BaseWaves, ensemble_chunks):
+        base_chunks = tuple(
+            detector._out_base_chunks(waves, ensemble_chunks)[0]
+            for detector in self.detectors
+        )
+        return self._per_output(base_chunks)
+
+    def _ensemble_axis_blocks(self, axis: AxisMetadata, chunks):
+        window_gpts = self._multislice_func_kwargs.get("window_gpts", None)
+        if window_gpts is None or not isinstance(axis, ScanAxis):
+            return super()._ensemble_axis_blocks(axis, chunks)
+
+        # the windows are derived from the scan positions of each chunk, hence the
+        # offset of each block of a scan axis is the coordinate of its first position
+        blocks = np.empty((len(chunks[0]),), dtype=object)
+        for i, slic in iterate_chunk_ranges(chunks):
+            blocks[i] = dataclasses.replace(
+                axis, offset=axis.offset + slic[0].start * axis.sampling
+            )
+        return da.from_array(blocks, chunks=1)
 
     def _out_base_axes_metadata(self, waves: BaseWaves):
-        return tuple(
-            detector._out_base_axes_metadata(waves)[0] for detector in self.detectors
+        return self._per_output(
+            tuple(
+                detector._out_base_axes_metadata(waves)[0]
+                for detector in self.detectors
+            )
         )
 
     def _out_ensemble_axes_metadata(self, waves: BaseWaves):
-        if len(self.potential.exit_planes) > 1:
-            potential_axes_metadata = self.potential.ensemble_axes_metadata + [
-                self.potential._get_exit_planes_axes_metadata()
-            ]
-        else:
-            potential_axes_metadata = self.potential.ensemble_axes_metadata
-
         ensemble_axes_metadata = tuple(
-            potential_axes_metadata + detector._out_ensemble_axes_metadata(waves)[0]
+            self.ensemble_axes_metadata + detector._out_ensemble_axes_metadata(waves)[0]
             for detector in self.detectors
         )
 
-        return ensemble_axes_metadata
+        return self._per_output(ensemble_axes_metadata)
 
     def _partition_args(self, chunks: int = 1, lazy: bool = True):
         chunks = validate_chunks(self.ensemble_shape, chunks)
         if len(self._potential.exit_planes) > 1:
             chunks = chunks[:-1]
 
+        if self._stream_ensemble:
+            # the whole ensemble of the potential is passed to every task
+            chunks = self._potential.ensemble_shape
+
         args = self._potential._partition_args(chunks=chunks, lazy=lazy)
-        if len(self._potential.ensemble_shape) > 0:
+        if len(self._potential_ensemble_shape) > 0:
             args = (args[0][..., None],)
         return args
 
@@ -2,21 +2,24 @@
 
 from __future__ import annotations
 
+import hashlib
 import warnings
 from abc import ABCMeta, abstractmethod
 from functools import partial, reduce
 from numbers import Number
 from operator import mul
-from typing import TYPE_CHECKING, Optional, Sequence, Type
+from typing import TYPE_CHECKING, Hashable, Optional, Sequence, Type
 
 import dask
 import dask.array as da
+from dask.base import tokenize
 import numpy as np
 from ase import Atoms
 from ase.cell import Cell
 from ase.data import chemical_symbols
 
 from abtem.array import ArrayObject, _validate_lazy
+from abtem.core import config
 from abtem.atoms import (
     best_orthogonal_cell,
     cut_cell,
@@ -34,6 +37,7 @@ from abtem.core.axes import (
     _find_axes_type,
 )
 from abtem.core.backend import get_array_module, validate_device
+from abtem.core.cache import LRUCache
 from abtem.core.chunks import Chunks, chunk_ranges, generate_chunks, validate_chunks
 from abtem.core.complex import complex_exponential
 from abtem.core.energy import Accelerator, HasAcceleratorMixin, energy2sigma
@@ -44,6 +48,7 @@ from abtem.inelastic.phonons import (
     AtomsEnsemble,
     BaseFrozenPhonons,
     DummyFrozenPhonons,
+    FrozenPhonons,
     _validate_seeds,
 )
 from abtem.integrals import (
@@ -64,6 +69,10 @@ if TYPE_CHECKING:
     from abtem.parametrizations import Parametrization
     from abtem.waves import BaseWaves, Waves
 
+reference_atoms_cache = LRUCache(
+    max_size=config.get("cache.reference-atoms", 4), name="reference_atoms"
+)
+
 
 class BaseField(Ensemble, HasGrid2DMixin, EqualityMixin, CopyMixin, metaclass=ABCMeta):
     # @property
@@ -221,6 +230,11 @@ class BaseField(Ensemble, HasGrid2DMixin, EqualityMixin, CopyMixin, metaclass=AB
 class BasePotential(BaseField, metaclass=ABCMeta):
     """Base class of all potentials. Documented in the subclasses."""
 
+    def _cache_key(self) -> Hashable:
+        # a deterministic identity of the potential for process-wide caches of derived
+        # arrays, potentials built from atoms provide a cheaper key
+        return tokenize(self)
+
     @property
     def base_axes_metadata(self):
         """List of AxisMetadata for the base axes."""
@@ -270,6 +284,14 @@ def _validate_exit_planes(exit_planes, num_slices):
     return exit_planes
 
 
+def _atoms_digest(atoms: Atoms) -> str:
+    digest = hashlib.sha1(np.ascontiguousarray(atoms.positions).tobytes())
+    digest.update(np.ascontiguousarray(atoms.numbers).tobytes())
+    digest.update(np.ascontiguousarray(atoms.cell.array).tobytes())
+    digest.update(np.ascontiguousarray(atoms.pbc).tobytes())
+    return digest.hexdigest()
+
+
 def _require_cell_transform(cell, box, plane, origin):
     if box == tuple(np.diag(cell)):
         return False
@@ -373,16 +395,26 @@ class _FieldBuilder(BaseField):
         return self.build(lazy=False)[item]
 
     @staticmethod
-    def _wrap_build_potential(potential, first_slice, last_slice):
+    def _wrap_build_potential(potential, first_slice, last_slice, max_batch="auto"):
         potential = potential.item()
-        array = potential.build(first_slice, last_slice, lazy=False).array
+        array = potential.build(
+            first_slice, last_slice, max_batch=max_batch, lazy=False
+        ).array
         return array
 
+    def _generate_slices_for_build(
+        self, first_slice: int, last_slice: int, max_batch: int | str
+    ):
+        # the slices are generated one at a time, builders able to generate several
+        # slices at once may override this method
+        for j, slic in enumerate(self.generate_slices(first_slice, last_slice)):
+            yield j, slic
+
     def build(
         self,
         first_slice: int = 0,
         last_slice: Optional[int] = None,
-        max_batch: int | str = 1,
+        max_batch: int | str = "auto",
         lazy: Optional[bool] = None,
     ) -> FieldArray:
         """
@@ -395,7 +427,9 @@ class _FieldBuilder(BaseField):
         last_slice : int, optional
             Index of the last slice of the generated potential
         max_batch : int or str, optional
-            Maximum number of slices to calculate in task. Default is 1.
+            Maximum number of slices to calculate at once. If 'auto' (default), the number of slices is chosen
+            such that the calculation of a batch of slices requires no more memory than the chunk size given in
+            the user configuration.
         lazy : bool, optional
             If True, create the wave functions lazily, otherwise, calculate instantly.
             If None, this defaults to the value set in the configuration file.
@@ -436,6 +470,7 @@ class _FieldBuilder(BaseField):
                 new_axis=new_axis,
                 first_slice=first_slice,
                 last_slice=last_slice,
+                max_batch=max_batch,
                 chunks=chunks,
                 meta=xp.array((), dtype=get_dtype(complex=False)),
             )
@@ -453,14 +488,16 @@ class _FieldBuilder(BaseField):
                     potential = potential.item()
                     i = np.unravel_index((0,), self.ensemble_shape)
 
-                    for j, slic in enumerate(
-                        potential.generate_slices(first_slice, last_slice)
+                    for j, slic in potential._generate_slices_for_build(
+                        first_slice, last_slice, max_batch
                     ):
-                        array[i + (j,)] = slic.array[0]
+                        array[i + (slice(j, j + len(slic)),)] = slic.array
 
             else:
-                for j, slic in enumerate(self.generate_slices(first_slice, last_slice)):
-                    array[j] = slic.array[0]
+                for j, slic in self._generate_slices_for_build(
+                    first_slice, last_slice, max_batch
+                ):
+                    array[j : j + len(slic)] = slic.array
 
         potential = self._array_object(
             array,
@@ -568,38 +605,125 @@ class _FieldBuilderFromAtoms(_FieldBuilder):
 
         return atoms
 
-    def _prepare_atoms(self):
-
-        atoms = self.get_transformed_atoms()
-
+    def _margins(self) -> float:
         if self.integrator.finite:
             cutoffs = self._cutoffs()
-            margins = max(cutoffs) if len(cutoffs) else 0.0
-        else:
-            margins = 0.0
-
-        if self.periodic:
-            atoms = self.frozen_phonons.randomize(atoms)
-            atoms.wrap(eps=0.0)
+            return max(cutoffs) if len(cutoffs) else 0.0
+        return 0.0
 
+    def _pad_atoms(self, atoms: Atoms, margins: float) -> Atoms:
         if not self.integrator.periodic and self.integrator.finite:
             atoms = pad_atoms(atoms, margins=margins)
         elif self.integrator.periodic:
             atoms = pad_atoms(atoms, margins=margins, directions="z")
+        return atoms
 
-        if not self.periodic:
-            atoms = self.frozen_phonons.randomize(atoms)
-
+    def _slice_atoms(self, atoms: Atoms, margins: float) -> BaseSlicedAtoms:
         if self.integrator.finite:
-            sliced_atoms = SlicedAtoms(
+            return SlicedAtoms(
                 atoms=atoms, slice_thickness=self.slice_thickness, z_padding=margins
             )
-        else:
-            sliced_atoms = SliceIndexedAtoms(
-                atoms=atoms, slice_thickness=self.slice_thickness
+        return SliceIndexedAtoms(atoms=atoms, slice_thickness=self.slice_thickness)
+
+    def _frozen_phonons_key(self) -> tuple:
+        frozen_phonons = self.frozen_phonons
+        if isinstance(frozen_phonons, FrozenPhonons):
+            return (
+                _atoms_digest(frozen_phonons.atoms),
+                tokenize(frozen_phonons.sigmas),
+                frozen_phonons.directions,
+                frozen_phonons.seed,
             )
+        return tuple(_atoms_digest(atoms) for atoms in frozen_phonons)
+
+    def _cache_key(self) -> tuple:
+        return (
+            type(self).__name__,
+            self._frozen_phonons_key(),
+            tokenize(self.integrator),
+            self.gpts,
+            self.sampling,
+            self.slice_thickness,
+            self.exit_planes,
+            str(self.plane),
+            self.origin,
+            self.box,
+            self.periodic,
+            self.device,
+        )
+
+    def _reference_atoms_key(self, margins: float) -> tuple:
+        return (
+            _atoms_digest(self.frozen_phonons.atoms),
+            str(self.plane),
+            self.origin,
+            self.box,
+            self.periodic,
+            margins,
+            self.slice_thickness,
+            self.integrator.finite,
+            self.integrator.periodic,
+        )
+
+    def _prepare_reference_atoms(
+        self, margins: float
+    ) -> tuple[Atoms, Optional[SliceIndexedAtoms]]:
+        atoms = self.get_transformed_atoms().copy()
+
+        if not self.periodic:
+            return self._pad_atoms(atoms, margins), None
+
+        # without margins, the slice index of the reference is updated for each
+        # configuration, as long as padding neither adds nor removes atoms
+        sliced_atoms = None
+        if not self.integrator.finite:
+            wrapped = atoms.copy()
+            wrapped.wrap(eps=0.0)
+            padded = self._pad_atoms(wrapped, margins)
+            if len(padded) == len(wrapped):
+                sliced_atoms = self._slice_atoms(padded, margins)
+
+        return atoms, sliced_atoms
+
+    def _prepare_displaced_atoms(self, margins: float) -> BaseSlicedAtoms:
+        atoms, sliced_atoms = reference_atoms_cache.get_or_insert(
+            self._reference_atoms_key(margins),
+            lambda: self._prepare_reference_atoms(margins),
+        )
+
+        atoms = self.frozen_phonons.randomize(atoms)
+
+        if not self.periodic:
+            return self._slice_atoms(atoms, margins)
+
+        atoms.wrap(eps=0.0)
+        padded = self._pad_atoms(atoms, margins)
+
+        if sliced_atoms is not None and len(padded) == len(atoms):
+            return sliced_atoms.displace(padded.positions)
 
-        return sliced_atoms
+        return self._slice_atoms(padded, margins)
+
+    def _prepare_atoms(self):
+        margins = self._margins()
+
+        if isinstance(self.frozen_phonons, FrozenPhonons):
+            # the configurations share the transformed and sliced reference atoms,
+            # only the displacements are applied to each configuration
+            return self._prepare_displaced_atoms(margins)
+
+        atoms = self.get_transformed_atoms()
+
+        if self.periodic:
+            atoms = self.frozen_phonons.randomize(atoms)
+            atoms.wrap(eps=0.0)
+
+        atoms = self._pad_atoms(atoms, margins)
+
+        if not self.periodic:
+            atoms = self.frozen_phonons.randomize(atoms)
+
+        return self._slice_atoms(atoms, margins)
 
     def get_sliced_atoms(self) -> BaseSlicedAtoms:
         """
@@ -616,11 +740,30 @@ class _FieldBuilderFromAtoms(_FieldBuilder):
 
         return self._sliced_atoms
 
+    def _generate_slices_for_build(
+        self, first_slice: int, last_slice: int, max_batch: int | str
+    ):
+        if max_batch == "auto":
+            # the integrators need up to two complex arrays of the size of a batch
+            max_batch = validate_chunks(
+                (last_slice - first_slice,) + self.base_shape[1:],
+                ("auto", -1, -1),
+                max_elements="auto",
+                dtype=np.dtype(get_dtype(complex=True)),
+                device=self.device,
+            )[0][0]
+
+        j = 0
+        for slic in self.generate_slices(first_slice, last_slice, max_batch=max_batch):
+            yield j, slic
+            j += len(slic)
+
     def generate_slices(
         self,
         first_slice: int = 0,
         last_slice: Optional[int] = None,
         return_depth: float = False,
+        max_batch: int = 1,
     ):
         """
         Generate the slices for the potential.
@@ -633,6 +776,8 @@ class _FieldBuilderFromAtoms(_FieldBuilder):
             Index of the last slice of the generated potential.
         return_depth : bool
             If True, return the depth of each generated slice.
+        max_batch : int, optional
+            Number of slices integrated at once and yielded together. Default is 1.
 
         Yields
         ------
@@ -642,49 +787,23 @@ class _FieldBuilderFromAtoms(_FieldBuilder):
         if last_slice is None:
             last_slice = len(self)
 
-        xp = get_array_module(self.device)
-
         sliced_atoms = self.get_sliced_atoms()
 
-        numbers = np.unique(sliced_atoms.atoms.numbers)
-
         exit_plane_after = self._exit_plane_after
 
         cumulative_thickness = np.cumsum(self.slice_thickness)
 
         for start, stop in generate_chunks(
-            last_slice - first_slice, chunks=1, start=first_slice
+            last_slice - first_slice, chunks=max_batch, start=first_slice
         ):
-            if len(numbers) > 1 or stop - start > 1:
-                array = xp.zeros(
-                    (stop - start,) + self.base_shape[1:],
-                    dtype=get_dtype(complex=False),
-                )
-            else:
-                array = None
-
-            for i, slice_idx in enumerate(range(start, stop)):
-                atoms = sliced_atoms.get_atoms_in_slices(slice_idx)
-
-                new_array = self._integrator.integrate_on_grid(
-                    atoms,
-                    a=sliced_atoms.slice_limits[slice_idx][0],
-                    b=sliced_atoms.slice_limits[slice_idx][1],
-                    gpts=self.gpts,
-                    sampling=self.sampling,
-                    device=self.device,
-                )
-
-                if array is not None:
-                    array[i] += new_array
-                else:
-                    array = new_array[None]
-
-            if array is None:
-                array = xp.zeros(
-                    (stop - start,) + self.base_shape[1:],
-                    dtype=get_dtype(complex=False),
-                )
+            array = self._integrator.integrate_slices(
+                sliced_atoms,
+                start,
+                stop,
+                gpts=self.gpts,
+                sampling=self.sampling,
+                device=self.device,
+            )
 
             # array -= array.min()
 
@@ -1162,6 +1281,7 @@ class PotentialArray(BasePotential, FieldArray):
             slice_thickness=self.slice_thickness,
             extent=self.extent,
             energy=energy,
+            exit_planes=self.exit_planes,
         )
         return t
 
@@ -1204,6 +1324,9 @@ class TransmissionFunction(PotentialArray, HasAcceleratorMixin):
         Lateral sampling of the potential [1 / Å].
     energy : float
         Electron energy [eV].
+    exit_planes : int or tuple of int, optional
+        The slice indices after which an exit plane is desired. Transmission functions calculated from a potential
+        inherit its exit planes.
     """
 
     def __init__(
@@ -1213,9 +1336,10 @@ class TransmissionFunction(PotentialArray, HasAcceleratorMixin):
         extent: Optional[float | tuple[float, float]] = None,
         sampling: Optional[float | tuple[float, float]] = None,
         energy: Optional[float] = None,
+        exit_planes: Optional[int | tuple[int, ...]] = None,
     ):
         self._accelerator = Accelerator(energy=energy)
-        super().__init__(array, slice_thickness, extent, sampling)
+        super().__init__(array, slice_thickness, extent, sampling, exit_planes)
 
     def get_chunk(self, first_slice, last_slice) -> TransmissionFunction:
         array = self.array[first_slice:last_slice]
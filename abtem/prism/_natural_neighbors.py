@@ -1,5 +1,5 @@
 import numpy as np
-from scipy.spatial import ConvexHull, Delaunay, cKDTree
+from scipy.spatial import ConvexHull, Delaunay, QhullError, cKDTree
 
 
 def triangle_area(pt1, pt2, pt3):
@@ -161,8 +161,13 @@ def natural_neighbor_weights(points, query_point, tri, neighbors, circumcenters)
             if p2 in tri.simplices[check_tri]:
                 polygon.append(circumcenters[check_tri])
 
-        pts = [polygon[i] for i in ConvexHull(polygon).vertices]
-        area = polygon_area(pts)
+        try:
+            pts = [polygon[i] for i in ConvexHull(polygon).vertices]
+            area = polygon_area(pts)
+        except QhullError:
+            # a degenerate polygon has no area
+            area = 0.0
+
         weights[
             (tri.points[p2][0] == points[:, 0]) & (tri.points[p2][1] == points[:, 1])
         ] += area
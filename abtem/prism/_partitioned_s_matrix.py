@@ -1,156 +1,323 @@
+"""Module for the partitioned PRISM algorithm, where the exit waves of a coarse set of
+parent plane waves are interpolated to the plane waves of the full expansion."""
+
 import numba as nb
 import numpy as np
 
+from abtem.core import config
 from abtem.core.backend import get_array_module
+from abtem.core.cache import LRUCache
+from abtem.core.complex import complex_exponential
 from abtem.core.energy import energy2wavelength
-from abtem.core.fft import ifft2
-from abtem.core.grid import spatial_frequencies
 from abtem.prism._natural_neighbors import pairwise_weights
+from abtem.prism.utils import wrapped_crop_2d
 from abtem.transfer import CTF
 
+beamlet_weights_cache = LRUCache(
+    max_size=config.get("cache.beamlet-weights", 8), name="beamlet_weights"
+)
 
-def beamlet_weights(parent_wave_vectors, wave_vectors, gpts, sampling):
-    kx, ky = spatial_frequencies(gpts, sampling)
-    kx, ky = np.meshgrid(kx, ky, indexing="ij")
-    k = np.asarray((kx.ravel(), ky.raveåpl())).T
-
-    indices = np.argmax(np.all(np.isclose(wave_vectors[:, None, :], k), axis=2), axis=1)
-    weights = np.zeros((len(parent_wave_vectors),) + kx.shape)
 
-    point_weights = pairwise_weights(parent_wave_vectors, wave_vectors)
-    for i, j in enumerate(indices):
-        k, m = np.unravel_index(j, kx.shape)
-        weights[:, k, m] = point_weights[:, i]
+def partitioned_prism_wave_vectors(
+    cutoff: float,
+    extent: tuple[float, float],
+    energy: float,
+    num_rings: int,
+    interpolation: tuple[int, int] = (1, 1),
+    num_points_per_ring: int = 6,
+    xp=np,
+) -> np.ndarray:
+    """
+    The wave vectors of the parent plane waves of a partitioned scattering matrix. The
+    parent wave vectors are placed on concentric rings, the i'th ring has i times the
+    number of points of the first ring, and rounded to wave vectors that are periodic in
+    the (interpolated) cell.
+
+    Parameters
+    ----------
+    cutoff : float
+        The radial cutoff of the plane-wave expansion [mrad].
+    extent : two float
+        Lateral extent of the scattering matrix [Å].
+    energy : float
+        Electron energy [eV].
+    num_rings : int
+        The number of rings, including the central wave vector. Must be at least 2.
+    interpolation : two int
+        Interpolation factor in the `x` and `y` directions.
+    num_points_per_ring : int
+        The number of points of the first ring.
+
+    Returns
+    -------
+    wave_vectors : np.ndarray
+        The parent wave vectors [1/Å] as an array of shape Nx2.
+    """
+    if num_rings < 2:
+        raise ValueError("the number of partition rings must be at least 2")
 
-    return weights
+    wavelength = energy2wavelength(energy)
 
+    spacing = (interpolation[0] / extent[0], interpolation[1] / extent[1])
 
-def beamlet_basis(ctf, parent_wave_vectors, wave_vectors, gpts, sampling):
-    basis = ctf.evaluate_on_grid(gpts=gpts, sampling=sampling)
-    basis = (
-        beamlet_weights(parent_wave_vectors, wave_vectors, gpts, sampling)
-        * basis
-        / np.sqrt(len(wave_vectors))
-    )
-    basis = ifft2(basis)
-    basis = np.fft.fftshift(basis, axes=(1, 2))
-    return basis
+    # the outer polygon encloses the cutoff after rounding to the periodic wave vectors
+    num_outer = num_points_per_ring * (num_rings - 1)
+    outer = cutoff / 1.0e3 / wavelength + np.hypot(*spacing) / 2
+    outer = outer / np.cos(np.pi / num_outer)
 
+    wave_vectors = [np.zeros((1, 2))]
+    n = num_points_per_ring
+    for radius in np.linspace(outer / (num_rings - 1), outer, num_rings - 1):
+        angles = np.arange(n) * 2 * np.pi / n + np.pi / 2
+        kx = np.round(radius * np.sin(angles) / spacing[0]) * spacing[0]
+        ky = np.round(radius * np.cos(angles) / spacing[1]) * spacing[1]
+        wave_vectors.append(np.array([kx, ky]).T)
+        n += num_points_per_ring
 
-def remove_tilt(
-    array,
-    planewave_cutoff,
-    extent,
-    gpts,
-    energy,
-    interpolation,
-    partitions,
-    accumulated_defocus,
-    block_info=None,
-):
-    xp = get_array_module(array)
+    wave_vectors = np.vstack(wave_vectors)
+
+    # small rings may round to identical wave vectors
+    _, indices = np.unique(np.round(wave_vectors, 8), axis=0, return_index=True)
+    wave_vectors = wave_vectors[np.sort(indices)]
+
+    return xp.asarray(wave_vectors, dtype=np.float32)
+
+
+def beamlet_weights(
+    parent_wave_vectors: np.ndarray, wave_vectors: np.ndarray
+) -> np.ndarray:
+    """
+    Natural neighbour interpolation weights of the parent plane waves for each plane
+    wave of the full expansion. The weights are cached.
+
+    Parameters
+    ----------
+    parent_wave_vectors : np.ndarray
+        The wave vectors of the parent plane waves as an array of shape Mx2.
+    wave_vectors : np.ndarray
+        The wave vectors of the full expansion as an array of shape Nx2.
+
+    Returns
+    -------
+    weights : np.ndarray
+        The interpolation weights as an array of shape MxN.
+    """
+    parent_wave_vectors = np.asarray(parent_wave_vectors, dtype=np.float64)
+    wave_vectors = np.asarray(wave_vectors, dtype=np.float64)
+
+    key = (
+        parent_wave_vectors.shape,
+        parent_wave_vectors.tobytes(),
+        wave_vectors.shape,
+        wave_vectors.tobytes(),
+    )
 
-    if block_info is None:
-        start, end = 0, array.shape[-3]
-    else:
-        start, end = block_info[0]["array-location"][-3]
+    return beamlet_weights_cache.get_or_insert(
+        key,
+        lambda: pairwise_weights(parent_wave_vectors, wave_vectors).astype(np.float32),
+    )
 
-    if partitions is None:
-        wave_vectors = prism_wave_vectors(
-            planewave_cutoff, extent, energy, interpolation
-        )
-    else:
-        wave_vectors = partitioned_prism_wave_vectors(
-            planewave_cutoff, extent, energy, num_rings=partitions
-        )
 
-    wave_vectors = wave_vectors[start:end]
+def beamlet_basis(
+    coefficients: np.ndarray,
+    weights: np.ndarray,
+    wave_vectors: np.ndarray,
+    window_extent: tuple[float, float],
+    window_gpts: tuple[int, int],
+) -> np.ndarray:
+    """
+    The beamlets of the parent plane waves. Each beamlet is a probe-like wave function
+    containing the plane waves of the full expansion weighted by their interpolation
+    weight for the parent plane wave. The beamlets are centered in the window.
+
+    Parameters
+    ----------
+    coefficients : np.ndarray
+        The expansion coefficients of the plane waves of the full expansion given by the
+        contrast transfer function, the last dimension indexes the plane waves.
+    weights : np.ndarray
+        The interpolation weights of shape MxN, see `beamlet_weights`.
+    wave_vectors : np.ndarray
+        The wave vectors of the full expansion as an array of shape Nx2.
+    window_extent : two float
+        The extent of the cropping window [Å].
+    window_gpts : two int
+        The number of grid points of the cropping window.
+
+    Returns
+    -------
+    basis : np.ndarray
+        The beamlets as an array with the shape of the leading dimensions of the
+        coefficients followed by M and the window gpts.
+    """
+    xp = get_array_module(coefficients)
+
+    wave_vectors = np.asarray(wave_vectors)
+    n = np.rint(wave_vectors[:, 0] * window_extent[0]).astype(int) % window_gpts[0]
+    m = np.rint(wave_vectors[:, 1] * window_extent[1]).astype(int) % window_gpts[1]
+
+    weights = xp.asarray(weights)
+    leading_shape = coefficients.shape[:-1]
+
+    array = xp.zeros(
+        leading_shape + (weights.shape[0],) + tuple(window_gpts), dtype=np.complex64
+    )
+    array[..., n, m] = weights * coefficients[..., None, :]
+
+    array = xp.fft.ifft2(array) * np.prod(window_gpts)
+    array = xp.fft.fftshift(array, axes=(-2, -1))
+    return array.astype(np.complex64)
+
+
+def propagation_phase(
+    wave_vectors: np.ndarray, energy: float, distance: float
+) -> np.ndarray:
+    """
+    The phase accumulated by plane waves propagating a given distance, relative to the
+    plane wave along the optical axis.
+
+    Parameters
+    ----------
+    wave_vectors : np.ndarray
+        The wave vectors of the plane waves as an array of shape Nx2.
+    energy : float
+        Electron energy [eV].
+    distance : float
+        The propagation distance [Å].
+
+    Returns
+    -------
+    phase : np.ndarray
+        The complex phase factor of each plane wave.
+    """
+    xp = get_array_module(wave_vectors)
 
     wavelength = energy2wavelength(energy)
 
-    alpha = xp.sqrt(wave_vectors[:, 0] ** 2 + wave_vectors[:, 1] ** 2) * wavelength
-    phi = xp.arctan2(wave_vectors[:, 0], wave_vectors[:, 1])
+    alpha = xp.sqrt((wave_vectors**2).sum(-1)) * wavelength
+    phi = xp.arctan2(wave_vectors[:, 1], wave_vectors[:, 0])
 
-    ctf_coefficients = CTF(defocus=accumulated_defocus, energy=energy).evaluate(
-        alpha, phi
-    )
-    ctf_coefficients = np.expand_dims(
-        ctf_coefficients, tuple(range(len(array.shape) - 3)) + (-2, -1)
-    )
+    return CTF(defocus=distance, energy=energy)._evaluate_from_angular_grid(alpha, phi)
 
-    array = (
-        array * plane_waves(wave_vectors, extent, gpts, reverse=True) * ctf_coefficients
-    )
-    return array
 
+def remove_tilt(
+    array: np.ndarray,
+    parent_wave_vectors: np.ndarray,
+    sampling: tuple[float, float],
+    window_offset: tuple[int, int],
+    energy: float,
+    accumulated_defocus: float = 0.0,
+    corner: tuple[int, int] = (0, 0),
+    gpts: tuple[int, int] | None = None,
+) -> np.ndarray:
+    """
+    Remove the tilt of the exit waves of the parent plane waves and the phase
+    accumulated by the tilted plane waves propagating through the potential. The exit
+    waves may be a periodically wrapped crop of the full exit waves.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The exit waves of the parent plane waves, the third last dimension indexes the
+        parent plane waves.
+    parent_wave_vectors : np.ndarray
+        The wave vectors of the parent plane waves as an array of shape Mx2.
+    sampling : two float
+        Lateral sampling of the exit waves [Å].
+    window_offset : two int
+        The number of grid points from the origin the exit waves are displaced.
+    energy : float
+        Electron energy [eV].
+    accumulated_defocus : float
+        The thickness of the potential [Å].
+    corner : two int
+        The lower corner of the crop in grid points of the full exit waves.
+    gpts : two int, optional
+        The number of grid points of the full exit waves. Default is the shape of the
+        given exit waves.
+
+    Returns
+    -------
+    tilt_free_array : np.ndarray
+        The exit waves without tilt.
+    """
+    xp = get_array_module(array)
 
-def interpolate_full(
-    array, parent_wave_vectors, wave_vectors, extent, gpts, energy, defocus=0.0
-):
-    interpolated_array = plane_waves(wave_vectors, extent, gpts)
+    if gpts is None:
+        gpts = array.shape[-2:]
 
-    weights = pairwise_weights(parent_wave_vectors, wave_vectors)
+    parent_wave_vectors = xp.asarray(parent_wave_vectors, dtype=np.float32)
 
-    alpha = np.sqrt(
-        wave_vectors[:, 0] ** 2 + wave_vectors[:, 1] ** 2
-    ) * energy2wavelength(energy)
-    phi = np.arctan2(wave_vectors[:, 0], wave_vectors[:, 1])
+    x = xp.arange(corner[0], corner[0] + array.shape[-2]) % gpts[0] + window_offset[0]
+    y = xp.arange(corner[1], corner[1] + array.shape[-1]) % gpts[1] + window_offset[1]
+    x = x * np.float32(sampling[0])
+    y = y * np.float32(sampling[1])
 
-    interpolated_array *= CTF(defocus=-defocus, energy=energy).evaluate(alpha, phi)[
-        :, None, None
-    ]
+    phase = propagation_phase(parent_wave_vectors, energy, accumulated_defocus)
 
-    for i, plane_wave in enumerate(interpolated_array):
-        plane_wave *= (array * weights[:, i, None, None]).sum(0)
+    tilt = complex_exponential(
+        -2 * np.pi * parent_wave_vectors[:, 0, None, None] * x[:, None]
+    ) * complex_exponential(
+        -2 * np.pi * parent_wave_vectors[:, 1, None, None] * y[None, :]
+    )
 
-    return interpolated_array
+    return (array * (tilt * phase[:, None, None]).astype(np.complex64)).astype(
+        np.complex64
+    )
 
 
 @nb.jit(nopython=True, nogil=True, parallel=True, fastmath=True)
 def reduce_beamlets_nearest_no_interpolation(waves, basis, parent_s_matrix, shifts):
+    """
+    Sum the beamlets multiplied by the exit waves of the parent plane waves cropped at
+    the nearest grid point of each probe position.
+    """
     assert waves.shape[0] == shifts.shape[0]
     assert len(shifts.shape) == 2
-    # assert basis.shape == parent_s_matrix.shape
-    # assert waves.shape[1:] == parent_s_matrix.shape[:-1]
 
     for i in nb.prange(waves.shape[0]):
-        for j in range(waves.shape[1]):
-            for k in range(waves.shape[2]):
-                # waves[i, j, k] = np.dot(basis[j, k, :],
-                #                         parent_s_matrix[
-                #                         (j + shifts[i, 0]) % parent_s_matrix.shape[0],
-                #                         (k + shifts[i, 1]) % parent_s_matrix.shape[1], :])
-                waves[i, j, k] = np.dot(
-                    basis[:, j, k],
-                    parent_s_matrix[
-                        :,
-                        (j + shifts[i, 0]) % parent_s_matrix.shape[1],
-                        (k + shifts[i, 1]) % parent_s_matrix.shape[2],
-                    ],
-                )
+        waves[i] = 0.0
+        for p in range(basis.shape[0]):
+            for j in range(waves.shape[1]):
+                jj = (j + shifts[i, 0]) % parent_s_matrix.shape[1]
+                for k in range(waves.shape[2]):
+                    kk = (k + shifts[i, 1]) % parent_s_matrix.shape[2]
+                    waves[i, j, k] += basis[p, j, k] * parent_s_matrix[p, jj, kk]
     return waves
 
 
-def partitioned_prism_wave_vectors(
-    cutoff, extent, energy, num_rings, num_points_per_ring=6, xp=np
-):
-    wavelength = energy2wavelength(energy)
-
-    rings = [xp.array((0.0, 0.0))]
-    if num_rings == 1:
-        raise NotImplementedError()
+def reduce_beamlets(
+    array: np.ndarray, basis: np.ndarray, corners: np.ndarray
+) -> np.ndarray:
+    """
+    Reduce the tilt-free exit waves of the parent plane waves to probe wave functions.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The tilt-free exit waves of the parent plane waves as an array of shape MxHxW.
+    basis : np.ndarray
+        The beamlets as an array of shape Mxhxw, see `beamlet_basis`.
+    corners : np.ndarray
+        The lower corner of the cropping window of each probe in grid points as an array
+        of shape Px2.
+
+    Returns
+    -------
+    waves : np.ndarray
+        The probe wave functions as an array of shape Pxhxw.
+    """
+    xp = get_array_module(array)
 
-    n = num_points_per_ring
-    for r in np.linspace(cutoff / (num_rings - 1), cutoff, num_rings - 1):
-        angles = xp.arange(n, dtype=np.int32) * 2 * np.pi / n + np.pi / 2
-        kx = xp.round(r * xp.sin(angles) / 1000.0 / wavelength * extent[0]) / extent[0]
-        ky = xp.round(r * xp.cos(-angles) / 1000.0 / wavelength * extent[1]) / extent[1]
-        n += num_points_per_ring
-        rings.append(xp.array([kx, ky]).T)
+    waves = xp.zeros((len(corners),) + basis.shape[-2:], dtype=np.complex64)
 
-    return xp.vstack(rings).astype(xp.float32)
+    if xp is np:
+        return reduce_beamlets_nearest_no_interpolation(
+            waves, basis, array, np.asarray(corners, dtype=np.int64)
+        )
 
+    for i, corner in enumerate(corners):
+        cropped = wrapped_crop_2d(array, tuple(int(c) for c in corner), basis.shape[-2:])
+        waves[i] = (basis * cropped).sum(0)
 
-def array_row_intersection(a, b):
-    tmp = np.all(np.isclose(np.swapaxes(a[:, :, None], 1, 2), b), axis=2)
-    return np.sum(np.cumsum(tmp, axis=0) * tmp == 1, axis=1).astype(bool)
+    return waves
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import inspect
+import json
 import operator
+import os
 import warnings
 from abc import abstractmethod
 from functools import partial, reduce
@@ -12,6 +14,7 @@ import dask.array as da
 import numpy as np
 from ase import Atoms
 from dask.graph_manipulation import wait_on
+from dask.utils import parse_bytes
 
 from abtem.array import ArrayObject, ComputableList, _validate_lazy
 from abtem.core import config
@@ -22,13 +25,14 @@ from abtem.core.axes import (
     UnknownAxis,
     WaveVectorAxis,
 )
+from abtem.antialias import AntialiasAperture
 from abtem.core.backend import copy_to_device, cp, get_array_module, validate_device
 from abtem.core.chunks import Chunks, chunk_ranges, equal_sized_chunks, validate_chunks
-from abtem.core.complex import complex_exponential
+from abtem.core.complex import abs2, complex_exponential
 from abtem.core.diagnostics import TqdmWrapper
 from abtem.core.energy import Accelerator
 from abtem.core.ensemble import Ensemble, _wrap_with_array
-from abtem.core.grid import Grid, GridUndefinedError
+from abtem.core.grid import Grid, GridUndefinedError, spatial_frequencies
 from abtem.core.utils import (
     CopyMixin,
     EqualityMixin,
@@ -46,11 +50,27 @@ from abtem.detectors import (
     WavesDetector,
     validate_detectors,
 )
-from abtem.measurements import BaseMeasurements
-from abtem.multislice import allocate_multislice_measurements, multislice_and_detect
+from abtem.inelastic.core_loss import BaseTransitionPotential
+from abtem.measurements import BaseMeasurements, _annular_detector_mask
+from abtem.multislice import (
+    FresnelPropagator,
+    SliceCache,
+    allocate_multislice_measurements,
+    conventional_multislice_step,
+    multislice_and_detect,
+)
 from abtem.potentials.iam import BasePotential, validate_potential
+from abtem.prism._partitioned_s_matrix import (
+    beamlet_basis,
+    beamlet_weights,
+    partitioned_prism_wave_vectors,
+    propagation_phase,
+    reduce_beamlets,
+    remove_tilt,
+)
 from abtem.prism.utils import batch_crop_2d, minimum_crop, plane_waves, wrapped_crop_2d
 from abtem.scan import BaseScan, GridScan, validate_scan
+from abtem.slicing import SliceIndexedAtoms
 from abtem.transfer import CTF
 from abtem.waves import BaseWaves, Probe, Waves, _antialias_cutoff_gpts
 
@@ -169,9 +189,33 @@ class BaseSMatrix(BaseWaves):
         """The number of grid points describing the cropping window of the wave functions."""
         pass
 
+    @property
+    @abstractmethod
+    def partitions(self) -> int | None:
+        """The number of rings of parent plane waves of a partitioned SMatrix."""
+        pass
+
     def __len__(self) -> int:
         return len(self.wave_vectors)
 
+    def _beamlet_wave_vectors(self) -> np.ndarray:
+        # the wave vectors of the full plane-wave expansion of a partitioned SMatrix,
+        # given on the reciprocal grid of the cropping window
+        self.grid.check_is_defined()
+        self.accelerator.check_is_defined()
+        dummy_probes = self.dummy_probes(device="cpu")
+
+        aperture = dummy_probes.aperture._evaluate_kernel(dummy_probes)
+
+        indices = np.where(aperture > 0.0)
+
+        n = np.fft.fftfreq(aperture.shape[0], d=1 / aperture.shape[0])[indices[0]]
+        m = np.fft.fftfreq(aperture.shape[1], d=1 / aperture.shape[1])[indices[1]]
+
+        w, h = self.window_extent
+
+        return np.asarray([n / w, m / h], dtype=np.float32).T
+
     @property
     def base_axes_metadata(self) -> list[AxisMetadata]:
         wave_axes_metadata = super().base_axes_metadata
@@ -254,6 +298,13 @@ class BaseSMatrix(BaseWaves):
         return probes
 
 
+def _validate_memmap_filename(filename: str) -> str:
+    filename = str(filename)
+    if not filename.endswith(".npy"):
+        filename = filename + ".npy"
+    return filename
+
+
 def _validate_interpolation(interpolation: int | tuple[int, int]):
     if isinstance(interpolation, int):
         interpolation = (interpolation,) * 2
@@ -274,6 +325,14 @@ def _pack_wave_vectors(wave_vectors):
     )
 
 
+def _group_wave_vectors(index, n: int) -> list[np.ndarray]:
+    # the indices of the wave vectors sharing each of the n unique values of a component
+    index = copy_to_device(index, "cpu")
+    order = np.argsort(index, kind="stable")
+    bounds = np.searchsorted(index[order], np.arange(n + 1))
+    return [order[bounds[i] : bounds[i + 1]] for i in range(n)]
+
+
 def _chunked_axis(s_matrix_array):
     window_margin = s_matrix_array._window_margin
 
@@ -358,10 +417,14 @@ def _map_blocks(array, scans, block_indices, window_offset=(0, 0), **kwargs):
 
         new_chunks = array.chunks[:-3] + ctf_chunks + scan.shape
 
-        kwargs["from_waves_kwargs"]["window_offset"] = (
-            window_offset[0] + sum(array.chunks[-2][: i[0]]),
-            window_offset[1] + sum(array.chunks[-1][: i[1]]),
-        )
+        # every task needs its own copy, the graph refers to the keyword arguments
+        kwargs["from_waves_kwargs"] = {
+            **kwargs["from_waves_kwargs"],
+            "window_offset": (
+                window_offset[0] + sum(array.chunks[-2][: i[0]]),
+                window_offset[1] + sum(array.chunks[-1][: i[1]]),
+            ),
+        }
 
         if len(scan.shape) == 1:
             drop_axis = (len(array.shape) - 3, len(array.shape) - 1)
@@ -427,7 +490,6 @@ def _multiple_rechunk_reduce(
     pad_amounts = _tuple_from_index_value_pairs(
         chunked_axis, (window_margin[chunked_axis],) * 2, nochunks_axis, (0, 0)
     )
-    print(pad_amounts)
     s_matrix_array = s_matrix_array._pad(pad_amounts)
 
     chunk_size = window_margin[chunked_axis]
@@ -442,7 +504,6 @@ def _multiple_rechunk_reduce(
         nochunks_axis,
         (s_matrix_array.shape[-2:][nochunks_axis],),
     )
-    print(partitions, s_matrix_array.sampling, s_matrix_array.shape)
 
     chunk_extents = tuple(
         tuple(((cc[0]) * d, (cc[1]) * d) for cc in c)
@@ -593,117 +654,120 @@ def _multiple_rechunk_reduce(
     return measurements
 
 
+def _chunks_for_single_rechunk_reduce(s_matrix_array: SMatrixArray):
+    chunked_axis, _ = _chunked_axis(s_matrix_array)
+
+    n = s_matrix_array.shape[-2:][chunked_axis]
+    num_chunks = n // s_matrix_array._window_margin[chunked_axis]
+
+    # with fewer than three chunks, the neighbouring chunks of a chunk overlap
+    if num_chunks < 3:
+        return (n,)
+
+    return equal_sized_chunks(n, num_chunks=num_chunks)
+
+
+def _reduction_task_nbytes(s_matrix_array: SMatrixArray, reduction_scheme: str) -> int:
+    """Estimate the number of bytes of the S-Matrix held by each task of a reduction."""
+    chunked_axis, nochunks_axis = _chunked_axis(s_matrix_array)
+
+    gpts = s_matrix_array.shape[-2:]
+    ensemble_size = int(np.prod([max(c) for c in s_matrix_array.array.chunks[:-3]]))
+
+    if reduction_scheme == "no-chunks":
+        size = gpts[0] * gpts[1]
+    elif reduction_scheme == "single-rechunk":
+        partitions = _chunks_for_single_rechunk_reduce(s_matrix_array)
+        size = min(3 * max(partitions), gpts[chunked_axis]) * gpts[nochunks_axis]
+    elif reduction_scheme == "multiple-rechunk":
+        size = 3 * s_matrix_array._window_margin[chunked_axis] * gpts[nochunks_axis]
+    else:
+        raise ValueError(f"unknown reduction scheme {reduction_scheme}")
+
+    itemsize = s_matrix_array.array.dtype.itemsize
+    return ensemble_size * len(s_matrix_array) * size * itemsize
+
+
 def _single_rechunk_reduce(
-    s_matrix_array: "SMatrixArray",
+    s_matrix_array: SMatrixArray,
     scan: BaseScan,
     detectors: list[BaseDetector],
     ctf: CTF,
     max_batch_reduction: int,
+    pbar: bool = False,
 ):
-    chunked_axis, nochunks_axis = _chunked_axis(s_matrix_array)
-
-    num_chunks = (
-        s_matrix_array.gpts[chunked_axis] // s_matrix_array._window_margin[chunked_axis]
-    )
+    assert np.all(s_matrix_array.periodic)
 
-    chunks = equal_sized_chunks(
-        s_matrix_array.shape[-2:][chunked_axis], num_chunks=num_chunks
-    )
+    chunked_axis, nochunks_axis = _chunked_axis(s_matrix_array)
 
-    assert np.all(np.array(chunks) > s_matrix_array._window_margin[chunked_axis])
+    partitions = _chunks_for_single_rechunk_reduce(s_matrix_array)
 
-    chunks = (
+    array = s_matrix_array.array.rechunk(
         s_matrix_array.array.chunks[:-3]
         + (-1,)
-        + _tuple_from_index_value_pairs(chunked_axis, chunks, nochunks_axis, -1)
+        + _tuple_from_index_value_pairs(chunked_axis, partitions, nochunks_axis, -1)
     )
 
-    array = s_matrix_array._array.rechunk(chunks)
-
-    assert all(s_matrix_array.periodic)
-
-    # chunk_extents = tuple(
-    #     tuple(((cc[0]) * d, (cc[1]) * d) for cc in c)
-    #     for c, d in zip(chunk_ranges(array.chunks[-2:]), s_matrix_array.sampling)
-    # )
-    chunk_extents_x = tuple(
-        ((cc[0]) * s_matrix_array.sampling[0], (cc[1]) * s_matrix_array.sampling[0])
-        for cc in array.chunks[-2]
-    )
-    chunk_extents_y = tuple(
-        ((cc[0]) * s_matrix_array.sampling[1], (cc[1]) * s_matrix_array.sampling[1])
-        for cc in array.chunks[-1]
+    chunk_extents = tuple(
+        tuple((cc[0] * d, cc[1] * d) for cc in c)
+        for c, d in zip(chunk_ranges(array.chunks[-2:]), s_matrix_array.sampling)
     )
 
-    chunk_extents = (chunk_extents_x, chunk_extents_y)
     scan, scan_chunks = scan._sort_into_extents(chunk_extents)
 
-    ctf_chunks = tuple((n,) for n in ctf.ensemble_shape)
-    chunks = array.chunks[:-3] + ctf_chunks
+    shape = tuple(len(c) for c in scan_chunks)
+    blocks = np.zeros(shape, dtype=object)
 
-    shape = tuple(len(c) for c, p in zip(scan_chunks, s_matrix_array.periodic))
-    blocks = np.zeros((1,) * len(array.shape[:-3]) + shape, dtype=object)
+    from_waves_kwargs = s_matrix_array._copy_kwargs(exclude=("array", "extent"))
 
     kwargs = {
         "waves_partial": s_matrix_array.waves._from_partitioned_args(),
         "ensemble_axes_metadata": s_matrix_array.waves.ensemble_axes_metadata,
-        "from_waves_kwargs": s_matrix_array._copy_kwargs(exclude=("array", "extent")),
         "ctf": ctf,
         "detectors": detectors,
         "max_batch_reduction": max_batch_reduction,
+        "pbar": pbar,
     }
 
+    num_chunks = len(partitions)
+    axis = len(array.shape) - 2 + chunked_axis
+
     for indices, _, sub_scan in scan.generate_blocks(scan_chunks):
-        sub_scan = sub_scan.item()
-
-        if len(sub_scan) == 0:
-            itemset(
-                blocks,
-                (0,) * len(array.shape[:-3]) + indices,
-                da.zeros(
-                    (0,) * len(blocks.shape),
-                    dtype=np.complex64,
-                ),
+        k = indices[chunked_axis]
+
+        # each task receives its chunk along with the previous and next chunk, which
+        # are wider than the margin of the probe window, the chunks wrap around
+        if num_chunks > 1:
+            block = da.concatenate(
+                [
+                    array.blocks[(slice(None),) * axis + (i % num_chunks,)]
+                    for i in (k - 1, k, k + 1)
+                ],
+                axis=axis,
             )
-            continue
-
-        slics = (slice(None),) * (len(array.shape) - 2)
-        window_offset = ()
-        for i, k in enumerate(indices):
-            if len(array.chunks[-2:][i]) > 1:
-                slics += ([k - 1, k, (k + 1) % len(array.chunks[-2:][i])],)
-                window_offset += (
-                    sum(array.chunks[-2:][i][:k]) - array.chunks[-2:][i][k - 1],
-                )
-
-            else:
-                slics += (slice(None),)
-                window_offset += (0,)
-
-        new_block = array.blocks[slics]
-        new_block = new_block.rechunk(array.chunks[:-2] + (-1, -1))
-        new_chunks = chunks + sub_scan.shape
-
-        kwargs["from_waves_kwargs"]["window_offset"] = tuple(window_offset)
-
-        if len(scan.shape) == 1:
-            drop_axis = (len(array.shape) - 3, len(array.shape) - 1)
-        elif len(scan.shape) == 2:
-            drop_axis = (len(array.shape) - 3,)
+            block = block.rechunk(
+                block.chunks[:axis] + (-1,) + block.chunks[axis + 1 :]
+            )
+            offset = sum(partitions[:k]) - partitions[k - 1]
         else:
-            raise NotImplementedError
+            block = array
+            offset = 0
 
-        new_block = da.map_blocks(
-            _lazy_reduce,
-            new_block,
-            scan=sub_scan,
-            drop_axis=drop_axis,
-            chunks=new_chunks,
+        window_offset = tuple(
+            window_offset + (offset if i == chunked_axis else 0)
+            for i, window_offset in enumerate(s_matrix_array.window_offset)
+        )
+
+        (new_block,) = _map_blocks(
+            block,
+            [sub_scan.item()],
+            [(0, 0)],
+            window_offset=window_offset,
+            from_waves_kwargs=from_waves_kwargs,
             **kwargs,
-            meta=np.array((), dtype=np.complex64),
         )
 
-        itemset(blocks, (0,) * len(array.shape[:-3]) + indices, new_block)
+        itemset(blocks, indices, new_block)
 
     array = da.block(blocks.tolist())
 
@@ -808,6 +872,9 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         The number of grid points from the origin the cropping windows of the wave functions is displaced.
     periodic: tuple of bool
         Specifies whether the SMatrix should be assumed to be periodic along the x and y-axis.
+    partitions : int, optional
+        The number of rings of parent plane waves, if the SMatrix is partitioned. The wave vectors are then those of
+        the parent plane waves, see `SMatrix`.
     device : str, optional
         The calculations will be carried out on this device ('cpu' or 'gpu'). Default is 'cpu'. The default is
         determined by the user configuration.
@@ -830,6 +897,7 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         window_gpts: tuple[int, int] = (0, 0),
         window_offset: tuple[int, int] = (0, 0),
         periodic: tuple[bool, bool] = (True, True),
+        partitions: int = None,
         device: str = None,
         ensemble_axes_metadata: list[AxisMetadata] = None,
         metadata: dict = None,
@@ -852,6 +920,7 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         self._interpolation = _validate_interpolation(interpolation)
         self._device = device
         self._periodic = periodic
+        self._partitions = partitions
 
     @classmethod
     def _pack_kwargs(cls, kwargs):
@@ -866,6 +935,88 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
 
         # kwargs["wave_vectors"] = _pack_wave_vectors(kwargs["wave_vectors"])
 
+    def to_memmap(self, filename: str, overwrite: bool = False) -> "SMatrixArray":
+        """
+        Write the SMatrixArray to an uncompressed .npy file and return an SMatrixArray backed by a read-only memory
+        map of the file. The remaining parameters are written to a .json file next to it. A lazy SMatrixArray is
+        computed and written chunk by chunk, hence the SMatrixArray is never held in memory in its entirety.
+
+        The memory-mapped SMatrixArray is reduced without reading it into memory, only the cropping windows of
+        each batch of probe positions are read from the file, such that SMatrices larger than the memory can be
+        reduced.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the .npy file. The extension is added if not given.
+        overwrite : bool
+            If the file already exists, overwrite=False will cause an error, where overwrite=True will replace the
+            existing file.
+
+        Returns
+        -------
+        memory_mapped_s_matrix_array : SMatrixArray
+            The memory-mapped SMatrixArray.
+        """
+        filename = _validate_memmap_filename(filename)
+
+        if os.path.exists(filename) and not overwrite:
+            raise FileExistsError(f"file {filename} already exists")
+
+        s_matrix_array = self.copy_to_device("cpu")
+
+        memmap = np.lib.format.open_memmap(
+            filename,
+            mode="w+",
+            dtype=s_matrix_array.array.dtype,
+            shape=s_matrix_array.array.shape,
+        )
+
+        if s_matrix_array.is_lazy:
+            da.store(s_matrix_array.array, memmap, lock=False)
+        else:
+            memmap[:] = s_matrix_array.array
+
+        memmap.flush()
+        del memmap
+
+        packed_kwargs = self._pack_kwargs(self._copy_kwargs(exclude=("array",)))
+
+        with open(os.path.splitext(filename)[0] + ".json", "w") as f:
+            json.dump(packed_kwargs, f)
+
+        return self.from_memmap(filename)
+
+    @classmethod
+    def from_memmap(cls, filename: str) -> "SMatrixArray":
+        """
+        Read an SMatrixArray written with `to_memmap` as a read-only memory map.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the .npy file.
+
+        Returns
+        -------
+        memory_mapped_s_matrix_array : SMatrixArray
+            The memory-mapped SMatrixArray.
+        """
+        filename = _validate_memmap_filename(filename)
+
+        with open(os.path.splitext(filename)[0] + ".json", "r") as f:
+            kwargs = cls._unpack_kwargs(json.load(f))
+
+        array = np.load(filename, mmap_mode="r")
+
+        with config.set({"warnings.overspecified-grid": False}):
+            return cls(array, **kwargs)
+
+    @property
+    def is_memory_mapped(self) -> bool:
+        """True if the SMatrixArray is backed by a memory-mapped file."""
+        return isinstance(self.array, np.memmap)
+
     def copy_to_device(self, device: str) -> "SMatrixArray":
         """Copy SMatrixArray to specified device."""
         s_matrix = super().copy_to_device(device)
@@ -920,6 +1071,10 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         """If True the SMatrix is assumed to be periodic along corresponding axis."""
         return self._periodic
 
+    @property
+    def partitions(self) -> int | None:
+        return self._partitions
+
     @property
     def metadata(self) -> dict:
         self._metadata["energy"] = self.energy
@@ -996,9 +1151,6 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
     ):
         xp = get_array_module(self._device)
 
-        if self._device == "gpu" and isinstance(array, np.ndarray):
-            array = xp.asarray(array)
-
         position_coefficients = xp.array(position_coefficients, dtype=xp.complex64)
 
         # return xp.zeros(position_coefficients.shape[:2] + self.window_gpts, dtype=xp.complex64)
@@ -1010,7 +1162,8 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
 
             crop_corner, size, corners = minimum_crop(pixel_positions, self.window_gpts)
 
-            array = wrapped_crop_2d(array, crop_corner, size)
+            # an array stored on the host is only copied to the device after cropping
+            array = xp.asarray(wrapped_crop_2d(array, crop_corner, size))
 
             array = xp.tensordot(position_coefficients, array, axes=[-1, -3])
 
@@ -1020,13 +1173,164 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
             array = batch_crop_2d(array, corners, self.window_gpts)
 
         else:
-            array = xp.tensordot(position_coefficients, array, axes=[-1, -3])
+            array = xp.tensordot(position_coefficients, xp.asarray(array), axes=[-1, -3])
 
             if len(self.waves.shape) > 3:
                 array = xp.moveaxis(array, -3, 0)
 
         return array
 
+    def _reduce_to_waves_separable(
+        self,
+        array,
+        positions,
+        x_coefficients,
+        y_coefficients,
+        ctf_coefficients,
+        kx_index,
+        ky_index,
+        kx_groups,
+        ky_groups,
+    ):
+        xp = get_array_module(self._device)
+
+        if self.window_gpts != self.gpts:
+            pixel_positions = positions / xp.array(self.waves.sampling) - xp.asarray(
+                self.window_offset
+            )
+            crop_corner, size, corners = minimum_crop(pixel_positions, self.window_gpts)
+            array = wrapped_crop_2d(array, crop_corner, size)
+        else:
+            corners = None
+
+        array = xp.asarray(array)
+
+        if ctf_coefficients is None:
+            ctf_coefficients = xp.ones(len(self), dtype=xp.complex64)
+
+        ensemble_shape = array.shape[:-3]
+        ctf_shape = ctf_coefficients.shape[:-1]
+        num_kx, num_ky = x_coefficients.shape[1], y_coefficients.shape[1]
+        num_x, num_y = x_coefficients.shape[0], y_coefficients.shape[0]
+
+        # the plane waves are grouped by one component of their wave vectors, the phase
+        # factors of the other component and the transfer function are contracted with
+        # each group, then the phase factors of the grouped component are contracted
+        # with the partial sums; the smaller table of partial sums is chosen
+        if num_kx * num_y <= num_ky * num_x:
+            groups, inner_index = kx_groups, ky_index
+            outer_coefficients, inner_coefficients = x_coefficients, y_coefficients
+        else:
+            groups, inner_index = ky_groups, kx_index
+            outer_coefficients, inner_coefficients = y_coefficients, x_coefficients
+
+        num_outer, num_inner = len(outer_coefficients), len(inner_coefficients)
+        grouped_x = groups is kx_groups
+
+        # the plane waves are reordered once, such that every group is a contiguous
+        # slice of the scattering matrix; the groups are taken in the order of their
+        # first plane wave, hence no copy is made if they are already contiguous
+        first = np.argsort([group[0] for group in groups])
+        groups = [groups[j] for j in first]
+        outer_coefficients = outer_coefficients[:, xp.asarray(first)]
+        order = np.concatenate(groups)
+        bounds = np.cumsum([0] + [len(group) for group in groups])
+        groups = [slice(bounds[j], bounds[j + 1]) for j in range(len(groups))]
+
+        if not np.array_equal(order, np.arange(len(order))):
+            order = xp.asarray(order)
+            array = array[..., order, :, :]
+            inner_index = inner_index[order]
+            ctf_coefficients = ctf_coefficients[..., order]
+
+        # the waves are reduced in chunks of the inner positions into the preallocated
+        # output, such that the table of partial sums and the contracted chunk are
+        # limited to about an eighth of the size of the reduced waves
+        chunk_size = max(
+            1, min(num_inner, num_outer * num_inner // (8 * (len(groups) + num_outer)))
+        )
+
+        waves = xp.empty(
+            ensemble_shape + ctf_shape + (num_x, num_y) + array.shape[-2:],
+            dtype=xp.complex64,
+        )
+        partial_sums = xp.empty(
+            (len(groups), chunk_size) + ensemble_shape + array.shape[-2:],
+            dtype=xp.complex64,
+        )
+        ensemble_index = (slice(None),) * len(ensemble_shape)
+        for i in np.ndindex(ctf_shape):
+            for start in range(0, num_inner, chunk_size):
+                stop = min(start + chunk_size, num_inner)
+
+                for j, group in enumerate(groups):
+                    coefficients = (
+                        inner_coefficients[start:stop, inner_index[group]]
+                        * ctf_coefficients[i][group][None]
+                    )
+                    partial_sums[j, : stop - start] = xp.tensordot(
+                        coefficients, array[..., group, :, :], axes=[-1, -3]
+                    )
+
+                reduced = xp.tensordot(
+                    outer_coefficients, partial_sums[:, : stop - start], axes=[-1, 0]
+                )
+
+                if grouped_x:
+                    index = ensemble_index + i + (slice(None), slice(start, stop))
+                    waves[index] = xp.moveaxis(reduced, (0, 1), (-4, -3))
+                else:
+                    index = ensemble_index + i + (slice(start, stop), slice(None))
+                    waves[index] = xp.moveaxis(reduced, (0, 1), (-3, -4))
+
+        # the cropped scattering matrix and the partial sums are released before the
+        # waves are cropped
+        del array, partial_sums, reduced
+
+        if corners is not None:
+            waves = batch_crop_2d(waves, corners, self.window_gpts)
+
+        return waves
+
+    def _reduce_beamlets_to_waves(self, array, positions, basis, accumulated_defocus):
+        xp = get_array_module(self._device)
+
+        pixel_positions = positions / xp.asarray(self.sampling) - xp.asarray(
+            self.window_offset
+        )
+
+        crop_corner, size, corners = minimum_crop(pixel_positions, self.window_gpts)
+        corners = corners.reshape((-1, 2))
+
+        # the tilt is removed from the crop of the scattering matrix, such that only the
+        # crop of a memory-mapped array is read from the file and copied to the device
+        array = remove_tilt(
+            xp.asarray(wrapped_crop_2d(array, crop_corner, size)),
+            self.wave_vectors,
+            self.sampling,
+            self.window_offset,
+            self.energy,
+            accumulated_defocus,
+            corner=crop_corner,
+            gpts=array.shape[-2:],
+        )
+
+        ensemble_shape = array.shape[:-3]
+        ctf_shape = basis.shape[:-3]
+
+        waves = xp.zeros(
+            ensemble_shape + ctf_shape + positions.shape[:-1] + self.window_gpts,
+            dtype=np.complex64,
+        )
+
+        for i in np.ndindex(ensemble_shape):
+            for j in np.ndindex(ctf_shape):
+                waves[i + j] = reduce_beamlets(array[i], basis[j], corners).reshape(
+                    positions.shape[:-1] + self.window_gpts
+                )
+
+        return waves
+
     def _calculate_positions_coefficients(self, scan):
         xp = get_array_module(self.wave_vectors)
 
@@ -1047,8 +1351,31 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
 
         return coefficients
 
-    def _calculate_ctf_coefficients(self, ctf):
-        wave_vectors = self.wave_vectors
+    def _wave_vector_grid(self):
+        # the unique x and y components of the wave vectors and the index of each wave
+        # vector into them
+        xp = get_array_module(self.wave_vectors)
+        kx, kx_index = xp.unique(self.wave_vectors[:, 0], return_inverse=True)
+        ky, ky_index = xp.unique(self.wave_vectors[:, 1], return_inverse=True)
+        return kx, ky, kx_index, ky_index
+
+    def _calculate_separable_positions_coefficients(self, scan: GridScan, kx, ky):
+        xp = get_array_module(self.wave_vectors)
+
+        x = xp.asarray(scan._x_coordinates())
+        y = xp.asarray(scan._y_coordinates())
+
+        x_coefficients = complex_exponential(-2.0 * xp.pi * x[:, None] * kx[None])
+        y_coefficients = complex_exponential(-2.0 * xp.pi * y[:, None] * ky[None])
+        return (
+            x_coefficients.astype(xp.complex64),
+            y_coefficients.astype(xp.complex64),
+        )
+
+    def _calculate_ctf_coefficients(self, ctf, wave_vectors=None):
+        if wave_vectors is None:
+            wave_vectors = self.wave_vectors
+
         xp = get_array_module(wave_vectors)
 
         alpha = (
@@ -1056,7 +1383,7 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         )
         phi = xp.arctan2(wave_vectors[:, 1], wave_vectors[:, 0])
         array = ctf._evaluate_from_angular_grid(alpha, phi)
-        array = array / xp.sqrt((array**2).sum(axis=-1, keepdims=True))
+        array = array / xp.sqrt((xp.abs(array) ** 2).sum(axis=-1, keepdims=True))
         return array
 
     def _batch_reduce_to_measurements(
@@ -1078,7 +1405,13 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
 
         xp = get_array_module(self._device)
 
-        if self._device == "gpu" and isinstance(self.waves.array, np.ndarray):
+        # a memory-mapped array is cropped before it is read from the file and copied to
+        # the device
+        if (
+            self._device == "gpu"
+            and isinstance(self.waves.array, np.ndarray)
+            and not self.is_memory_mapped
+        ):
             array = cp.asarray(self.waves.array)
         else:
             array = self.waves.array
@@ -1087,59 +1420,109 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
 
         pbar = TqdmWrapper(enabled=pbar, total=n_positions, leave=False, desc="reduce")
 
-        for _, ctf_slics, sub_ctf in ctf.generate_blocks(1):
-            sub_ctf = sub_ctf.item()
-            ctf_coefficients = self._calculate_ctf_coefficients(sub_ctf)
-
-            for _, slics, sub_scan in scan.generate_blocks(max_batch_reduction):
-                sub_scan = sub_scan.item()
-                positions = xp.asarray(sub_scan.get_positions())
-
-                positions_coefficients = self._calculate_positions_coefficients(
-                    sub_scan
-                )
+        if self.partitions is not None:
+            accumulated_defocus = self.metadata.get("accumulated_defocus", 0.0)
+            wave_vectors = self._beamlet_wave_vectors()
+            weights = beamlet_weights(self.wave_vectors, wave_vectors)
+
+            # the beamlets replace the propagation of the plane waves of the full
+            # expansion, hence the transfer function is given at the exit plane
+            wave_vectors = xp.asarray(wave_vectors)
+            ctf_coefficients = self._calculate_ctf_coefficients(
+                ctf, wave_vectors
+            ) * propagation_phase(wave_vectors, self.energy, accumulated_defocus).conj()
+            basis = beamlet_basis(
+                ctf_coefficients,
+                weights,
+                wave_vectors,
+                self.window_extent,
+                self.window_gpts,
+            )
+        else:
+            # the coefficients of all the transfer functions of the ensemble are
+            # applied to each crop of the scattering matrix
+            ctf_coefficients = self._calculate_ctf_coefficients(ctf)
+
+        # the phase factors of a grid scan are separable in x and y, the tables of the
+        # factors are calculated once and shared by the scan blocks
+        separable = self.partitions is None and isinstance(scan, GridScan)
+
+        if separable:
+            kx, ky, kx_index, ky_index = self._wave_vector_grid()
+            kx_groups = _group_wave_vectors(kx_index, len(kx))
+            ky_groups = _group_wave_vectors(ky_index, len(ky))
+            (
+                x_coefficients,
+                y_coefficients,
+            ) = self._calculate_separable_positions_coefficients(scan, kx, ky)
+
+        ensemble_axes_metadata = [
+            UnknownAxis() for _ in range(len(array.shape[:-3]) + len(ctf.ensemble_shape))
+        ]
+        ensemble_axes_metadata.extend([ScanAxis() for _ in range(len(scan.shape))])
 
-                if ctf_coefficients is not None:
-                    (
-                        expanded_ctf_coefficients,
-                        positions_coefficients,
-                    ) = expand_dims_to_broadcast(
-                        ctf_coefficients,
-                        positions_coefficients,
-                        match_dims=[(-1,), (-1,)],
-                    )
-                    coefficients = positions_coefficients * expanded_ctf_coefficients
-                else:
-                    coefficients = positions_coefficients
+        for _, slics, sub_scan in scan.generate_blocks(max_batch_reduction):
+            sub_scan = sub_scan.item()
+            positions = xp.asarray(sub_scan.get_positions())
 
-                ensemble_shape = len(array.shape[:-3]) + len(sub_ctf.ensemble_shape)
+            if separable:
+                block_x_coefficients = x_coefficients[slics[0]]
+                block_y_coefficients = y_coefficients[slics[1]]
+                num_x, num_y = len(block_x_coefficients), len(block_y_coefficients)
 
-                ensemble_axes_metadata = []
-                ensemble_axes_metadata.extend(
-                    [UnknownAxis() for _ in range(ensemble_shape)]
+                # the table of partial sums of the separable reduction is only used if
+                # it is no larger than the reduced waves of the block
+                use_separable = min(len(kx) * num_y, len(ky) * num_x) <= num_x * num_y
+            else:
+                use_separable = False
+
+            if use_separable:
+                waves_array = self._reduce_to_waves_separable(
+                    array,
+                    positions,
+                    block_x_coefficients,
+                    block_y_coefficients,
+                    ctf_coefficients,
+                    kx_index,
+                    ky_index,
+                    kx_groups,
+                    ky_groups,
                 )
-                ensemble_axes_metadata.extend(
-                    [ScanAxis() for _ in range(len(scan.shape))]
+            elif self.partitions is None:
+                coefficients = self._calculate_positions_coefficients(sub_scan)
+
+                (
+                    expanded_ctf_coefficients,
+                    coefficients,
+                ) = expand_dims_to_broadcast(
+                    ctf_coefficients,
+                    coefficients,
+                    match_dims=[(-1,), (-1,)],
                 )
+                coefficients = coefficients * expanded_ctf_coefficients
 
                 waves_array = self._reduce_to_waves(array, positions, coefficients)
-
-                waves = Waves(
-                    waves_array,
-                    sampling=self.sampling,
-                    energy=self.energy,
-                    ensemble_axes_metadata=ensemble_axes_metadata,
-                    metadata=self.metadata,
+            else:
+                waves_array = self._reduce_beamlets_to_waves(
+                    array, positions, basis, accumulated_defocus
                 )
 
-                indices = (
-                    (slice(None),) * (len(self.waves.shape) - 3) + ctf_slics + slics
-                )
+            waves = Waves(
+                waves_array,
+                sampling=self.sampling,
+                energy=self.energy,
+                ensemble_axes_metadata=ensemble_axes_metadata,
+                metadata=self.metadata,
+            )
 
-                pbar.update_if_exists(len(sub_scan))
+            indices = (slice(None),) * (
+                len(self.waves.shape) - 3 + len(ctf.ensemble_shape)
+            ) + slics
 
-                for detector, measurement in zip(detectors, measurements):
-                    measurement.array[indices] = detector.detect(waves).array
+            pbar.update_if_exists(len(sub_scan) * int(np.prod(ctf.ensemble_shape)))
+
+            for detector, measurement in zip(detectors, measurements):
+                measurement.array[indices] = detector.detect(waves).array
 
         pbar.close_if_exists()
 
@@ -1211,23 +1594,41 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         return chunks
 
     def _validate_max_batch_reduction(
-        self, scan, max_batch_reduction: int | str = "auto"
+        self, scan, max_batch_reduction: int | str = "auto", ctf: CTF = None
     ):
-        shape = (len(scan),) + self.window_gpts
-        chunks = (max_batch_reduction, -1, -1)
+        # all the transfer functions of an ensemble are reduced from the same crop
+        ctf_shape = () if ctf is None else ctf.ensemble_shape
+
+        shape = ctf_shape + (len(scan),) + self.window_gpts
+        chunks = (-1,) * len(ctf_shape) + (max_batch_reduction, -1, -1)
 
-        return validate_chunks(shape, chunks, dtype=np.dtype("complex64"))[0][0]
+        validated_chunks = validate_chunks(shape, chunks, dtype=np.dtype("complex64"))
+        return validated_chunks[len(ctf_shape)][0]
 
     def _validate_reduction_scheme(self, reduction_scheme):
         if self.interpolation == (1, 1) and reduction_scheme == "no-chunks":
             raise NotImplementedError
 
-        if reduction_scheme == "auto" and max(self.interpolation) <= 2:
+        if reduction_scheme != "auto":
+            return reduction_scheme
+
+        if max(self.interpolation) <= 2 or not self.is_lazy:
             return "no-chunks"
-        elif reduction_scheme == "auto":
-            return "multiple-rechunk"
 
-        return reduction_scheme
+        if self.device == "gpu":
+            chunk_bytes = parse_bytes(config.get("dask.chunk-size-gpu"))
+        else:
+            chunk_bytes = parse_bytes(config.get("dask.chunk-size"))
+
+        # a single rechunk is preferred unless its tasks need more memory than the
+        # tasks of the multiple rechunks and more than the configured chunk size
+        single_rechunk_nbytes = _reduction_task_nbytes(self, "single-rechunk")
+        multiple_rechunk_nbytes = _reduction_task_nbytes(self, "multiple-rechunk")
+
+        if single_rechunk_nbytes <= max(multiple_rechunk_nbytes, chunk_bytes):
+            return "single-rechunk"
+
+        return "multiple-rechunk"
 
     def reduce(
         self,
@@ -1247,15 +1648,22 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         scan : Scan object
             Scan defining the positions of the probe wave functions.
         ctf: CTF object, optional
-            The probe contrast transfer function. Default is None (aperture is set by the planewave cutoff).
+            The probe contrast transfer function. Default is None (aperture is set by the planewave cutoff). If the CTF
+            is an ensemble, e.g. a series of defocus values given as a distribution, every CTF of the ensemble is
+            reduced from each crop of the SMatrix, such that the SMatrix is only traversed once.
         max_batch_reduction : int or str, optional
             Number of positions per reduction operation. A large number of positions better utilize thread
             parallelization, but requires more memory and floating point operations. If 'auto' (default), the batch size
-            is automatically chosen based on the abtem user configuration settings "dask.chunk-size" and
-            "dask.chunk-size-gpu".
-        rechunk : two int or str, optional
-            Partitioning of the scan. The scattering matrix will be reduced in similarly partitioned chunks.
-            Should be equal to or greater than the interpolation.
+            is automatically chosen, such that the wave functions of all the CTFs of the ensemble are within the abtem
+            user configuration settings "dask.chunk-size" and "dask.chunk-size-gpu".
+        reduction_scheme : str, optional
+            The scheme used for reducing a lazy SMatrixArray. 'no-chunks' reduces the full SMatrixArray in each task.
+            'single-rechunk' rechunks the SMatrixArray once to chunks along a spatial axis and each task receives a
+            chunk together with its two neighbours. 'multiple-rechunk' rechunks three times, such that each task
+            receives the smallest possible part of the SMatrixArray at the expense of a larger task graph. If 'auto'
+            (default), 'no-chunks' is used if the interpolation factor is at most 2, otherwise 'single-rechunk' is
+            used, unless its tasks require more memory than those of 'multiple-rechunk' and more than the
+            abtem user configuration setting "dask.chunk-size".
         """
 
         self.accelerator.check_is_defined()
@@ -1286,7 +1694,7 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         )
 
         max_batch_reduction = self._validate_max_batch_reduction(
-            scan, max_batch_reduction
+            scan, max_batch_reduction, ctf
         )
 
         reduction_scheme = self._validate_reduction_scheme(reduction_scheme)
@@ -1299,9 +1707,8 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
                     self, scan, detectors, ctf, max_batch_reduction, pbar=pbar
                 )
             elif reduction_scheme == "single-rechunk":
-                raise NotImplementedError
                 measurements = _single_rechunk_reduce(
-                    self, scan, detectors, ctf, max_batch_reduction
+                    self, scan, detectors, ctf, max_batch_reduction, pbar=pbar
                 )
             elif reduction_scheme == "no-chunks":
                 measurements = _no_chunks_reduce(
@@ -1373,6 +1780,275 @@ class SMatrixArray(BaseSMatrix, ArrayObject):
         )
 
 
+def _detected_wave_vectors(
+    waves: BaseWaves, detectors: list[AnnularDetector]
+) -> tuple[np.ndarray, np.ndarray]:
+    # the wave vectors of the reciprocal grid within the regions of the detectors and a
+    # mask of the wave vectors detected by each detector
+    masks = []
+    for detector in detectors:
+        if not isinstance(detector, AnnularDetector):
+            raise NotImplementedError(
+                "PRISM core-loss simulations are only implemented for annular detectors"
+            )
+
+        inner, outer = detector.angular_limits(waves)
+        masks.append(
+            _annular_detector_mask(
+                waves.gpts,
+                waves.angular_sampling,
+                inner=inner,
+                outer=outer,
+                offset=detector.offset,
+            )
+        )
+
+    masks = np.stack(masks)
+    indices = np.nonzero(masks.any(axis=0))
+
+    kx, ky = spatial_frequencies(waves.gpts, waves.sampling)
+    wave_vectors = np.stack((kx[indices[0]], ky[indices[1]]), axis=-1)
+    return wave_vectors.astype(np.float32), masks[:, indices[0], indices[1]]
+
+
+def transition_potential_prism_and_detect(
+    s_matrix: SMatrix,
+    scan: BaseScan,
+    ctf: CTF,
+    detectors: list[AnnularDetector],
+    transition_potential: BaseTransitionPotential,
+    sites: SliceIndexedAtoms | Atoms = None,
+    slice_cache: bool | int | str = True,
+    spill_to_disk: bool = False,
+    pbar: bool = False,
+) -> list[BaseMeasurements]:
+    """
+    Calculate the core-loss measurements of a scan through a single potential configuration using two scattering
+    matrices, such that the cost scales with the number of scattering sites rather than with the number of probe
+    positions times the number of sites.
+
+    The probe scattering matrix propagates the plane waves of the probe expansion forward to every slice. The detector
+    scattering matrix holds the plane waves within the detector regions, propagated backward from the exit plane to
+    every slice. At each site, the overlaps of the two scattering matrices through the transition potentials give the
+    amplitude of every detected plane wave for every plane wave of the probe, and the amplitudes at the probe
+    positions are obtained by contracting with the expansion coefficients of the probe. The overlaps are integrated
+    over a window centered on the site containing the support of the transition potentials.
+
+    Parameters
+    ----------
+    s_matrix : SMatrix
+        The scattering matrix of the probe with a potential without ensemble axes.
+    scan : BaseScan
+        Positions of the probe wave functions.
+    ctf : CTF
+        Contrast transfer function of the probe.
+    detectors : list of AnnularDetector
+        The detectors collecting the inelastically scattered electrons.
+    transition_potential : BaseTransitionPotential
+        The transition potential of the core-loss edge.
+    sites : SliceIndexedAtoms or Atoms, optional
+        The scattering sites. Default is the atoms of the potential matching the element of the transition potential.
+    slice_cache : bool or int or str, optional
+        The memory budget of the cache of transmission functions reused by the backward and forward passes through the
+        potential. If True, the budget is given by the configuration "cache.transmission-functions". If False, the
+        slices are calculated twice. Default is True.
+    spill_to_disk : bool, optional
+        If True, cached transmission functions exceeding the memory budget are stored on disk (default is False).
+    pbar : bool, optional
+        If True, show a progress bar over the slices (default is False).
+
+    Returns
+    -------
+    measurements : list of BaseMeasurements
+    """
+    potential = s_matrix.potential
+
+    if len(potential.exit_planes) > 1:
+        raise NotImplementedError(
+            "PRISM core-loss simulations are only implemented for a single exit plane"
+        )
+
+    xp = get_array_module(s_matrix.device)
+
+    # the plane waves of the probe expansion at the entrance plane
+    s_matrix_array = SMatrix(
+        semiangle_cutoff=s_matrix.semiangle_cutoff,
+        energy=s_matrix.energy,
+        extent=s_matrix.extent,
+        gpts=s_matrix.gpts,
+        interpolation=s_matrix.interpolation,
+        downsample=False,
+        device=s_matrix.device,
+    ).build(lazy=False)
+
+    # the plane waves detected at the exit plane
+    wave_vectors, detector_masks = _detected_wave_vectors(s_matrix_array, detectors)
+    detector_cutoff = max(
+        detector.angular_limits(s_matrix_array)[1] for detector in detectors
+    )
+    detector_s_matrix_array = SMatrixArray(
+        plane_waves(xp.asarray(wave_vectors), s_matrix.extent, s_matrix.gpts),
+        wave_vectors=wave_vectors,
+        semiangle_cutoff=detector_cutoff,
+        energy=s_matrix.energy,
+        extent=s_matrix.extent,
+        device=s_matrix.device,
+    )
+    detector_masks = xp.asarray(detector_masks, dtype=xp.float32)
+
+    transition_potential.grid.match(s_matrix_array)
+    transition_potential.accelerator.match(s_matrix_array)
+
+    if hasattr(transition_potential, "build"):
+        transition_potential = transition_potential.build()
+
+    transition_potential = transition_potential.copy_to_device(s_matrix.device)
+
+    if sites is None:
+        sites = potential.get_sliced_atoms()
+    elif isinstance(sites, Atoms):
+        sites = SliceIndexedAtoms(sites, slice_thickness=potential.slice_thickness)
+    elif not isinstance(sites, SliceIndexedAtoms):
+        raise ValueError(
+            f"sites must be SliceIndexedAtoms or Atoms, not {type(sites).__name__}"
+        )
+
+    ctf = ctf.copy()
+    ctf.grid.match(s_matrix_array.dummy_probes())
+    ctf.accelerator.match(s_matrix_array)
+
+    positions = xp.asarray(scan.get_positions(), dtype=xp.float32).reshape((-1, 2))
+    probe_wave_vectors = xp.asarray(s_matrix_array.wave_vectors, dtype=xp.float32)
+
+    coefficients = complex_exponential(
+        -2.0 * xp.pi * positions[:, 0, None] * probe_wave_vectors[None, :, 0]
+        - 2.0 * xp.pi * positions[:, 1, None] * probe_wave_vectors[None, :, 1]
+    )
+    coefficients = coefficients * s_matrix_array._calculate_ctf_coefficients(ctf)
+    coefficients = coefficients.astype(xp.complex64)
+
+    window_gpts = s_matrix_array.window_gpts
+    window_extent = xp.asarray(s_matrix_array.window_extent, dtype=xp.float32)
+    extent = xp.asarray(s_matrix.extent, dtype=xp.float32)
+    cropped = window_gpts != s_matrix.gpts
+
+    integration_gpts = tuple(
+        min(n, m) for n, m in zip(window_gpts, transition_potential.support_gpts())
+    )
+
+    antialias_aperture = AntialiasAperture()
+    propagator = FresnelPropagator()
+
+    if slice_cache is True:
+        max_bytes = None
+    elif slice_cache is False:
+        max_bytes = 0
+    else:
+        max_bytes = slice_cache
+
+    cache = SliceCache(
+        potential,
+        energy=s_matrix.energy,
+        antialias_aperture=antialias_aperture,
+        max_bytes=max_bytes,
+        spill_to_disk=spill_to_disk,
+        device=s_matrix.device,
+    )
+
+    pbar = TqdmWrapper(
+        enabled=pbar, total=2 * potential.num_slices, leave=False, desc="core-loss"
+    )
+
+    # the detected plane waves are propagated backward to the entrance plane, such that
+    # they are propagated forward to each slice together with the probe plane waves
+    detector_waves = detector_s_matrix_array.waves
+    for index in reversed(range(potential.num_slices)):
+        detector_waves = conventional_multislice_step(
+            detector_waves,
+            cache.get(index),
+            propagator,
+            antialias_aperture,
+            conjugate=True,
+            transpose=True,
+        )
+        pbar.update_if_exists(1)
+
+    waves = s_matrix_array.waves
+    intensities = xp.zeros((len(detectors), len(positions)), dtype=xp.float32)
+    for index in range(potential.num_slices):
+        transmission_function = cache.get(index)
+
+        waves = conventional_multislice_step(
+            waves, transmission_function, propagator, antialias_aperture
+        )
+        detector_waves = conventional_multislice_step(
+            detector_waves, transmission_function, propagator, antialias_aperture
+        )
+        pbar.update_if_exists(1)
+
+        sites_slice = transition_potential.validate_sites(
+            sites.get_atoms_in_slices(index, atomic_number=transition_potential.Z)
+        )
+
+        if len(sites_slice) == 0:
+            continue
+
+        windowed_potentials, corners = transition_potential.windowed_potentials(
+            sites_slice, integration_gpts
+        )
+        corners = copy_to_device(corners, "cpu")
+
+        for site, potentials, corner in zip(sites_slice, windowed_potentials, corners):
+            site = xp.asarray(site)
+
+            # the overlaps are integrated over a window centered on the site containing
+            # the support of the transition potentials, the windowed potentials start at
+            # the corner of the window also when it covers the full grid
+            probe_array = wrapped_crop_2d(waves.array, corner, integration_gpts)
+            detector_array = wrapped_crop_2d(
+                detector_waves.array, corner, integration_gpts
+            )
+
+            if cropped:
+                # only the probes with a cropping window containing the site are scattered
+                distances = (positions - site + extent / 2) % extent - extent / 2
+                mask = xp.all(xp.abs(distances) <= window_extent / 2, axis=1)
+                site_coefficients = coefficients[mask]
+            else:
+                mask = slice(None)
+                site_coefficients = coefficients
+
+            probe_array = probe_array.reshape((len(probe_array), -1))
+            detector_array = detector_array.reshape((len(detector_array), -1)).conj()
+
+            intensity = xp.zeros(
+                (len(detector_array), len(site_coefficients)), dtype=xp.float32
+            )
+            for transition in potentials.reshape((len(potentials), -1)):
+                matrix = xp.dot(detector_array * transition, probe_array.T)
+                intensity += abs2(xp.dot(matrix, site_coefficients.T))
+
+            intensities[:, mask] += xp.dot(detector_masks, intensity)
+
+    pbar.close_if_exists()
+
+    cache.clear()
+
+    # the expansion of an interpolated scattering matrix is normalized to the cropping
+    # window, hence the intensity of the periodic probes is larger by the area ratio
+    intensities /= np.prod(s_matrix.interpolation)
+
+    measurements = allocate_multislice_measurements(
+        s_matrix_array.dummy_probes(scan=scan, ctf=ctf), detectors, (), []
+    )
+
+    intensities = copy_to_device(intensities, "cpu")
+    for measurement, intensity in zip(measurements, intensities):
+        measurement.array[...] = intensity.reshape(scan.shape)
+
+    return measurements
+
+
 class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
     """
     The scattering matrix is used for simulating STEM experiments using the PRISM algorithm.
@@ -1409,6 +2085,11 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
 
             float :
                 Downsample to a specified maximum scattering angle [mrad].
+    partitions : int, optional
+        If given, the multislice algorithm is only run for a coarse set of parent plane waves placed on this number of
+        concentric rings (including the central plane wave). The plane waves of the full expansion are interpolated
+        from the parent plane waves when the SMatrix is reduced, and the probe positions are rounded to the nearest
+        grid point. Must be at least 2. Default is None (no partitioning).
     device : str, optional
         The calculations will be carried out on this device ('cpu' or 'gpu'). Default is 'cpu'. The default is
         determined by the user configuration.
@@ -1428,6 +2109,7 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
         interpolation: int | tuple[int, int] = 1,
         downsample: bool | str = "cutoff",
         # tilt: Tuple[float, float] = (0.0, 0.0),
+        partitions: int = None,
         device: str = None,
         store_on_host: bool = False,
     ):
@@ -1457,6 +2139,11 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
 
         self._store_on_host = store_on_host
 
+        if partitions is not None and partitions < 2:
+            raise ValueError("the number of partitions must be at least 2")
+
+        self._partitions = partitions
+
         assert semiangle_cutoff > 0.0
 
         if not all(n % f == 0 for f, n in zip(self.interpolation, self.gpts)):
@@ -1531,6 +2218,17 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
     def wave_vectors(self) -> np.ndarray:
         self.grid.check_is_defined()
         self.accelerator.check_is_defined()
+
+        if self.partitions is not None:
+            return partitioned_prism_wave_vectors(
+                self.semiangle_cutoff,
+                self.extent,
+                self.energy,
+                num_rings=self.partitions,
+                interpolation=self.interpolation,
+                xp=get_array_module(self.device),
+            )
+
         dummy_probes = self.dummy_probes(device="cpu")
 
         aperture = dummy_probes.aperture._evaluate_kernel(dummy_probes)
@@ -1548,6 +2246,10 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
         xp = get_array_module(self.device)
         return xp.asarray([kx, ky]).T
 
+    @property
+    def partitions(self) -> int | None:
+        return self._partitions
+
     @property
     def potential(self) -> BasePotential:
         """The potential described by the SMatrix."""
@@ -1779,6 +2481,15 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
         """
         lazy = _validate_lazy(lazy)
 
+        if (
+            self.partitions is not None
+            and self.potential is not None
+            and len(self.potential.exit_planes) > 1
+        ):
+            raise NotImplementedError(
+                "partitioned SMatrix not implemented for multiple exit planes"
+            )
+
         downsampled_gpts = self.downsampled_gpts
 
         s_matrix_blocks = self.ensemble_blocks(1)
@@ -1870,12 +2581,19 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
                 self.window_gpts, self.sampling
             )
 
+        if self.partitions is not None:
+            # the reduction removes the phase accumulated by the parent plane waves
+            waves.metadata["accumulated_defocus"] = (
+                self.potential.thickness if self.potential is not None else 0.0
+            )
+
         s_matrix_array = SMatrixArray._from_waves(
             waves,
             wave_vectors=self.wave_vectors,
             interpolation=self.interpolation,
             semiangle_cutoff=self.semiangle_cutoff,
             window_gpts=self.window_gpts,
+            partitions=self.partitions,
             device=self.device,
         )
 
@@ -1915,10 +2633,10 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
             parallelization, but requires more memory and floating point operations. If 'auto' (default), the batch size
             is automatically chosen based on the abtem user configuration settings "dask.chunk-size" and
             "dask.chunk-size-gpu".
-        reduction_scheme : str or tuple of int, optional
+        reduction_scheme : str, optional
             Parallel reduction of the SMatrix requires rechunking the Dask array from chunking along the expansion axis
-            to chunking over the spatial axes. If given as a tuple of int of length the SMatrix is rechunked to have
-            those chunks. If 'auto' (default) the chunks are taken to be identical to the interpolation factor.
+            to chunking over the spatial axes. One of 'no-chunks', 'single-rechunk', 'multiple-rechunk' or 'auto'
+            (default), see `SMatrixArray.reduce`.
         disable_s_matrix_chunks : bool, optional
             If True, each S-Matrix is kept as a single chunk, thus lowering the communication overhead, but providing
             fewer opportunities for parallelization.
@@ -1955,7 +2673,9 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
             lazy=lazy,
         )
 
-    def _eager_build_s_matrix_detect(self, scan, ctf, detectors, squeeze):
+    def _eager_build_s_matrix_detect(
+        self, scan, ctf, detectors, squeeze, detect_func=None
+    ):
         extra_ensemble_axes_shape = ()
         extra_ensemble_axes_metadata = []
         for shape, axis_metadata in zip(
@@ -1989,11 +2709,17 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
 
         for i, _, s_matrix in self.generate_blocks(1):
             s_matrix = s_matrix.item()
-            s_matrix_array = s_matrix.build(lazy=False)
 
-            new_measurements = s_matrix_array.reduce(
-                scan=scan, detectors=detectors, ctf=ctf
-            )
+            if detect_func is None:
+                s_matrix_array = s_matrix.build(lazy=False)
+
+                new_measurements = s_matrix_array.reduce(
+                    scan=scan, detectors=detectors, ctf=ctf
+                )
+            else:
+                new_measurements = detect_func(
+                    s_matrix, scan=scan, ctf=ctf, detectors=detectors
+                )
 
             new_measurements = ensure_list(new_measurements)
 
@@ -2017,11 +2743,59 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
 
         return measurements
 
+    def _lazy_detect(self, scan, ctf, detectors, detect_func=None):
+        # each SMatrix of the ensemble is built and detected in a single task
+        blocks = self.ensemble_blocks(1)
+
+        chunks = ()
+        drop_axis = ()
+        if not self.ensemble_shape:
+            drop_axis = (0,)
+            new_axis = tuple_range(
+                offset=0, length=len(scan.shape) + len(ctf.ensemble_shape)
+            )
+        else:
+            chunks += blocks.chunks
+            new_axis = tuple_range(
+                offset=len(blocks.shape),
+                length=len(scan.shape) + len(ctf.ensemble_shape),
+            )
+
+        chunks += ctf.ensemble_shape + scan.shape
+
+        arrays = blocks.map_blocks(
+            self._lazy_build_s_matrix_detect,
+            drop_axis=drop_axis,
+            new_axis=new_axis,
+            chunks=chunks,
+            scan=scan,
+            ctf=ctf,
+            detectors=detectors,
+            detect_func=detect_func,
+            meta=np.array((), dtype=object),
+        )
+
+        waves = self.build(lazy=True).dummy_probes(scan=scan)
+
+        extra_axes_metadata = []
+        if self.potential is not None:
+            extra_axes_metadata = self.potential.ensemble_axes_metadata
+
+        extra_axes_metadata = extra_axes_metadata + ctf.ensemble_axes_metadata
+
+        return _finalize_lazy_measurements(
+            arrays, waves, detectors, extra_axes_metadata
+        )
+
     @staticmethod
-    def _lazy_build_s_matrix_detect(s_matrix, scan, ctf, detectors):
+    def _lazy_build_s_matrix_detect(s_matrix, scan, ctf, detectors, detect_func=None):
         s_matrix = s_matrix.item()
         measurements = s_matrix._eager_build_s_matrix_detect(
-            scan=scan, ctf=ctf, detectors=detectors, squeeze=False
+            scan=scan,
+            ctf=ctf,
+            detectors=detectors,
+            squeeze=False,
+            detect_func=detect_func,
         )
         # measurements = ensure_list(measurements)
 
@@ -2066,8 +2840,8 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
             "dask.chunk-size-gpu".
         reduction_scheme : str, optional
             Parallel reduction of the SMatrix requires rechunking the Dask array from chunking along the expansion axis
-            to chunking over the spatial axes. If given as a tuple of int of length the SMatrix is rechunked to have
-            those chunks. If 'auto' (default) the chunks are taken to be identical to the interpolation factor.
+            to chunking over the spatial axes. One of 'no-chunks', 'single-rechunk', 'multiple-rechunk' or 'auto'
+            (default), see `SMatrixArray.reduce`.
         disable_s_matrix_chunks : bool, optional
             If True, each S-Matrix is kept as a single chunk, thus lowering the communication overhead, but providing
             fewer opportunities for parallelization.
@@ -2106,55 +2880,111 @@ class SMatrix(BaseSMatrix, Ensemble, CopyMixin, EqualityMixin):
 
         if disable_s_matrix_chunks:
             scan = validate_scan(scan, self)
+            measurements = self._lazy_detect(scan, ctf, detectors)
+            return _wrap_measurements(measurements)
 
-            blocks = self.ensemble_blocks(1)
+        s_matrix_array = self.build(max_batch=max_batch_multislice, lazy=lazy)
+        return s_matrix_array.reduce(
+            scan=scan,
+            detectors=detectors,
+            reduction_scheme=reduction_scheme,
+            max_batch_reduction=max_batch_reduction,
+            ctf=ctf,
+        )
 
-            chunks = ()
-            drop_axis = ()
-            if not self.ensemble_shape:
-                drop_axis = (0,)
-                new_axis = tuple_range(
-                    offset=0, length=len(scan.shape) + len(ctf.ensemble_shape)
-                )
-            else:
-                chunks += blocks.chunks
-                new_axis = tuple_range(
-                    offset=len(blocks.shape),
-                    length=len(scan.shape) + len(ctf.ensemble_shape),
-                )
+    def transition_potential_scan(
+        self,
+        transition_potential: BaseTransitionPotential,
+        scan: np.ndarray | BaseScan = None,
+        detectors: AnnularDetector | list[AnnularDetector] = None,
+        ctf: CTF | dict = None,
+        sites: SliceIndexedAtoms | Atoms = None,
+        slice_cache: bool | int | str = True,
+        spill_to_disk: bool = False,
+        lazy: bool = None,
+    ) -> BaseMeasurements | list[BaseMeasurements]:
+        """
+        Simulate a core-loss scan using the PRISM algorithm. A second scattering matrix of the plane waves within the
+        detector regions is propagated backward from the exit plane, such that the inelastic scattering at each site is
+        calculated once for all the plane waves of the probe expansion, instead of running a double-channel multislice
+        calculation for every probe position as in `Probe.transition_potential_scan`.
 
-            chunks += ctf.ensemble_shape + scan.shape
-
-            arrays = blocks.map_blocks(
-                self._lazy_build_s_matrix_detect,
-                drop_axis=drop_axis,
-                new_axis=new_axis,
-                chunks=chunks,
-                scan=scan,
-                ctf=ctf,
-                detectors=detectors,
-                meta=np.array((), dtype=object),
+        Parameters
+        ----------
+        transition_potential : BaseTransitionPotential
+            The transition potential of the core-loss edge.
+        scan : BaseScan
+            Positions of the probe wave functions. If not given, scans across the entire potential at Nyquist sampling.
+        detectors : AnnularDetector or list of AnnularDetector, optional
+            The detectors collecting the inelastically scattered electrons. Only annular detectors are implemented.
+            Default is an annular detector collecting up to the semiangle cutoff of the SMatrix.
+        ctf : CTF
+            Contrast transfer function used for calculating the expansion coefficients of the probe.
+        sites : SliceIndexedAtoms or Atoms, optional
+            The scattering sites. Default is the atoms of the potential matching the element of the transition potential.
+        slice_cache : bool or int or str, optional
+            The transmission functions of the potential slices are cached and reused by the backward pass of the
+            detector plane waves and the forward pass of the probe plane waves. An integer or a string such as "2 GB"
+            sets the memory budget of the cache, if True (default) the budget is given by the configuration
+            "cache.transmission-functions". If False, the slices are calculated in both passes.
+        spill_to_disk : bool, optional
+            If True, cached transmission functions exceeding the memory budget are stored on disk. Default is False.
+        lazy : bool, optional
+            If True, create the measurements lazily, otherwise, calculate instantly. If None, this defaults to the value
+            set in the configuration file.
+
+        Returns
+        -------
+        measurements : BaseMeasurements or list of BaseMeasurements
+            The detected core-loss measurements.
+        """
+        if self.potential is None:
+            raise ValueError("a potential is required for core-loss simulations")
+
+        if self.partitions is not None:
+            raise NotImplementedError(
+                "core-loss simulations are not implemented for a partitioned SMatrix"
+            )
+
+        if scan is None:
+            scan = GridScan(
+                start=(0, 0),
+                end=self.extent,
+                sampling=self.dummy_probes().aperture.nyquist_sampling,
             )
 
-            waves = self.build(lazy=True).dummy_probes(scan=scan)
+        if detectors is None:
+            detectors = AnnularDetector(inner=0.0, outer=self.semiangle_cutoff)
 
-            extra_axes_metadata = []
-            if self.potential is not None:
-                extra_axes_metadata = self.potential.ensemble_axes_metadata
+        detectors = validate_detectors(detectors)
 
-            extra_axes_metadata = extra_axes_metadata + ctf.ensemble_axes_metadata
+        if ctf is None:
+            ctf = CTF(semiangle_cutoff=self.semiangle_cutoff)
+        elif isinstance(ctf, dict):
+            ctf = CTF(semiangle_cutoff=self.semiangle_cutoff, **ctf)
 
-            measurements = _finalize_lazy_measurements(
-                arrays, waves, detectors, extra_axes_metadata
+        if ctf.ensemble_shape:
+            raise NotImplementedError(
+                "core-loss simulations are not implemented for an ensemble of CTFs"
             )
 
-            return _wrap_measurements(measurements)
-
-        s_matrix_array = self.build(max_batch=max_batch_multislice, lazy=lazy)
-        return s_matrix_array.reduce(
-            scan=scan,
-            detectors=detectors,
-            reduction_scheme=reduction_scheme,
-            max_batch_reduction=max_batch_reduction,
-            ctf=ctf,
+        lazy = _validate_lazy(lazy)
+        scan = validate_scan(scan, self)
+
+        detect_func = partial(
+            transition_potential_prism_and_detect,
+            transition_potential=transition_potential,
+            sites=sites,
+            slice_cache=slice_cache,
+            spill_to_disk=spill_to_disk,
+            pbar=config.get("diagnostics.task_progress", False),
         )
+
+        if lazy:
+            measurements = self._lazy_detect(scan, ctf, detectors, detect_func)
+        else:
+            measurements = self._eager_build_s_matrix_detect(
+                scan, ctf, detectors, squeeze=True, detect_func=detect_func
+            )
+
+        return _wrap_measurements(measurements)
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import itertools
 from abc import abstractmethod
+from functools import partial
 from typing import TYPE_CHECKING, Optional, Sequence, Tuple, Union
 
 import dask.array as da
@@ -1077,3 +1078,87 @@ class GridScan(HasGrid2DMixin, BaseScan):
             **kwargs,
         )
         ax.add_patch(rect)
+
+
+class _WindowedScan(BaseScan):
+    """
+    Scan evaluated on periodic windows of grid points centred on each of its positions. The ensemble axes are those
+    of the wrapped scan, while the positions are given relative to the lower corner of their windows, such that the
+    probes are built directly on the windows.
+
+    Parameters
+    ----------
+    scan : BaseScan
+        The wrapped scan.
+    window_gpts : two int
+        Number of grid points of the windows.
+    sampling : two float
+        Lateral sampling of the windows [Å].
+    """
+
+    def __init__(
+        self,
+        scan: BaseScan,
+        window_gpts: tuple[int, int],
+        sampling: tuple[float, float],
+    ):
+        self._scan = scan
+        self._window_gpts = window_gpts
+        self._sampling = sampling
+        super().__init__()
+
+    @property
+    def scan(self) -> BaseScan:
+        """The wrapped scan."""
+        return self._scan
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self._scan.shape
+
+    @property
+    def _default_ensemble_chunks(self):
+        return self._scan._default_ensemble_chunks
+
+    @property
+    def ensemble_axes_metadata(self) -> list[AxisMetadata]:
+        return self._scan.ensemble_axes_metadata
+
+    @property
+    def limits(self):
+        return self._scan.limits
+
+    def match_probe(self, probe: Probe | BaseSMatrix):
+        self._scan.match_probe(probe)
+
+    def _sort_into_extents(self, extents):
+        scan, chunks = self._scan._sort_into_extents(extents)
+        new_scan = _WindowedScan(
+            scan, window_gpts=self._window_gpts, sampling=self._sampling
+        )
+        return new_scan, chunks
+
+    def _partition_args(self, chunks=None, lazy: bool = True):
+        return self._scan._partition_args(chunks, lazy=lazy)
+
+    @staticmethod
+    def _from_partitioned_args_func(*args, scan_partial, window_gpts, sampling):
+        scan = scan_partial(*args).item()
+        new_scan = _WindowedScan(scan, window_gpts=window_gpts, sampling=sampling)
+        return _wrap_with_array(new_scan, len(scan.ensemble_shape))
+
+    def _from_partitioned_args(self):
+        return partial(
+            self._from_partitioned_args_func,
+            scan_partial=self._scan._from_partitioned_args(),
+            window_gpts=self._window_gpts,
+            sampling=self._sampling,
+        )
+
+    def get_positions(self) -> np.ndarray:
+        positions = self._scan.get_positions()
+        sampling = np.array(self._sampling)
+
+        # the lower corners of the windows are the same as those of `minimum_crop`
+        corners = np.rint(positions / sampling - np.array(self._window_gpts) // 2)
+        return (positions - corners * sampling).astype(positions.dtype)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import copy
 import itertools
 from abc import abstractmethod
 from typing import Sequence
@@ -250,9 +251,7 @@ class SliceIndexedAtoms(BaseSlicedAtoms):
     ):
         super().__init__(atoms, slice_thickness)
 
-        labels = np.digitize(
-            self.atoms.positions[:, 2], np.cumsum(self.slice_thickness)
-        )
+        self._labels = self._slice_labels(self.atoms.positions[:, 2])
 
         # method="closest"
         # labels = find_closest_indices(
@@ -260,9 +259,49 @@ class SliceIndexedAtoms(BaseSlicedAtoms):
         # )
 
         self._slice_index = [
-            indices for indices in label_to_index(labels, max_label=len(self) - 1)
+            indices
+            for indices in label_to_index(self._labels, max_label=len(self) - 1)
         ]
 
+    def _slice_labels(self, z: np.ndarray) -> np.ndarray:
+        return np.digitize(z, np.cumsum(self.slice_thickness))
+
+    def displace(self, positions: np.ndarray) -> SliceIndexedAtoms:
+        """
+        The sliced atoms with the atoms moved to new positions. Only the atoms moving across a slice boundary are
+        re-indexed, such that small displacements, e.g. of frozen phonons, do not require sorting all the atoms again.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            The new positions of the atoms [Å].
+
+        Returns
+        -------
+        sliced_atoms : SliceIndexedAtoms
+        """
+        atoms = self.atoms.copy()
+        atoms.positions[:] = positions
+
+        labels = self._slice_labels(atoms.positions[:, 2])
+        moved = np.flatnonzero(labels != self._labels)
+        old_labels, new_labels = self._labels[moved], labels[moved]
+
+        slice_index = list(self._slice_index)
+        for i in np.unique(np.concatenate((old_labels, new_labels))):
+            if i >= len(slice_index):
+                continue
+
+            indices = slice_index[i]
+            indices = indices[~np.isin(indices, moved[old_labels == i])]
+            slice_index[i] = np.concatenate((indices, moved[new_labels == i]))
+
+        displaced = copy.copy(self)
+        displaced._atoms = atoms
+        displaced._labels = labels
+        displaced._slice_index = slice_index
+        return displaced
+
     def get_atoms_in_slices(
         self, first_slice: int, last_slice: int = None, atomic_number: int = None
     ) -> Atoms:
@@ -164,6 +164,51 @@ class ArrayObjectTransform(
         """
         return (array_object.base_shape,)
 
+    def _out_base_chunks(
+        self,
+        array_object: ArrayObjectType,
+        ensemble_chunks: tuple[tuple[int, ...], ...],
+    ) -> tuple[tuple[tuple[int, ...], ...], ...]:
+        """
+        Chunks of the base axes of the array object created by the transformation. The base axes have a single
+        chunk, unless they replace chunked ensemble axes of the input.
+
+        Parameters
+        ----------
+        array_object : ArrayObject
+            The array object to derive the chunks of the output array object from.
+        ensemble_chunks : tuple of tuple of int
+            The chunks of the ensemble axes of the array object.
+
+        Returns
+        -------
+        base_chunks : tuple of tuple of int
+        """
+        return tuple(
+            tuple((n,) for n in base_shape)
+            for base_shape in self._out_base_shape(array_object)
+        )
+
+    def _ensemble_axis_blocks(
+        self, axis: AxisMetadata, chunks: tuple[tuple[int, ...]]
+    ) -> da.core.Array:
+        """
+        The metadata of an ensemble axis of the array object to transform split into the blocks given by the chunks.
+
+        Parameters
+        ----------
+        axis : AxisMetadata
+            The metadata of the ensemble axis.
+        chunks : tuple of tuple of int
+            The chunks of the ensemble axis.
+
+        Returns
+        -------
+        axis_blocks : dask.array.Array
+            An array of the metadata of each block.
+        """
+        return axis._to_blocks(chunks)
+
     def _out_shape(self, array_object: ArrayObjectType) -> tuple[tuple[int, ...], ...]:
         ensemble_shapes = self._out_ensemble_shape(array_object)
 
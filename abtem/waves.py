@@ -59,10 +59,11 @@ from abtem.measurements import (
 )
 from abtem.multislice import (
     MultisliceTransform,
+    _validate_window_gpts,
     transition_potential_multislice_and_detect,
 )
 from abtem.potentials.iam import BasePotential, validate_potential
-from abtem.scan import BaseScan, CustomScan, GridScan, validate_scan
+from abtem.scan import BaseScan, CustomScan, GridScan, _WindowedScan, validate_scan
 from abtem.slicing import SliceIndexedAtoms
 from abtem.tilt import _validate_tilt
 from abtem.transfer import CTF, Aberrations, Aperture, BaseAperture
@@ -1719,6 +1720,7 @@ class Probe(_WavesBuilder):
         max_batch: int | str = "auto",
         lazy: Optional[bool] = None,
         potential=None,
+        window_gpts: Optional[int | tuple[int, int]] = None,
     ):
         self.check_can_build(potential)
         lazy = _validate_lazy(lazy)
@@ -1735,6 +1737,18 @@ class Probe(_WavesBuilder):
         else:
             squeeze = False
 
+        if window_gpts is not None:
+            # the positions axis is needed to find the windows, hence it is only
+            # squeezed from the measurements, see `_reduce_ensemble`
+            if squeeze:
+                scan._squeeze = True
+                squeeze = False
+
+            # the probes are built directly on the windows centred on their positions
+            window_gpts = _validate_window_gpts(window_gpts, probe.gpts)
+            scan = _WindowedScan(scan, window_gpts=window_gpts, sampling=probe.sampling)
+            probe._grid = Grid(gpts=window_gpts, sampling=probe.sampling)
+
         probe._positions = scan
 
         if not lazy:
@@ -1782,6 +1796,11 @@ class Probe(_WavesBuilder):
         detectors: Optional[BaseDetector] = None,
         max_batch: int | str = "auto",
         lazy: Optional[bool] = None,
+        slice_cache: bool | int | str = False,
+        window_gpts: Optional[int | tuple[int, int]] = None,
+        stream_ensemble: bool = False,
+        precision: Optional[float] = None,
+        return_variance: bool = False,
     ) -> Waves | BaseMeasurements | list[Waves | BaseMeasurements]:
         """
         Run the multislice algorithm for probe wave functions at the provided positions.
@@ -1802,6 +1821,28 @@ class Probe(_WavesBuilder):
         lazy : bool, optional
             If True, create the wave functions lazily, otherwise, calculate instantly. If None, this defaults to the
             setting in the user configuration file.
+        slice_cache : bool or int or str, optional
+            If given, the transmission functions of the potential are cached on each worker and reused by every chunk
+            of probe positions, instead of being recalculated for each chunk. An integer or a string such as "2 GB"
+            sets the memory budget of the cache. If True, the budget is given by the configuration
+            "cache.transmission-functions". Default is False.
+        window_gpts : int or two int, optional
+            If given, each probe is propagated on a periodic window of this number of grid points around its scan
+            position, with the potential slices cropped to the same window. The window should be large enough to
+            contain the spread of the probe through the specimen. The exit waves and diffraction patterns have the
+            gpts of the window. Default is None, propagating the probes over the full potential.
+        stream_ensemble : bool, optional
+            If True, the measurements of the frozen phonon configurations are averaged as they are calculated within
+            each chunk of probe positions, such that the memory is independent of the number of configurations.
+            Default is False.
+        precision : float, optional
+            If given, the frozen phonon ensemble is streamed and each chunk of probe positions stops calculating new
+            configurations once the standard error of the mean measurement relative to the mean, measured as the
+            ratio of their 2-norms, is below this value. The chunks stop independently, hence they may average
+            different numbers of configurations. Default is None, calculating every configuration.
+        return_variance : bool, optional
+            If True, the frozen phonon ensemble is streamed and the variance of the mean (i.e. the squared standard
+            error) of each measurement is returned after the means. Default is False.
 
         Returns
         -------
@@ -1811,9 +1852,23 @@ class Probe(_WavesBuilder):
         potential = validate_potential(potential)
 
         probes = self._validate_and_build(
-            scan=scan, max_batch=max_batch, lazy=lazy, potential=potential
+            scan=scan,
+            max_batch=max_batch,
+            lazy=lazy,
+            potential=potential,
+            window_gpts=window_gpts,
         )
-        multislice = MultisliceTransform(potential, detectors)
+
+        multislice = MultisliceTransform(
+            potential,
+            detectors,
+            slice_cache=slice_cache,
+            window_gpts=window_gpts,
+            stream_ensemble=stream_ensemble,
+            precision=precision,
+            return_variance=return_variance,
+        )
+
         measurements = probes.apply_transform(multislice)
 
         return _reduce_ensemble(measurements)
@@ -1830,6 +1885,8 @@ class Probe(_WavesBuilder):
         threshold: float = 1.0,
         max_batch: int | str = "auto",
         lazy: Optional[bool] = None,
+        slice_cache: bool | int | str = False,
+        spill_to_disk: bool = False,
     ) -> Waves | BaseMeasurements | list[Waves | BaseMeasurements]:
         """
         Parameters
@@ -1865,6 +1922,14 @@ class Probe(_WavesBuilder):
         lazy : bool, optional
             A boolean indicating whether to use lazy evaluation for the calculations.
             Defaults to None.
+        slice_cache : bool | int | str, optional
+            If given, the transmission functions of the potential slices are cached and
+            reused by every inelastic branch of the double channel calculation. An
+            integer or a string such as "2 GB" sets the memory budget of the cache.
+            Defaults to False.
+        spill_to_disk : bool, optional
+            If True, cached transmission functions exceeding the memory budget are
+            stored on disk. Defaults to False.
 
         Returns
         -------
@@ -1892,6 +1957,8 @@ class Probe(_WavesBuilder):
             sites=sites,
             double_channel=double_channel,
             threshold=threshold,
+            slice_cache=slice_cache,
+            spill_to_disk=spill_to_disk,
         )
 
         measurements = probes.apply_transform(multislice)
@@ -1905,6 +1972,11 @@ class Probe(_WavesBuilder):
         detectors: Optional[BaseDetector | Sequence[BaseDetector]] = None,
         max_batch: int | str = "auto",
         lazy: Optional[bool] = None,
+        slice_cache: bool | int | str = False,
+        window_gpts: Optional[int | tuple[int, int]] = None,
+        stream_ensemble: bool = False,
+        precision: Optional[float] = None,
+        return_variance: bool = False,
     ) -> BaseMeasurements | Waves | list[BaseMeasurements | Waves]:
         """
         Run the multislice algorithm from probe wave functions over the provided scan.
@@ -1925,6 +1997,22 @@ class Probe(_WavesBuilder):
         lazy : bool, optional
             If True, create the measurements lazily, otherwise, calculate instantly. If None, this defaults to the value
             set in the configuration file.
+        slice_cache : bool or int or str, optional
+            If given, the transmission functions of the potential are cached on each worker and reused by every chunk
+            of probe positions. An integer or a string such as "2 GB" sets the memory budget of the cache. Default is
+            False.
+        window_gpts : int or two int, optional
+            If given, each probe is propagated on a periodic window of this number of grid points around its scan
+            position instead of the full potential. Default is None.
+        stream_ensemble : bool, optional
+            If True, the measurements of the frozen phonon configurations are averaged as they are calculated, such
+            that the memory is independent of the number of configurations. Default is False.
+        precision : float, optional
+            If given, the frozen phonon ensemble is streamed and stops once the relative standard error of the mean
+            measurement is below this value, independently for each chunk of probe positions (see
+            :meth:`.Probe.multislice`). Default is None.
+        return_variance : bool, optional
+            If True, the squared standard error of each measurement is returned after the means. Default is False.
 
         Returns
         -------
@@ -1946,6 +2034,11 @@ class Probe(_WavesBuilder):
             detectors=detectors,
             lazy=lazy,
             max_batch=max_batch,
+            slice_cache=slice_cache,
+            window_gpts=window_gpts,
+            stream_ensemble=stream_ensemble,
+            precision=precision,
+            return_variance=return_variance,
         )
 
         return measurements
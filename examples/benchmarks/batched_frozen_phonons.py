@@ -0,0 +1,81 @@
+"""Benchmark of preparing the sliced atoms of every frozen phonon configuration.
+
+Previously the atoms of every configuration were transformed to the potential box,
+padded by repeating the atoms in all directions and cropping the repeated atoms, and
+grouped into slices from scratch. Now the transformed reference atoms, and for the
+infinite projection the slice index of the reference, are prepared once and cached, the
+padding selects the images within the margins with a mask along each axis, and the slice
+index of each configuration is updated only for the atoms displaced across a slice
+boundary. The previous pipeline is reproduced for each configuration below.
+"""
+
+import time
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+from abtem.atoms import atoms_in_cell
+from abtem.potentials.iam import reference_atoms_cache
+
+
+def timeit(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def previous_pad_atoms(atoms, margins, directions):
+    reps = [1, 1, 1]
+    for axis, direction in enumerate("xyz"):
+        if direction in directions:
+            reps[axis] = int(1 + 2 * np.ceil(margins / atoms.cell[axis, axis]))
+
+    padded = atoms * reps
+    padded.positions[:] -= atoms.cell.sum(axis=0) * [rep // 2 for rep in reps]
+    padded.cell = atoms.cell
+    return atoms_in_cell(padded, margins)
+
+
+def previous_sliced_atoms(configuration):
+    margins = configuration._margins()
+    atoms = configuration.frozen_phonons.randomize(
+        configuration.get_transformed_atoms()
+    )
+    atoms.wrap(eps=0.0)
+    atoms = previous_pad_atoms(atoms, margins, "z" if margins == 0.0 else "xyz")
+    return configuration._slice_atoms(atoms, margins)
+
+
+def sliced_atoms_per_configuration(potential, previous=False):
+    return [
+        previous_sliced_atoms(configuration.item())
+        if previous
+        else configuration.item().get_sliced_atoms()
+        for _, _, configuration in potential.generate_blocks()
+    ]
+
+
+if __name__ == "__main__":
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (30, 30, 30)
+    num_configs = 4
+    frozen_phonons = abtem.FrozenPhonons(atoms, num_configs, 0.1, seed=1)
+
+    print(f"atoms: {len(atoms)}, configurations: {num_configs}")
+    for projection in ("infinite", "finite"):
+        kwargs = {"sampling": 0.1, "slice_thickness": 2, "projection": projection}
+
+        potential = abtem.Potential(frozen_phonons, **kwargs)
+        t_previous = timeit(
+            lambda: sliced_atoms_per_configuration(potential, previous=True)
+        )
+
+        reference_atoms_cache.clear()
+        potential = abtem.Potential(frozen_phonons, **kwargs)
+        t_batched = timeit(lambda: sliced_atoms_per_configuration(potential))
+
+        print(
+            f"{projection}: previous: {t_previous / num_configs:.2f} s, "
+            f"batched: {t_batched / num_configs:.2f} s per configuration "
+            f"({t_previous / t_batched:.1f}x)"
+        )
@@ -0,0 +1,52 @@
+"""Benchmark of the cached FFTW convolution used by the Fresnel propagator.
+
+Convolves batches of alternating sizes, as produced by the final partial chunk of a
+scan or by tilt ensembles, and compares `CachedFFTWConvolution` with the
+uncached `fft2_convolve`, both in place and out of place.
+"""
+
+import time
+
+import numpy as np
+import pyfftw
+
+import abtem
+from abtem.core.fft import CachedFFTWConvolution, fft2_convolve
+
+abtem.config.set({"fft": "fftw"})
+
+
+def run(convolve, batch_sizes, gpts, kernel, overwrite_x, repeats=5):
+    arrays = [
+        pyfftw.byte_align(
+            np.random.rand(batch, *gpts).astype(np.complex64)
+            + 1j * np.random.rand(batch, *gpts).astype(np.complex64)
+        )
+        for batch in batch_sizes
+    ]
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for array in arrays:
+            convolve(array, kernel, overwrite_x=overwrite_x)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    gpts = (512, 512)
+    kernel = np.exp(1j * np.random.rand(*gpts)).astype(np.complex64)
+
+    for batch_sizes in ((1, 1, 1, 1), (8, 3, 8, 3), (32, 7, 32, 7)):
+        for overwrite_x in (True, False):
+            convolution = CachedFFTWConvolution()
+            t_uncached = run(fft2_convolve, batch_sizes, gpts, kernel, overwrite_x)
+            t_cached = run(convolution, batch_sizes, gpts, kernel, overwrite_x)
+
+            print(
+                f"batches: {batch_sizes}, in place: {overwrite_x}, "
+                f"fft2_convolve: {t_uncached:.3f} s, cached: {t_cached:.3f} s, "
+                f"speedup: {t_uncached / t_cached:.2f}x, "
+                f"plans: {convolution.cache_info()['size']}"
+            )
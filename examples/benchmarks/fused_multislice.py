@@ -0,0 +1,99 @@
+"""Benchmark of the fused cpu multislice step.
+
+Compares the conventional multislice step (`method="conventional"`) with the fused
+in-place step (`method="fused"`). Besides the run time, the memory allocated by each
+step is measured with `tracemalloc` as a proxy for the memory traffic caused by
+temporary arrays.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+from abtem.antialias import AntialiasAperture
+from abtem.multislice import (
+    FresnelPropagator,
+    FusedMultisliceStep,
+    conventional_multislice_step,
+    multislice_and_detect,
+)
+
+abtem.config.set({"diagnostics.progress_bar": False, "fft": "fftw"})
+
+
+def run(waves, potential, method, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        multislice_and_detect(waves, potential, method=method)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def allocated_per_slice(waves, transmission_functions, step):
+    waves = waves.copy()
+    allocated = []
+    tracemalloc.start()
+    for transmission_function in transmission_functions:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        waves = step(waves, transmission_function)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - current)
+    tracemalloc.stop()
+    # the first step includes planning the FFTs
+    return np.mean(allocated[1:])
+
+
+if __name__ == "__main__":
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (4, 4, 10)
+
+    potential = abtem.Potential(atoms, gpts=512, slice_thickness=2).build(lazy=False)
+
+    probe = abtem.Probe(energy=100e3, semiangle_cutoff=20)
+    probe.grid.match(potential)
+
+    scan = abtem.GridScan((0, 0), (5.43, 5.43), gpts=(4, 4))
+    waves = probe.build(scan, lazy=False)
+
+    # warm up the numba kernels and the FFTW plans
+    for method in ("conventional", "fused"):
+        multislice_and_detect(waves, potential[:1], method=method)
+
+    print(f"slices: {potential.num_slices}, batch: {waves.shape[:-2]}")
+
+    t_conventional = run(waves, potential, "conventional")
+    t_fused = run(waves, potential, "fused")
+
+    antialias_aperture = AntialiasAperture()
+    transmission_functions = [
+        antialias_aperture.bandlimit(
+            potential_slice.transmission_function(waves.energy), in_place=False
+        )
+        for potential_slice in potential.generate_slices()
+    ]
+
+    propagator = FresnelPropagator()
+
+    def conventional_step(waves, transmission_function):
+        return conventional_multislice_step(
+            waves, transmission_function, propagator, antialias_aperture
+        )
+
+    m_conventional = allocated_per_slice(
+        waves, transmission_functions, conventional_step
+    )
+    m_fused = allocated_per_slice(
+        waves, transmission_functions, FusedMultisliceStep(antialias_aperture)
+    )
+
+    print(f"conventional: {t_conventional:.3f} s, {m_conventional / 1e3:.1f} kB/slice")
+    print(f"fused:        {t_fused:.3f} s, {m_fused / 1e3:.1f} kB/slice")
+    print(f"speedup:      {t_conventional / t_fused:.2f}x")
+
+    conventional = multislice_and_detect(waves, potential, method="conventional")
+    fused = multislice_and_detect(waves, potential, method="fused")
+    assert np.allclose(conventional[0].array, fused[0].array, atol=1e-4)
@@ -0,0 +1,81 @@
+"""Benchmark of building a potential with `GaussianProjectionIntegrals` for a cell with
+several species.
+
+The delta functions of the Gaussian terms and the correction of each species in a slice
+are transformed by a single batched fft, using a scratch buffer reused for every
+species, such that the memory does not grow with the number of species. The number of
+fft calls and the number of transformed 2D arrays per slice are counted by wrapping the
+fft functions used by the integrator, and the peak memory allocated by numpy is
+measured with tracemalloc. The previous implementation called the fft once per Gaussian
+term and once per correction of each species, i.e. (number of terms + 1) times the
+number of species, plus the inverse fft.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+import abtem.integrals
+from abtem.integrals import GaussianProjectionIntegrals
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+class FFTCounter:
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+        self.transforms = 0
+
+    def __call__(self, x, *args, **kwargs):
+        self.calls += 1
+        self.transforms += int(np.prod(x.shape[:-2]))
+        return self.func(x, *args, **kwargs)
+
+
+def build(atoms, gpts):
+    potential = abtem.Potential(
+        atoms,
+        gpts=gpts,
+        slice_thickness=2,
+        integrator=GaussianProjectionIntegrals(),
+    )
+    tracemalloc.start()
+    start = time.perf_counter()
+    array = potential.build(lazy=False).array
+    wall_time = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - array.nbytes
+    tracemalloc.stop()
+    return wall_time, peak, potential.num_slices
+
+
+if __name__ == "__main__":
+    atoms = bulk("NaCl", "rocksalt", a=5.64, cubic=True) * (4, 4, 4)
+    atoms.numbers[::7] = 8
+    atoms.numbers[::11] = 79
+    num_species = len(np.unique(atoms.numbers))
+
+    # warm up the numba kernels and the fftw plans
+    build(atoms[:8], 512)
+
+    fft2 = abtem.integrals.fft2 = FFTCounter(abtem.integrals.fft2)
+    ifft2 = abtem.integrals.ifft2 = FFTCounter(abtem.integrals.ifft2)
+
+    wall_time, peak, num_slices = build(atoms, 512)
+
+    num_terms = 5
+    print(
+        f"species: {num_species}, slices: {num_slices}, time: {wall_time:.2f} s, "
+        f"peak memory besides the potential: {peak / 1e6:.0f} MB"
+    )
+    print(
+        f"fft calls per slice: {(fft2.calls + ifft2.calls) / num_slices:.1f} "
+        f"(previously {(num_terms + 1) * num_species + 1})"
+    )
+    print(
+        f"2D transforms per slice: "
+        f"{(fft2.transforms + ifft2.transforms) / num_slices:.1f}"
+    )
@@ -0,0 +1,72 @@
+"""Benchmark of building an infinite projection potential of a thick specimen.
+
+Previously, every slice was integrated separately by `integrate_on_grid`, i.e. one fft
+and one inverse fft per species in each slice. Now the deltas of each species in a batch
+of slices are transformed by a single batched fft, the species are summed in reciprocal
+space and the batch is transformed back by a single batched inverse fft. The build is
+timed with batches of a single slice and with `max_batch="auto"`, the default.
+"""
+
+import time
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+def integrate_slice_by_slice(potential):
+    start = time.perf_counter()
+    sliced_atoms = potential.get_sliced_atoms()
+    array = np.stack(
+        [
+            potential.integrator.integrate_on_grid(
+                sliced_atoms.get_atoms_in_slices(i),
+                a=None,
+                b=None,
+                gpts=potential.gpts,
+                sampling=potential.sampling,
+            )
+            for i in range(len(sliced_atoms))
+        ]
+    )
+    return time.perf_counter() - start, array
+
+
+def build(potential, max_batch):
+    start = time.perf_counter()
+    array = potential.build(lazy=False, max_batch=max_batch).array
+    return time.perf_counter() - start, array
+
+
+if __name__ == "__main__":
+    unit_cell = bulk("NaCl", "rocksalt", a=5.64, cubic=True)
+    unit_cell.numbers[::3] = 8
+    atoms = unit_cell * (6, 6, 40)
+
+    for gpts in (256, 512):
+        potential = abtem.Potential(
+            atoms, gpts=gpts, slice_thickness=5.64 / 4, projection="infinite"
+        )
+
+        # warm up the fftw plans and the numba kernels
+        thin = abtem.Potential(
+            unit_cell * (6, 6, 1), gpts=gpts, slice_thickness=5.64 / 4
+        )
+        integrate_slice_by_slice(thin)
+        build(thin, 1)
+        build(thin, "auto")
+
+        t_previous, expected = integrate_slice_by_slice(potential)
+        t_single, _ = build(potential, 1)
+        t_batched, array = build(potential, "auto")
+
+        assert np.allclose(array, expected, atol=1e-5 * np.abs(expected).max())
+
+        print(
+            f"gpts: {gpts}, slices: {len(potential)}, atoms: {len(atoms)}, "
+            f"previous: {t_previous:.2f} s, single slice batches: {t_single:.2f} s, "
+            f"batched: {t_batched:.2f} s, speedup: {t_previous / t_batched:.2f}x"
+        )
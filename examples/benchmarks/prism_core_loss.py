@@ -0,0 +1,82 @@
+"""Benchmark of core-loss scans with `Probe.transition_potential_scan` and
+`SMatrix.transition_potential_scan`.
+
+The conventional scan runs a double-channel multislice calculation for every probe
+position, i.e. the cost scales with the number of probe positions times the number of
+sites. The PRISM scan propagates the plane waves of the probe expansion forward and the
+plane waves within the detector backward once, and the overlaps at each site give the
+intensity at all probe positions, such that the cost scales with the number of sites
+and plane waves. The overlaps are integrated over a small window containing the support
+of the transition potentials. Both scans are timed for an increasing number of probe
+positions.
+"""
+
+import time
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+from abtem.core.axes import OrdinalAxis
+from abtem.core.grid import spatial_frequencies
+from abtem.inelastic.core_loss import TransitionPotentialArray
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+def synthetic_transition_potential(potential):
+    # two transitions with the angular dependence of s- and p-like final states
+    kx, ky = spatial_frequencies(potential.gpts, potential.sampling)
+    k2 = kx[:, None] ** 2 + ky[None] ** 2
+    array = np.stack(
+        [np.exp(-k2 / 0.5), (kx[:, None] + 1.0j * ky[None]) * np.exp(-k2 / 0.8)]
+    )
+    return TransitionPotentialArray(
+        14,
+        array.astype(np.complex64),
+        energy=100e3,
+        extent=potential.extent,
+        ensemble_axes_metadata=[OrdinalAxis(values=(0, 1))],
+    )
+
+
+def timeit(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 3, 1)
+    potential = abtem.Potential(atoms, gpts=(128, 128), slice_thickness=5.43 / 4)
+    transition_potential = synthetic_transition_potential(potential)
+    detector = abtem.AnnularDetector(0, 30)
+
+    probe = abtem.Probe(semiangle_cutoff=20, energy=100e3)
+    s_matrix = abtem.SMatrix(semiangle_cutoff=20, energy=100e3, potential=potential)
+
+    print(f"sites: {np.sum(atoms.numbers == 14)}, slices: {potential.num_slices}")
+    for n in (4, 8, 16):
+        scan = abtem.GridScan((0, 0), potential.extent, gpts=(n, n))
+
+        t_probe, expected = timeit(
+            lambda: probe.transition_potential_scan(
+                potential,
+                transition_potential,
+                scan=scan,
+                detectors=detector,
+                lazy=False,
+            )
+        )
+        t_prism, measurement = timeit(
+            lambda: s_matrix.transition_potential_scan(
+                transition_potential, scan=scan, detectors=detector, lazy=False
+            )
+        )
+
+        error = np.abs(measurement.array - expected.array).max()
+        print(
+            f"positions: {n * n:4d}, probe: {t_probe:.2f} s, PRISM: {t_prism:.2f} s "
+            f"({t_probe / t_prism:.1f}x), "
+            f"max relative error: {error / expected.array.max():.1e}"
+        )
@@ -0,0 +1,58 @@
+"""Benchmark of reducing a PRISM S-matrix with a series of CTFs.
+
+A defocus series is reduced once per defocus value, and once as a single CTF ensemble,
+where every CTF of the ensemble is reduced from each crop of the S-matrix.
+"""
+
+import time
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+if __name__ == "__main__":
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (8, 8, 2)
+    potential = abtem.Potential(atoms, gpts=256, slice_thickness=2)
+
+    s_matrix = abtem.SMatrix(
+        potential=potential, energy=100e3, semiangle_cutoff=20, interpolation=4
+    )
+    s_matrix_array = s_matrix.build(lazy=False)
+
+    scan = abtem.GridScan((0, 0), np.array(potential.extent) / 4, gpts=(32, 32))
+    detector = abtem.AnnularDetector(40, 70)
+
+    print(f"S-matrix: {s_matrix_array.shape}, positions: {len(scan)}")
+
+    for num_defocus in (4, 16):
+        defocus = np.linspace(-100, 100, num_defocus)
+
+        start = time.perf_counter()
+        series = [
+            s_matrix_array.reduce(
+                scan=scan, ctf=abtem.CTF(defocus=value, Cs=-1e4), detectors=detector
+            )
+            for value in defocus
+        ]
+        t_series = time.perf_counter() - start
+
+        ctf = abtem.CTF(
+            defocus=abtem.distributions.uniform(-100, 100, num_defocus), Cs=-1e4
+        )
+
+        start = time.perf_counter()
+        ensemble = s_matrix_array.reduce(scan=scan, ctf=ctf, detectors=detector)
+        t_ensemble = time.perf_counter() - start
+
+        assert np.allclose(
+            ensemble.array, np.stack([measurement.array for measurement in series])
+        )
+
+        print(
+            f"defocus values: {num_defocus:3d}, one at a time: {t_series:.3f} s, "
+            f"ensemble: {t_ensemble:.3f} s, speedup: {t_series / t_ensemble:.2f}x"
+        )
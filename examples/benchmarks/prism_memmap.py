@@ -0,0 +1,89 @@
+"""Benchmark of reducing a memory-mapped PRISM S-matrix.
+
+The S-matrix is built lazily and written chunk by chunk to a .npy file with
+`SMatrixArray.to_memmap`. A small region of the cell is then scanned with the S-matrix
+held in memory and with the memory-mapped S-matrix, both for the full and for a
+partitioned S-matrix. The tilt of the partitioned S-matrix is removed from the crop of
+each batch, hence it is also not read into memory. The wall time, the peak memory
+allocated during the reduction (measured with `tracemalloc`) and the resident memory of
+the process are reported.
+
+Usage: `python prism_memmap.py [directory]`, the file is written to a temporary
+directory if none is given.
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+def run(s_matrix_array, scan, detector):
+    tracemalloc.start()
+    start = time.perf_counter()
+    measurement = s_matrix_array.reduce(scan=scan, detectors=detector)
+    wall_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return measurement, wall_time, peak
+
+
+def max_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1e3
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp()
+
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (24, 24, 2)
+    potential = abtem.Potential(atoms, gpts=1024, slice_thickness=2)
+
+    scan = abtem.GridScan((0, 0), (10, 10), gpts=(32, 32))
+    detector = abtem.AnnularDetector(40, 70)
+
+    for partitions in (None, 8):
+        print(f"partitions: {partitions}")
+        filename = os.path.join(directory, f"s_matrix_{partitions}.npy")
+
+        s_matrix = abtem.SMatrix(
+            potential=potential,
+            energy=100e3,
+            semiangle_cutoff=20,
+            interpolation=8,
+            partitions=partitions,
+        )
+
+        start = time.perf_counter()
+        memory_mapped = s_matrix.build(lazy=True).to_memmap(filename, overwrite=True)
+        print(
+            f"S-matrix: {memory_mapped.shape}, "
+            f"{os.path.getsize(filename) / 1e9:.2f} GB written in "
+            f"{time.perf_counter() - start:.1f} s, max rss: {max_rss() / 1e9:.2f} GB"
+        )
+
+        measurement, wall_time, peak = run(memory_mapped, scan, detector)
+        print(
+            f"memory-mapped: {wall_time:.2f} s, peak {peak / 1e6:.1f} MB, "
+            f"max rss: {max_rss() / 1e9:.2f} GB"
+        )
+
+        in_memory = memory_mapped.ensure_lazy().compute()
+
+        expected, wall_time, peak = run(in_memory, scan, detector)
+        print(
+            f"in memory:     {wall_time:.2f} s, peak {peak / 1e6:.1f} MB, "
+            f"max rss: {max_rss() / 1e9:.2f} GB"
+        )
+
+        assert np.allclose(measurement.array, expected.array)
+
+        del memory_mapped, in_memory
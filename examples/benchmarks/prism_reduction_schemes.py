@@ -0,0 +1,66 @@
+"""Benchmark of the reduction schemes of a lazy PRISM S-matrix.
+
+Reduces the same lazy `SMatrixArray` with the "no-chunks", "single-rechunk" and
+"multiple-rechunk" schemes and reports the number of tasks in the graph, the peak memory
+allocated during the computation (measured with `tracemalloc`) and the wall time.
+
+By default, the scan has 1000 x 1000 = 1M probe positions. A smaller scan may be given
+as the number of positions along each axis, e.g. `python prism_reduction_schemes.py 100`.
+"""
+
+import sys
+import time
+import tracemalloc
+
+from ase.build import bulk
+
+import abtem
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+def run(s_matrix_array, scan, detector, reduction_scheme):
+    measurement = s_matrix_array.reduce(
+        scan=scan, detectors=detector, reduction_scheme=reduction_scheme
+    )
+    num_tasks = len(measurement.array.__dask_graph__())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    measurement.compute()
+    wall_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return num_tasks, peak, wall_time
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (20, 20, 2)
+    potential = abtem.Potential(atoms, gpts=512, slice_thickness=2)
+
+    s_matrix = abtem.SMatrix(
+        potential=potential, energy=100e3, semiangle_cutoff=20, interpolation=4
+    )
+    # the multislice is computed in advance, the plane waves are chunked as when built
+    # lazily, such that only the reduction is timed
+    s_matrix_array = s_matrix.build(lazy=False).ensure_lazy(chunks=(32, -1, -1))
+
+    scan = abtem.GridScan((0, 0), potential.extent, gpts=(n, n))
+    detector = abtem.AnnularDetector(25, 55)
+
+    print(
+        f"positions: {n * n}, S-matrix: {s_matrix_array.shape}, "
+        f"auto: {s_matrix_array._validate_reduction_scheme('auto')}"
+    )
+
+    for reduction_scheme in ("no-chunks", "single-rechunk", "multiple-rechunk"):
+        num_tasks, peak, wall_time = run(
+            s_matrix_array, scan, detector, reduction_scheme
+        )
+        print(
+            f"{reduction_scheme:>16}: {num_tasks:6d} tasks, "
+            f"peak {peak / 1e6:8.1f} MB, {wall_time:.2f} s"
+        )
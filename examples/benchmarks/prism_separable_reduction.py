@@ -0,0 +1,74 @@
+"""Benchmark of the separable reduction of a PRISM S-matrix for grid scans.
+
+The phase factors of the probe positions of a `GridScan` are separable in x and y. The
+plane waves are grouped by one component of their wave vectors and the 1-D phase factors
+are contracted group by group, without a dense grid of wave vectors. A `CustomScan`
+with the same positions is reduced with the dense (positions x plane waves) phase
+factors. The wall time and the peak memory allocated during the reduction (measured with
+`tracemalloc`) are reported for both.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+def run(s_matrix_array, scan, detector, max_batch, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        s_matrix_array.reduce(
+            scan=scan, detectors=detector, max_batch_reduction=max_batch
+        )
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    measurement = s_matrix_array.reduce(
+        scan=scan, detectors=detector, max_batch_reduction=max_batch
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak, measurement
+
+
+if __name__ == "__main__":
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (8, 8, 2)
+    potential = abtem.Potential(atoms, gpts=256, slice_thickness=2)
+
+    s_matrix = abtem.SMatrix(
+        potential=potential, energy=100e3, semiangle_cutoff=20, interpolation=4
+    )
+    s_matrix_array = s_matrix.build(lazy=False)
+
+    detector = abtem.PixelatedDetector(max_angle=50)
+
+    print(f"S-matrix: {s_matrix_array.shape}")
+
+    for n, max_batch in ((16, 64), (32, 256), (64, 1024)):
+        grid_scan = abtem.GridScan(
+            (0, 0), np.array(potential.extent) / 4, gpts=(n, n)
+        )
+        custom_scan = abtem.CustomScan(grid_scan.get_positions().reshape((-1, 2)))
+
+        t_dense, m_dense, dense = run(s_matrix_array, custom_scan, detector, max_batch)
+        t_separable, m_separable, separable = run(
+            s_matrix_array, grid_scan, detector, max_batch
+        )
+
+        assert np.allclose(
+            separable.array.ravel(), dense.array.ravel(), rtol=1e-4, atol=1e-7
+        )
+
+        print(
+            f"positions: {n * n:5d}, batch: {max_batch:4d}, "
+            f"dense: {t_dense:.3f} s, {m_dense / 1e6:7.1f} MB, "
+            f"separable: {t_separable:.3f} s, {m_separable / 1e6:7.1f} MB, "
+            f"speedup: {t_dense / t_separable:.2f}x"
+        )
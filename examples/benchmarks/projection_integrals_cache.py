@@ -0,0 +1,63 @@
+"""Benchmark of the process-wide cache of projected scattering factors and integral
+tables.
+
+A frozen phonon potential is built with each of the projection integrators without
+caching, with an empty cache and then again with the scattering factors and integral
+tables cached by the previous build. Previously the Gaussian integrator never reused its
+scattering factors, as in the build without caching, and the other integrators only
+reused them within a single integrator instance.
+"""
+
+import time
+
+from ase.build import bulk
+
+import abtem
+from abtem.integrals import (
+    GaussianProjectionIntegrals,
+    QuadratureProjectionIntegrals,
+    ScatteringFactorProjectionIntegrals,
+    projection_integrals_cache,
+)
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+def build(atoms, integrator):
+    frozen_phonons = abtem.FrozenPhonons(atoms, num_configs=4, sigmas=0.1, seed=0)
+    potential = abtem.Potential(
+        frozen_phonons, gpts=512, slice_thickness=2, integrator=integrator
+    )
+    start = time.perf_counter()
+    potential.build(lazy=True).compute()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    atoms = bulk("NaCl", "rocksalt", a=5.64, cubic=True) * (4, 4, 2)
+    atoms.numbers[::7] = 8
+
+    for integrator in (
+        ScatteringFactorProjectionIntegrals,
+        GaussianProjectionIntegrals,
+        QuadratureProjectionIntegrals,
+    ):
+        # compile the numba kernels and plan the ffts
+        build(atoms[:2], integrator())
+
+        max_bytes = projection_integrals_cache.max_bytes
+        projection_integrals_cache.max_bytes = 0
+        t_uncached = build(atoms, integrator())
+        projection_integrals_cache.max_bytes = max_bytes
+
+        projection_integrals_cache.clear()
+        t_cold = build(atoms, integrator())
+        t_warm = build(atoms, integrator())
+
+        info = projection_integrals_cache.cache_info()
+        print(
+            f"{integrator.__name__}: no cache: {t_uncached:.2f} s, "
+            f"empty cache: {t_cold:.2f} s, "
+            f"warm cache: {t_warm:.2f} s, hits: {info['hits']}, "
+            f"misses: {info['misses']}, {info['nbytes'] / 1e6:.1f} MB cached"
+        )
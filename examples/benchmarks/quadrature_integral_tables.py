@@ -0,0 +1,83 @@
+"""Benchmark of building the integral tables of `QuadratureProjectionIntegrals` for a cell
+with several species at a fine integration step.
+
+Previously every table was built by a Python loop calling `integrate.fixed_quad` once for
+each interval between the integration limits, and the cutoff was found by a root solve on
+every call. Now the quadrature over all the intervals is evaluated at once and only for
+the intervals below zero, since the integrand is even. The cutoffs are memoized, the
+tables of all species are built in parallel with "integrals.threads" and may be stored
+on disk with "integrals.persist_tables", such that new processes load them.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from scipy import integrate
+
+import abtem
+import abtem.integrals
+from abtem.integrals import QuadratureProjectionIntegrals, projection_integrals_cache
+
+
+def previous_table(integrator, symbol, sampling):
+    potential = integrator.parametrization.potential(symbol)
+    cutoff = abtem.integrals.optimize_cutoff(
+        potential, integrator.cutoff_tolerance, a=1e-3, b=1e3
+    )
+    inner_limit = min(sampling) / integrator._inner_cutoff_factor
+    radial_gpts = integrator._radial_gpts(inner_limit, cutoff)
+    limits = integrator._integral_limits(cutoff)
+
+    def projection(z):
+        return potential(np.sqrt(radial_gpts[:, None] ** 2 + z[None] ** 2))
+
+    table = np.zeros((len(limits) - 1, len(radial_gpts)))
+    table[0] = integrate.fixed_quad(projection, -limits[0] * 2, limits[0], n=8)[0]
+    for j, (a, b) in enumerate(zip(limits[1:-1], limits[2:])):
+        table[j + 1] = table[j] + integrate.fixed_quad(projection, a, b, n=8)[0]
+    return table
+
+
+def timeit(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    symbols = ("H", "C", "N", "O", "Si", "Sr", "Ti", "Au")
+    sampling = (0.05, 0.05)
+    integrator = QuadratureProjectionIntegrals(integration_step=0.005)
+
+    # compile the numba kernels of the parametrization
+    integrator.get_integral_tables(symbols[:1], sampling)
+
+    t_previous = timeit(
+        lambda: [previous_table(integrator, symbol, sampling) for symbol in symbols]
+    )
+
+    t_built = {}
+    for threads in sorted({1, os.cpu_count()}):
+        projection_integrals_cache.clear()
+        with abtem.config.set({"integrals.threads": threads}):
+            t_built[threads] = timeit(
+                lambda: integrator.get_integral_tables(symbols, sampling)
+            )
+
+    with tempfile.TemporaryDirectory() as path:
+        abtem.integrals.CONFIG_PATH = path
+        with abtem.config.set({"integrals.persist_tables": True}):
+            projection_integrals_cache.clear()
+            integrator.get_integral_tables(symbols, sampling)
+            projection_integrals_cache.clear()
+            t_disk = timeit(lambda: integrator.get_integral_tables(symbols, sampling))
+
+    print(f"species: {len(symbols)}, cpus: {os.cpu_count()}")
+    print(f"previous: {t_previous:.2f} s")
+    for threads, t in t_built.items():
+        print(
+            f"vectorized ({threads} threads): {t:.2f} s ({t_previous / t:.1f}x)"
+        )
+    print(f"loaded from disk: {t_disk:.3f} s ({t_previous / t_disk:.1f}x)")
@@ -0,0 +1,67 @@
+"""Benchmark of detecting a multislice run with several reciprocal-space detectors.
+
+Compares detecting each exit plane with every detector separately (one Fourier
+transform per detector) against `detect_multiple`, which shares the diffraction
+intensity between the detectors (one Fourier transform per exit plane).
+"""
+
+import time
+
+import numpy as np
+from ase.build import bulk
+
+import abtem
+from abtem.detectors import detect_multiple
+from abtem.multislice import multislice_and_detect
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+def run(detect_func, waves, detectors, potential, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for potential_slice in potential.generate_slices():
+            waves = potential_slice.transmission_function(waves.energy).transmit(
+                waves
+            )
+            detect_func(waves, detectors)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def separate(waves, detectors):
+    return [detector.detect(waves) for detector in detectors]
+
+
+if __name__ == "__main__":
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (4, 4, 5)
+
+    potential = abtem.Potential(
+        atoms, gpts=256, slice_thickness=2, exit_planes=1
+    ).build(lazy=False)
+
+    probe = abtem.Probe(energy=100e3, semiangle_cutoff=20)
+    probe.grid.match(potential)
+
+    scan = abtem.GridScan((0, 0), (5.43, 5.43), gpts=(8, 8))
+    waves = probe.build(scan, lazy=False)
+
+    detectors = [
+        abtem.AnnularDetector(inner=50, outer=150),
+        abtem.SegmentedDetector(nbins_radial=2, nbins_azimuthal=4, inner=5, outer=20),
+        abtem.FlexibleAnnularDetector(),
+        abtem.PixelatedDetector(max_angle="cutoff"),
+    ]
+
+    print(f"exit planes: {len(potential.exit_planes)}, batch: {waves.shape[:-2]}")
+
+    t_separate = run(separate, waves, detectors, potential)
+    t_shared = run(detect_multiple, waves, detectors, potential)
+
+    print(f"separate FFT per detector: {t_separate:.3f} s")
+    print(f"shared FFT:                {t_shared:.3f} s")
+    print(f"speedup:                   {t_separate / t_shared:.2f}x")
+
+    measurements = multislice_and_detect(waves, potential, detectors)
+    assert all(np.isfinite(measurement.array).all() for measurement in measurements)
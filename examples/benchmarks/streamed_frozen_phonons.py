@@ -0,0 +1,68 @@
+"""Benchmark of averaging the diffraction patterns of a scan over frozen phonons.
+
+Previously every configuration was calculated in its own task, and the measurements of
+all configurations were stacked along the frozen phonon axis before the mean was taken,
+such that the memory of the measurements scales with the number of configurations. Now
+the measurements are averaged within each task as the configurations are calculated,
+with a running (Welford) variance, and the calculation may stop early once the relative
+standard error of the mean is below a given precision. The peak memory allocated by
+numpy is measured with tracemalloc for an increasing number of configurations.
+"""
+
+import time
+import tracemalloc
+
+from ase.build import bulk
+
+import abtem
+
+abtem.config.set({"diagnostics.progress_bar": False})
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func().compute(scheduler="synchronous")
+    wall_time = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return wall_time, peak, result
+
+
+if __name__ == "__main__":
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (2, 2, 1)
+    probe = abtem.Probe(semiangle_cutoff=20, energy=100e3)
+    scan = abtem.GridScan((0, 0), (5.43, 5.43), gpts=(12, 12))
+    detector = abtem.PixelatedDetector(max_angle=None)
+
+    # compile and cache everything independent of the number of configurations
+    potential = abtem.Potential(atoms, gpts=128, slice_thickness=5.43 / 4)
+    measure(lambda: probe.scan(potential, scan, detector, max_batch=48))
+
+    for num_configs in (4, 8, 16):
+        frozen_phonons = abtem.FrozenPhonons(atoms, num_configs, 0.1, seed=1)
+        potential = abtem.Potential(
+            frozen_phonons, gpts=128, slice_thickness=5.43 / 4
+        )
+
+        t_stacked, m_stacked, expected = measure(
+            lambda: probe.scan(potential, scan, detector, max_batch=48)
+        )
+        t_streamed, m_streamed, streamed = measure(
+            lambda: probe.scan(
+                potential, scan, detector, max_batch=48, stream_ensemble=True
+            )
+        )
+        t_precision, _, converged = measure(
+            lambda: probe.scan(
+                potential, scan, detector, max_batch=48, precision=0.01
+            )
+        )
+
+        error = abs(streamed.array - expected.array).max() / expected.array.max()
+        print(
+            f"configurations: {num_configs:2d}, "
+            f"stacked: {t_stacked:.2f} s, {m_stacked / 1e6:.0f} MB, "
+            f"streamed: {t_streamed:.2f} s, {m_streamed / 1e6:.0f} MB, "
+            f"1% precision: {t_precision:.2f} s, max relative error: {error:.1e}"
+        )
@@ -0,0 +1,74 @@
+"""Benchmark of superposing bilinearly interpolated delta functions on the CPU.
+
+`superpose_deltas` adds the deltas with a numba kernel. With "integrals.threads" larger
+than one, chunks of at least 16384 deltas are added in parallel, the first to the array
+and the others to thread-local buffers summed afterwards. The kernel is compared to the previous implementation using
+`np.add.at` for an increasing number of atoms on a 2048 x 2048 grid.
+"""
+
+import os
+import time
+
+import numpy as np
+
+import abtem
+from abtem.integrals import superpose_deltas
+
+
+def superpose_deltas_add_at(positions, array, weights):
+    shape = array.shape
+    rounded = np.floor(positions).astype(np.int32)
+    rows, cols = rounded[:, 0], rounded[:, 1]
+    x = positions[:, 0] - rows
+    y = positions[:, 1] - cols
+    xy = x * y
+    i = np.array([rows % shape[0], (rows + 1) % shape[0]] * 2)
+    j = np.array([cols % shape[1]] * 2 + [(cols + 1) % shape[1]] * 2)
+    v = np.array([1 + xy - y - x, x - xy, y - xy, xy], dtype=np.float32)
+    np.add.at(array, (i, j), v * weights[None])
+    return array
+
+
+def timeit(func, *args, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    gpts = (2048, 2048)
+    rng = np.random.default_rng(0)
+
+    # compile the numba kernels
+    superpose_deltas(np.zeros((1, 2), np.float32), np.zeros(gpts, np.float32))
+
+    print(f"grid: {gpts}, cpus: {os.cpu_count()}")
+    for num_atoms in (10**4, 10**5, 10**6, 8 * 10**6):
+        positions = (rng.random((num_atoms, 2)) * gpts).astype(np.float32)
+        weights = rng.random(num_atoms).astype(np.float32)
+
+        array = np.zeros(gpts, dtype=np.float32)
+        t_add_at = timeit(superpose_deltas_add_at, positions, array, weights)
+
+        t_numba = {}
+        for threads in (1, os.cpu_count()):
+            array = np.zeros(gpts, dtype=np.float32)
+            with abtem.config.set({"integrals.threads": threads}):
+                t_numba[threads] = timeit(superpose_deltas, positions, array, weights)
+
+        assert np.allclose(
+            superpose_deltas(positions, np.zeros(gpts, np.float32), weights),
+            superpose_deltas_add_at(positions, np.zeros(gpts, np.float32), weights),
+            atol=1e-5,
+        )
+
+        print(
+            f"atoms: {num_atoms:8d}, add.at: {t_add_at:.4f} s, "
+            + ", ".join(
+                f"numba ({threads} threads): {t:.4f} s ({t_add_at / t:.1f}x)"
+                for threads, t in t_numba.items()
+            )
+        )
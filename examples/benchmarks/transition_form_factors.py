@@ -0,0 +1,82 @@
+"""Benchmark of building a `TransitionPotential` of an L-edge with 27 transitions.
+
+Previously the overlap integrals of every transition were calculated separately, and the
+form factors were calculated again every time the potential was built, e.g. in every
+call of `scatter`. Now the transitions sharing a pair of radial wave functions share
+their overlap integrals, the pairs are calculated in parallel by "inelastic.workers"
+processes and the form factors are cached process-wide. The previous cost is reproduced
+by calculating every transition on its own. Synthetic radial wave functions are used,
+such that gpaw is not required.
+"""
+
+import os
+import time
+
+import numpy as np
+
+import abtem
+from abtem.inelastic.core_loss import (
+    AtomicWaveFunction,
+    RadialWavefunction,
+    TransitionPotential,
+    _calculate_form_factors,
+    form_factors_cache,
+)
+
+
+def synthetic_transitions():
+    r = np.linspace(0, 20, 4000)
+    bound = RadialWavefunction(2, 1, -100.0, r, r**2 * np.exp(-r))
+    excited = [
+        RadialWavefunction(None, l, 1.0, r, np.sin((l + 1) * r) * r / (1 + r))
+        for l in (0, 1, 2)
+    ]
+    return [
+        (AtomicWaveFunction(bound, ml), AtomicWaveFunction(radial, mlprime))
+        for ml in range(-1, 2)
+        for radial in excited
+        for mlprime in range(-radial.l, radial.l + 1)
+    ]
+
+
+def previous_build(potential):
+    return [
+        _calculate_form_factors(
+            bound._radial_wavefunction,
+            excited._radial_wavefunction,
+            [(bound.ml, excited.ml)],
+            potential.energy,
+            potential.gpts,
+            potential.sampling,
+            True,
+        )
+        for bound, excited in potential.transitions
+    ]
+
+
+def timeit(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    potential = TransitionPotential(
+        14, synthetic_transitions(), extent=10, gpts=128, energy=100e3
+    )
+
+    t_previous = timeit(lambda: previous_build(potential))
+
+    t_built = {}
+    for workers in sorted({1, os.cpu_count()}):
+        form_factors_cache.clear()
+        with abtem.config.set({"inelastic.workers": workers}):
+            t_built[workers] = timeit(potential.build)
+
+    t_cached = timeit(potential.build)
+
+    print(f"transitions: {len(potential)}, cpus: {os.cpu_count()}")
+    print(f"previous: {t_previous:.2f} s")
+    for workers, t in t_built.items():
+        print(f"shared overlaps ({workers} workers): {t:.2f} s ({t_previous / t:.1f}x)")
+    print(f"cached: {t_cached:.4f} s ({t_previous / t_cached:.0f}x)")
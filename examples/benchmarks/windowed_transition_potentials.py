@@ -0,0 +1,113 @@
+"""Benchmark of filtering and scattering waves with the transition potentials of many
+ionization sites.
+
+Previously `TransitionPotentialArray.filter_sites` rolled a full-grid copy of the local
+potential to every site, and `scatter` shifted the transition potentials to every site
+by a full-grid phase ramp and inverse fft. Now the potentials are only evaluated in a
+small window containing their support, and the windows are written into the scattered
+waves. The previous implementation is reproduced below for comparison, and the peak
+memory allocated by numpy is measured with tracemalloc.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+import abtem
+from abtem.core.axes import OrdinalAxis
+from abtem.core.complex import abs2
+from abtem.core.energy import energy2sigma
+from abtem.core.fft import fft_shift_kernel, ifft2
+from abtem.core.grid import spatial_frequencies
+from abtem.inelastic.core_loss import TransitionPotentialArray
+
+
+def previous_filter_sites(transition_potential, waves, sites, threshold):
+    rounded = np.round(sites / np.array(transition_potential.sampling)).astype(int)
+    shifted_local_potential = np.stack(
+        [
+            np.roll(transition_potential._local_potential, shift, axis=(0, 1))
+            for shift in rounded
+        ]
+    )
+    overlaps = shifted_local_potential[:, None] * abs2(waves.array[None])
+    overlaps = overlaps.sum(axis=(-2, -1))
+    return sites[(overlaps > threshold).any(1)]
+
+
+def previous_scatter(transition_potential, waves, sites):
+    array = ifft2(
+        transition_potential.array[None]
+        * fft_shift_kernel(sites / np.array(waves.sampling), waves.gpts)[:, None]
+        * energy2sigma(waves.energy)
+    )
+    array = array.reshape(array.shape[:2] + (1,) * (len(waves.shape) - 2) + waves.gpts)
+    array = array * waves.array[None, None]
+    return array.reshape((-1,) + array.shape[2:])
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    wall_time = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return wall_time, peak, result
+
+
+if __name__ == "__main__":
+    extent = (40.0, 40.0)
+    gpts = (512, 512)
+    sampling = (extent[0] / gpts[0], extent[1] / gpts[1])
+
+    kx, ky = spatial_frequencies(gpts, sampling)
+    k2 = kx[:, None] ** 2 + ky[None] ** 2
+    array = np.stack(
+        [np.exp(-k2 / 0.5), (kx[:, None] + 1.0j * ky[None]) * np.exp(-k2 / 0.8)]
+    )
+    transition_potential = TransitionPotentialArray(
+        6,
+        array.astype(np.complex64),
+        energy=100e3,
+        extent=extent,
+        ensemble_axes_metadata=[OrdinalAxis(values=(0, 1))],
+    )
+
+    waves = abtem.Probe(semiangle_cutoff=20, energy=100e3, extent=extent, gpts=gpts)
+    waves = waves.build(np.array([[20.0, 20.0]]), lazy=False)
+
+    rng = np.random.default_rng(0)
+    print(f"grid: {gpts}, window: {transition_potential.support_gpts()}")
+    for num_sites in (16, 64):
+        sites = (rng.random((num_sites, 2)) * extent).astype(np.float32)
+        threshold = 1e-6 * transition_potential._local_potential.sum()
+
+        t_previous, m_previous, expected = measure(
+            previous_filter_sites, transition_potential, waves, sites, threshold
+        )
+        t_windowed, m_windowed, filtered = measure(
+            transition_potential.filter_sites, waves, sites, threshold
+        )
+        assert np.allclose(filtered, expected)
+        print(
+            f"filter {num_sites:3d} sites: previous {t_previous:.3f} s, "
+            f"{m_previous / 1e6:.0f} MB, windowed {t_windowed:.4f} s, "
+            f"{m_windowed / 1e6:.1f} MB"
+        )
+
+        t_previous, m_previous, expected = measure(
+            previous_scatter, transition_potential, waves, sites
+        )
+        t_windowed, m_windowed, scattered = measure(
+            transition_potential.scatter, waves, sites
+        )
+        assert np.allclose(
+            scattered.array, expected, atol=1e-3 * np.abs(expected).max()
+        )
+        print(
+            f"scatter {num_sites:3d} sites: previous {t_previous:.3f} s, "
+            f"{m_previous / 1e6:.0f} MB, windowed {t_windowed:.3f} s, "
+            f"{m_windowed / 1e6:.0f} MB"
+        )
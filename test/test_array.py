@@ -2,9 +2,13 @@ from numbers import Number
 
 import hypothesis.extra.numpy as numpy_st
 import hypothesis.strategies as st
+import numpy as np
 import pytest
+import zarr
+from ase.build import bulk
 from hypothesis import given, assume
 
+import abtem
 import strategies as abtem_st
 from abtem.array import stack, concatenate#, concat_array_object_ensemble_blocks
 from abtem.core.axes import OrdinalAxis
@@ -299,4 +303,60 @@ def test_concatenates_with_self(data, has_array, lazy, device):
     #
     # concat_array_object = concat_array_object_ensemble_blocks(blocks)
     #
-    # assert array_object.compute() == concat_array_object
\ No newline at end of file
+    # assert array_object.compute() == concat_array_object
+
+
+def test_to_zarr_stream(tmp_path):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    potential = abtem.Potential(atoms, gpts=32, slice_thickness=2)
+    probe = abtem.Probe(energy=100e3, semiangle_cutoff=20)
+    scan = abtem.GridScan((0, 0), (2, 2), gpts=(3, 2))
+    detectors = [abtem.AnnularDetector(20, 80), abtem.PixelatedDetector()]
+
+    measurements = probe.scan(potential, scan, detectors, max_batch=2)
+    numblocks = measurements[0].array.numblocks
+
+    url = str(tmp_path / "stream.zarr")
+    measurements.to_zarr(url, stream=True)
+
+    imported = abtem.from_zarr(url)
+    expected = [measurement.compute() for measurement in measurements]
+
+    for imported_measurement, expected_measurement in zip(imported, expected):
+        assert np.allclose(
+            imported_measurement.compute().array, expected_measurement.array
+        )
+
+    root = zarr.open(url, mode="r")
+    assert root["completed0"].shape == numblocks
+    assert np.all(root["completed0"][:]) and np.all(root["completed1"][:])
+
+
+def test_to_zarr_resume(tmp_path):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    potential = abtem.Potential(atoms, gpts=32, slice_thickness=2)
+    probe = abtem.Probe(energy=100e3, semiangle_cutoff=20)
+    scan = abtem.GridScan((0, 0), (2, 2), gpts=(3, 2))
+
+    measurement = probe.scan(
+        potential, scan, abtem.AnnularDetector(20, 80), max_batch=2
+    )
+
+    url = str(tmp_path / "resume.zarr")
+    measurement.to_zarr(url, stream=True)
+
+    # simulate an interrupted computation, the first block is marked as completed
+    # with a sentinel value and the last block is lost
+    root = zarr.open(url, mode="r+")
+    root["array0"][:2, :1] = -1.0
+    root["array0"][2:, 1:] = 0.0
+    root["completed0"][-1, -1] = False
+
+    written = measurement.to_zarr(url, resume=True)
+    assert len(written) == 1
+
+    imported = abtem.from_zarr(url).compute().array
+    expected = measurement.compute().array
+    assert np.all(imported[:2, :1] == -1.0)
+    assert np.allclose(imported[2:, 1:], expected[2:, 1:])
+    assert np.all(zarr.open(url, mode="r")["completed0"][:])
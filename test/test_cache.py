@@ -0,0 +1,31 @@
+import numpy as np
+
+from abtem.core.cache import LRUCache, cache_info
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.insert("a", 1)
+    cache.insert("b", 2)
+    assert cache.get("a") == 1
+    cache.insert("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.get("b", None) is None
+    assert cache.cache_info()["hits"] == 1
+    assert cache.cache_info()["misses"] == 1
+
+
+def test_lru_cache_memory_budget():
+    cache = LRUCache(max_size=None, max_bytes=2 * 8 * 100, name="test_budget")
+    for i in range(3):
+        cache.get_or_insert(i, lambda: np.zeros(100, dtype=np.float64))
+
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * 8 * 100
+    assert 0 not in cache
+
+    cache.insert("large", np.zeros(1000))
+    assert "large" not in cache
+    assert cache_info()["test_budget"]["size"] == 2
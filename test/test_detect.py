@@ -10,6 +10,9 @@ from abtem.detectors import (
     AnnularDetector,
     FlexibleAnnularDetector,
     PixelatedDetector,
+    SegmentedDetector,
+    WavesDetector,
+    detect_multiple,
 )
 from abtem.waves import Probe
 from utils import gpu
@@ -45,6 +48,48 @@ def test_detect(data, detector, lazy, device):
     #    assert measurement.device == "cpu"
 
 
+@pytest.mark.parametrize("max_angle", ["valid", "cutoff", 25.0])
+def test_detect_multiple_matches_detect(max_angle):
+    probe = Probe(energy=100e3, semiangle_cutoff=20, extent=10, gpts=64)
+    waves = probe.build(np.array([[0.0, 0.0], [2.0, 3.0]]), lazy=False)
+
+    detectors = [
+        AnnularDetector(inner=40, outer=100),
+        SegmentedDetector(
+            nbins_radial=2, nbins_azimuthal=4, inner=5, outer=30, rotation=0.5
+        ),
+        FlexibleAnnularDetector(),
+        PixelatedDetector(max_angle=max_angle),
+        WavesDetector(),
+    ]
+
+    shared = detect_multiple(waves, detectors)
+
+    for detector, measurement in zip(detectors, shared):
+        expected = detector.detect(waves)
+        assert type(measurement) is type(expected)
+        assert measurement.axes_metadata == expected.axes_metadata
+        assert np.allclose(measurement.array, expected.array)
+
+
+def test_detect_multiple_falls_back_to_detect():
+    class DiffractionWavesDetector(WavesDetector):
+        # requests the diffraction patterns without calculating from them
+        def _diffraction_patterns_kwargs(self, waves):
+            return {"max_angle": "full", "parity": "same", "fftshift": False}
+
+    probe = Probe(energy=100e3, semiangle_cutoff=20, extent=10, gpts=64)
+    waves = probe.build(np.array([[0.0, 0.0], [2.0, 3.0]]), lazy=False)
+    detectors = [AnnularDetector(inner=40, outer=100), DiffractionWavesDetector()]
+
+    shared = detect_multiple(waves, detectors)
+
+    for detector, measurement in zip(detectors, shared):
+        expected = detector.detect(waves)
+        assert measurement.axes_metadata == expected.axes_metadata
+        assert np.allclose(measurement.array, expected.array)
+
+
 # @given(data=st.data())
 # @pytest.mark.parametrize("lazy", [True, False])
 # @pytest.mark.parametrize("device", ["cpu", gpu])
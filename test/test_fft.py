@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from abtem.core import config
+from abtem.core.fft import fft2
+from abtem.fft import load_wisdom, save_wisdom, warmup
+
+pyfftw = pytest.importorskip("pyfftw")
+
+
+def test_warmup_stores_wisdom(tmp_path):
+    path = str(tmp_path / "fftw_wisdom.dat")
+
+    pyfftw.forget_wisdom()
+    warmup((2, 16, 16), dtypes=np.complex64, save=False)
+    save_wisdom(path)
+
+    pyfftw.forget_wisdom()
+    assert load_wisdom(path)
+
+    array = pyfftw.byte_align(np.random.rand(2, 16, 16).astype(np.complex64))
+    buffer = array.copy()
+    pyfftw.FFTW(
+        buffer,
+        buffer,
+        axes=(-2, -1),
+        flags=(config.get("fftw.planning_effort"), "FFTW_WISDOM_ONLY"),
+        threads=config.get("fftw.threads"),
+    )
+
+    with config.set({"fft": "fftw"}):
+        assert np.allclose(fft2(array), np.fft.fft2(array), atol=1e-4)
+
+
+def test_load_missing_wisdom(tmp_path):
+    assert not load_wisdom(str(tmp_path / "missing.dat"))
+
+
+def test_wisdom_stored_as_exported(tmp_path):
+    path = str(tmp_path / "fftw_wisdom.dat")
+
+    warmup((16, 16), dtypes=np.complex64, save=False)
+    save_wisdom(path)
+
+    with open(path, "rb") as f:
+        assert tuple(f.read().split(b"\0")) == pyfftw.export_wisdom()
+
+
+def test_wisdom_persisted_only_if_configured(tmp_path, monkeypatch):
+    from abtem.core import fft as fft_module
+
+    path = str(tmp_path / "fftw_wisdom.dat")
+    monkeypatch.setattr(fft_module, "_default_wisdom_path", lambda: path)
+    monkeypatch.setattr(fft_module, "_wisdom_loaded", False)
+    monkeypatch.setattr(fft_module, "_wisdom_unsaved", False)
+
+    with config.set({"fftw.persist_wisdom": False}):
+        warmup((2, 8, 8), dtypes=np.complex64)
+        fft_module._save_unsaved_wisdom()
+
+    assert not (tmp_path / "fftw_wisdom.dat").exists()
+
+    # a custom wisdom file does not count as loading the default file
+    load_wisdom(str(tmp_path / "other.dat"))
+    assert not fft_module._wisdom_loaded
+
+    pyfftw.forget_wisdom()
+    with config.set({"fftw.persist_wisdom": True}):
+        array = pyfftw.empty_aligned((3, 8, 8), dtype=np.complex64)
+        fft_module.get_fftw_object(array, "fft2")
+        fft_module.get_fftw_object(array, "ifft2")
+
+        # new plans are written once when the process exits
+        assert fft_module._wisdom_loaded
+        assert not (tmp_path / "fftw_wisdom.dat").exists()
+        fft_module._save_unsaved_wisdom()
+
+    assert (tmp_path / "fftw_wisdom.dat").exists()
+    assert not fft_module._wisdom_unsaved
+
+
+@pytest.mark.parametrize("overwrite_x", [True, False])
+def test_cached_fftw_convolution(overwrite_x):
+    from abtem.core.fft import CachedFFTWConvolution
+
+    convolution = CachedFFTWConvolution()
+    kernel = np.exp(1j * np.random.rand(16, 16)).astype(np.complex64)
+
+    for batch in (4, 3, 4, 3):
+        array = pyfftw.byte_align(np.random.rand(batch, 16, 16).astype(np.complex64))
+        original = array.copy()
+        expected = np.fft.ifft2(np.fft.fft2(array) * kernel)
+
+        result = convolution(array, kernel, overwrite_x=overwrite_x)
+
+        assert np.allclose(result, expected, atol=1e-5)
+        assert (result is array) == overwrite_x
+        if not overwrite_x:
+            assert np.all(array == original)
+
+    # a forward and a backward plan for each of the two batch sizes
+    assert convolution.cache_info()["size"] == 4
+    assert convolution.cache_info()["misses"] == 4
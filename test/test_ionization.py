@@ -0,0 +1,213 @@
+import numpy as np
+import pytest
+
+import abtem.inelastic.core_loss
+from abtem import Probe, config
+from abtem.core.complex import abs2
+from abtem.core.energy import energy2sigma
+from abtem.core.fft import fft_shift_kernel, ifft2
+from abtem.inelastic.core_loss import (
+    AtomicWaveFunction,
+    RadialWavefunction,
+    SubshellTransitions,
+    TransitionPotential,
+    _overlap_integral,
+    cached_radial_wavefunction,
+    form_factors_cache,
+    radial_wavefunctions_cache,
+)
+from utils import gaussian_transition_potential
+
+
+def transition_potential_array(gpts=(64, 48), extent=(12, 9)):
+    return gaussian_transition_potential(gpts, extent)
+
+
+def test_support_gpts():
+    transition_potential = transition_potential_array()
+    support_gpts = transition_potential.support_gpts()
+    assert all(n < m for n, m in zip(support_gpts, transition_potential.gpts))
+    assert transition_potential.support_gpts(tolerance=0.0) == transition_potential.gpts
+
+
+def full_grid_potentials(transition_potential, sites):
+    return ifft2(
+        transition_potential.array[None]
+        * fft_shift_kernel(
+            sites / np.array(transition_potential.sampling), transition_potential.gpts
+        )[:, None]
+        * energy2sigma(transition_potential.energy)
+    )
+
+
+def test_windowed_potentials_on_full_grid_match_shifted():
+    transition_potential = transition_potential_array()
+    sites = np.array([[2.5, 3.3], [11.95, 0.02]], dtype=np.float32)
+
+    potentials, corners = transition_potential.windowed_potentials(
+        sites, transition_potential.gpts
+    )
+    expected = full_grid_potentials(transition_potential, sites)
+
+    for potential, corner, expected_potential in zip(potentials, corners, expected):
+        expected_potential = np.roll(expected_potential, -corner, axis=(-2, -1))
+        assert np.allclose(potential, expected_potential, atol=1e-6)
+
+
+def test_windowed_scatter_matches_full_grid():
+    transition_potential = transition_potential_array()
+    waves = Probe(semiangle_cutoff=20, energy=100e3, extent=(12, 9), gpts=(64, 48))
+    waves = waves.build(np.array([[3.0, 4.0], [11.9, 0.1]]), lazy=False)
+    sites = np.array([[2.5, 3.3], [11.95, 0.02], [6.0, 8.9]], dtype=np.float32)
+
+    scattered = transition_potential.scatter(waves, sites)
+
+    potentials = full_grid_potentials(transition_potential, sites)
+    expected = potentials[:, :, None] * waves.array[None, None]
+    expected = expected.reshape((-1,) + expected.shape[2:])
+
+    assert scattered.shape == expected.shape
+    assert np.allclose(scattered.array, expected, atol=1e-3 * np.abs(expected).max())
+
+
+@pytest.mark.parametrize("max_batch", [1, 2])
+def test_generate_scattered_waves_matches_scatter(max_batch):
+    transition_potential = transition_potential_array()
+    waves = Probe(semiangle_cutoff=20, energy=100e3, extent=(12, 9), gpts=(64, 48))
+    waves = waves.build(np.array([[3.0, 4.0], [11.9, 0.1]]), lazy=False)
+    sites = np.array([[2.5, 3.3], [11.95, 0.02], [6.0, 8.9]], dtype=np.float32)
+
+    expected = transition_potential.scatter(waves, sites)
+
+    batches = list(
+        transition_potential.generate_scattered_waves(waves, sites, max_batch=max_batch)
+    )
+
+    assert len(batches) == -(-len(sites) // max_batch)
+    assert all(
+        len(scattered_waves) == len(batch_sites) * len(transition_potential)
+        for batch_sites, scattered_waves in batches
+    )
+    assert np.allclose(
+        np.concatenate([scattered_waves.array for _, scattered_waves in batches]),
+        expected.array,
+    )
+
+
+def test_filter_sites_matches_full_grid():
+    transition_potential = transition_potential_array()
+    waves = Probe(semiangle_cutoff=20, energy=100e3, extent=(12, 9), gpts=(64, 48))
+    waves = waves.build(np.array([[3.0, 4.0]]), lazy=False)
+    sites = np.array([[3.0, 4.0], [3.5, 4.2], [9.0, 1.0], [11.9, 8.9]])
+
+    rounded = np.round(sites / np.array(waves.sampling)).astype(int)
+    overlaps = np.array(
+        [
+            (
+                np.roll(transition_potential._local_potential, shift, axis=(0, 1))
+                * abs2(waves.array)
+            ).sum()
+            for shift in rounded
+        ]
+    )
+
+    threshold = np.sort(overlaps)[1]
+    filtered = transition_potential.filter_sites(waves, sites, threshold=threshold)
+
+    assert np.allclose(filtered, sites[overlaps > threshold])
+
+
+def synthetic_transitions():
+    r = np.linspace(0, 20, 2000)
+    bound = RadialWavefunction(2, 1, -100.0, r, r**2 * np.exp(-r))
+    excited = [
+        RadialWavefunction(None, l, 1.0, r, np.sin((l + 1) * r) * r / (1 + r))
+        for l in (0, 2)
+    ]
+    return [
+        (AtomicWaveFunction(bound, ml), AtomicWaveFunction(radial, mlprime))
+        for ml in range(-1, 2)
+        for radial in excited
+        for mlprime in range(-radial.l, radial.l + 1)
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_form_factors_cached(workers):
+    pytest.importorskip("sympy")
+    transitions = synthetic_transitions()
+    kwargs = {"extent": 8, "gpts": 32, "energy": 100e3}
+
+    form_factors_cache.clear()
+    with config.set({"inelastic.workers": workers}):
+        array = TransitionPotential(14, transitions, **kwargs).build().array
+
+    assert form_factors_cache.cache_info()["misses"] == len(transitions)
+
+    # the form factors are reused by a new potential with the same transitions
+    cached_array = TransitionPotential(14, transitions, **kwargs).build().array
+    assert form_factors_cache.cache_info()["hits"] == len(transitions)
+    assert np.allclose(cached_array, array)
+
+    # only the form factors of the new grid are calculated
+    TransitionPotential(14, transitions[:3], extent=8, gpts=16, energy=100e3).build()
+    assert form_factors_cache.cache_info()["misses"] == len(transitions) + 3
+
+
+def test_radial_wavefunctions_persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(abtem.inelastic.core_loss, "CONFIG_PATH", str(tmp_path))
+    r = np.linspace(0, 10, 100)
+    calls = []
+
+    def solve():
+        calls.append(None)
+        return RadialWavefunction(None, 1, 2.0, r, np.sin(r))
+
+    key = ("continuum", 6, 1, 0, 1, 2.0, "PBE")
+    with config.set({"inelastic.persist_wavefunctions": True}):
+        radial_wavefunctions_cache.clear()
+        wave_function = cached_radial_wavefunction(key, solve)
+        assert cached_radial_wavefunction(key, solve) is wave_function
+
+        # a new process loads the wave function from disk
+        radial_wavefunctions_cache.clear()
+        loaded = cached_radial_wavefunction(key, solve)
+
+    radial_wavefunctions_cache.clear()
+
+    assert len(calls) == 1
+    assert len(list((tmp_path / "radial_wavefunctions").iterdir())) == 1
+    assert loaded.n is None and loaded.l == 1 and loaded.energy == 2.0
+    assert np.allclose(loaded.radial_values, wave_function.radial_values)
+
+
+def test_continuum_wavefunctions_use_xc(monkeypatch):
+    r = np.linspace(0, 10, 100)
+    calls = []
+
+    def solve(**kwargs):
+        calls.append(kwargs)
+        return RadialWavefunction(None, kwargs["lprime"], 1.0, r, np.sin(r))
+
+    monkeypatch.setattr(
+        abtem.inelastic.core_loss, "calculate_continuum_radial_wavefunction", solve
+    )
+
+    radial_wavefunctions_cache.clear()
+    SubshellTransitions(6, 1, 0, xc="LDA").get_excited_wave_functions()
+    radial_wavefunctions_cache.clear()
+
+    assert len(calls) > 0
+    assert all(kwargs["xc"] == "LDA" for kwargs in calls)
+
+
+def test_overlap_integral_covers_largest_spatial_frequency():
+    (bound, excited), *_ = synthetic_transitions()
+
+    # the spacing of the radial grid, one over the extent, exceeds the largest spatial
+    # frequency
+    k = np.linspace(0.0, 0.9, 5)
+    integral = _overlap_integral(0, bound, excited, k, extent=(1.0, 1.0))
+
+    assert integral.shape == k.shape
+    assert np.all(np.isfinite(integral))
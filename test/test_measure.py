@@ -18,6 +18,7 @@ from abtem.measurements import (
     RealSpaceLineProfiles,
     _scan_shape,
     _scan_sampling,
+    detector_geometry_cache,
 )
 from abtem.waves import Probe
 from utils import ensure_is_tuple, gpu, array_is_close
@@ -328,6 +329,35 @@ def test_diffraction_patterns_polar_binning(data, lazy, device):
     #                           outer=outer)
 
 
+def test_detector_geometry_cache():
+    rng = np.random.default_rng(seed=0)
+    diffraction_patterns = DiffractionPatterns(
+        rng.random((3, 3, 64, 64)),
+        sampling=0.05,
+        ensemble_axes_metadata=[ScanAxis(), ScanAxis()],
+        metadata={"energy": 100e3},
+    )
+    detector_geometry_cache.clear()
+
+    polar = [
+        diffraction_patterns.polar_binning(3, 4, inner=5.0, outer=40.0, rotation=0.2)
+        for _ in range(3)
+    ]
+    annular = [
+        diffraction_patterns.integrate_radial(inner=10.0, outer=50.0) for _ in range(3)
+    ]
+
+    info = detector_geometry_cache.cache_info()
+    assert info["misses"] == 2
+    assert info["hits"] == 4
+    assert info["size"] == 2
+    assert np.allclose(polar[0].array, polar[-1].array)
+    assert np.allclose(annular[0].array, annular[-1].array)
+
+    diffraction_patterns.polar_binning(3, 4, inner=5.0, outer=41.0, rotation=0.2)
+    assert detector_geometry_cache.cache_info()["misses"] == 3
+
+
 @given(data=st.data())
 @pytest.mark.parametrize("lazy", [True, False])
 @pytest.mark.parametrize("device", ["cpu", gpu])
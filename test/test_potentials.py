@@ -4,8 +4,18 @@ import pytest
 from hypothesis import given
 
 import strategies as abtem_st
+from ase.build import bulk
 from abtem import FrozenPhonons
-from abtem.potentials.iam import CrystalPotential, Potential
+from abtem.core import config
+from abtem.integrals import (
+    GaussianProjectionIntegrals,
+    QuadratureProjectionIntegrals,
+    ScatteringFactorProjectionIntegrals,
+    projection_integrals_cache,
+    superpose_deltas,
+)
+import abtem.integrals
+from abtem.potentials.iam import CrystalPotential, Potential, reference_atoms_cache
 from utils import gpu
 
 
@@ -196,3 +206,238 @@ def test_crystal_potential_with_frozen_phonons(data, potential_unit, tile, num_f
 #
 #     potential1 = potential1.build(lazy=False)
 #     potential2 = potential2.build(lazy=False)
+
+
+@pytest.mark.parametrize("slice_thickness", [0.5, 1.5])
+def test_gaussian_projection_integrals_match_infinite(slice_thickness):
+    atoms = bulk("NaCl", "rocksalt", a=5.64, cubic=True)
+    atoms.numbers[0] = 8
+    atoms.rattle(0.1, seed=2)
+
+    potential = Potential(
+        atoms,
+        gpts=64,
+        slice_thickness=slice_thickness,
+        integrator=GaussianProjectionIntegrals(),
+    )
+    infinite_potential = Potential(atoms, gpts=64, projection="infinite")
+
+    projected = potential.build(lazy=False).project().array
+    expected = infinite_potential.build(lazy=False).project().array
+
+    assert np.allclose(projected, expected, rtol=1e-5, atol=1e-3)
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+@pytest.mark.parametrize("round_positions", [True, False])
+@pytest.mark.parametrize("dtype", [np.float32, np.complex64])
+def test_superpose_deltas(round_positions, dtype, threads, monkeypatch):
+    # fewer positions than grid points are split into a chunk for each thread
+    monkeypatch.setattr(abtem.integrals, "_MIN_DELTAS_PER_THREAD", 300)
+    add_deltas = abtem.integrals._add_deltas
+    chunks = []
+
+    def record_chunk(array, positions, weights, round_positions, start, stop):
+        chunks.append((start, stop))
+        add_deltas(array, positions, weights, round_positions, start, stop)
+
+    monkeypatch.setattr(abtem.integrals, "_add_deltas", record_chunk)
+
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-5, 25, size=(1000, 2)).astype(np.float32)
+    weights = rng.random(1000).astype(np.float32)
+    shape = (64, 67)
+
+    if round_positions:
+        rounded = np.round(positions).astype(int)
+        i, j = rounded[:, 0] % shape[0], rounded[:, 1] % shape[1]
+        values = weights
+    else:
+        rounded = np.floor(positions).astype(int)
+        x, y = (positions - rounded).T
+        i = np.concatenate([rounded[:, 0], rounded[:, 0] + 1] * 2) % shape[0]
+        j = np.concatenate([rounded[:, 1]] * 2 + [rounded[:, 1] + 1] * 2) % shape[1]
+        values = np.concatenate(
+            [(1 - x) * (1 - y), x * (1 - y), (1 - x) * y, x * y]
+        ) * np.tile(weights, 4)
+
+    expected = np.zeros(shape, dtype=dtype)
+    np.add.at(expected, (i, j), values)
+
+    with config.set({"integrals.threads": threads}):
+        array = superpose_deltas(
+            positions,
+            np.zeros(shape, dtype=dtype),
+            weights=weights,
+            round_positions=round_positions,
+        )
+
+    assert len(chunks) == threads
+    assert np.allclose(array, expected, atol=1e-5)
+    assert np.isclose(array.sum(), weights.sum())
+
+
+@pytest.mark.parametrize("projection", ["infinite", "finite"])
+@pytest.mark.parametrize("max_batch", [1, 3, "auto"])
+def test_build_batched_slices(projection, max_batch):
+    atoms = bulk("NaCl", "rocksalt", a=5.64, cubic=True) * (1, 1, 2)
+    atoms.numbers[0] = 8
+    atoms.rattle(0.1, seed=3)
+
+    potential = Potential(atoms, gpts=32, slice_thickness=1, projection=projection)
+    sliced_atoms = potential.get_sliced_atoms()
+
+    expected = np.stack(
+        [
+            potential.integrator.integrate_on_grid(
+                sliced_atoms.get_atoms_in_slices(i),
+                a=sliced_atoms.slice_limits[i][0],
+                b=sliced_atoms.slice_limits[i][1],
+                gpts=potential.gpts,
+                sampling=potential.sampling,
+            )
+            for i in range(len(sliced_atoms))
+        ]
+    )
+
+    array = potential.build(lazy=False, max_batch=max_batch).array
+    assert np.allclose(array, expected, rtol=1e-5, atol=1e-3)
+
+    array = np.concatenate(
+        [slic.array for slic in potential.generate_slices(max_batch=4)]
+    )
+    assert np.allclose(array, expected, rtol=1e-5, atol=1e-3)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_build_batches_slices_by_default(monkeypatch, lazy):
+    atoms = bulk("NaCl", "rocksalt", a=5.64, cubic=True) * (1, 1, 2)
+    potential = Potential(atoms, gpts=32, slice_thickness=1, projection="infinite")
+
+    batches = []
+    integrate_slices = type(potential.integrator).integrate_slices
+
+    def recorded_integrate_slices(self, sliced_atoms, first_slice, last_slice, **kw):
+        batches.append(last_slice - first_slice)
+        return integrate_slices(self, sliced_atoms, first_slice, last_slice, **kw)
+
+    monkeypatch.setattr(
+        type(potential.integrator), "integrate_slices", recorded_integrate_slices
+    )
+
+    potential.build(lazy=lazy).compute(scheduler="synchronous")
+
+    assert batches == [len(potential)]
+
+
+@pytest.mark.parametrize(
+    "integrator",
+    [
+        ScatteringFactorProjectionIntegrals,
+        GaussianProjectionIntegrals,
+        QuadratureProjectionIntegrals,
+    ],
+)
+def test_projection_integrals_cache(integrator):
+    atoms = bulk("NaCl", "rocksalt", a=5.64, cubic=True)
+    projection_integrals_cache.clear()
+
+    potentials = [
+        Potential(atoms, gpts=gpts, integrator=integrator()).build(lazy=False)
+        for gpts in (32, 48, 32)
+    ]
+
+    info = projection_integrals_cache.cache_info()
+    assert info["misses"] > 0
+    assert info["hits"] > 0
+    assert np.allclose(potentials[0].array, potentials[2].array)
+
+    # an integrator shared by potentials on different grids
+    shared = integrator()
+    for gpts in (32, 48):
+        array = Potential(atoms, gpts=gpts, integrator=shared).build(lazy=False).array
+        expected = potentials[0 if gpts == 32 else 1].array
+        assert np.allclose(array, expected)
+
+    if hasattr(shared, "scattering_factors"):
+        assert set(shared.scattering_factors) == {"Na", "Cl"}
+        assert shared.scattering_factors["Na"].shape[-2:] == (48, 48)
+    if hasattr(shared, "tables"):
+        assert set(shared.tables) == {"Na", "Cl"}
+
+    projection_integrals_cache.clear()
+    assert projection_integrals_cache.cache_info()["size"] == 0
+
+
+@pytest.mark.parametrize("integration_step", [0.02, 0.005])
+def test_integral_table_matches_fixed_quad(integration_step):
+    from scipy import integrate
+
+    integrator = QuadratureProjectionIntegrals(integration_step=integration_step)
+    sampling = (0.05, 0.05)
+    table = integrator._calculate_integral_table("C", sampling)
+
+    potential = integrator.parametrization.potential("C")
+    cutoff = integrator.cutoff("C")
+    limits = integrator._integral_limits(cutoff)
+    radial_gpts = table.radial_gpts
+
+    def projection(z):
+        return potential(np.sqrt(radial_gpts[:, None] ** 2 + z[None] ** 2))
+
+    expected = np.zeros((len(limits) - 1, len(radial_gpts)))
+    expected[0] = integrate.fixed_quad(projection, -limits[0] * 2, limits[0], n=8)[0]
+    for j, (a, b) in enumerate(zip(limits[1:-1], limits[2:])):
+        expected[j + 1] = expected[j] + integrate.fixed_quad(projection, a, b, n=8)[0]
+    expected *= integrator._taper_values(radial_gpts, cutoff, integrator._taper)[None]
+
+    assert np.allclose(table.values, expected, rtol=1e-12, atol=1e-12 * expected.max())
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_integral_tables_persisted(tmp_path, monkeypatch, threads):
+    monkeypatch.setattr(abtem.integrals, "CONFIG_PATH", str(tmp_path))
+    symbols = ("C", "O", "Au")
+    sampling = (0.05, 0.05)
+    projection_integrals_cache.clear()
+
+    with config.set({"integrals.persist_tables": True, "integrals.threads": threads}):
+        tables = QuadratureProjectionIntegrals().get_integral_tables(symbols, sampling)
+        directory = tmp_path / "integral_tables" / abtem.__version__
+        assert len(list(directory.glob("*.npz"))) == 3
+
+        projection_integrals_cache.clear()
+        loaded = QuadratureProjectionIntegrals().get_integral_tables(symbols, sampling)
+
+    for symbol in symbols:
+        assert np.array_equal(tables[symbol].values, loaded[symbol].values)
+        assert np.array_equal(tables[symbol].limits, loaded[symbol].limits)
+
+    # tables stored by another version are not loaded
+    monkeypatch.setattr(abtem.integrals, "__version__", "0.0.0")
+    projection_integrals_cache.clear()
+
+    with config.set({"integrals.persist_tables": True, "integrals.threads": threads}):
+        QuadratureProjectionIntegrals().get_integral_tables(symbols, sampling)
+
+    assert len(list((tmp_path / "integral_tables" / "0.0.0").glob("*.npz"))) == 3
+
+    projection_integrals_cache.clear()
+
+
+@pytest.mark.parametrize("projection", ["infinite", "finite"])
+def test_displaced_reference_atoms_match_atoms_ensemble(projection):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (1, 1, 2)
+    frozen_phonons = FrozenPhonons(atoms, num_configs=3, sigmas=0.2, seed=1)
+    kwargs = {"gpts": 32, "slice_thickness": 1.0, "projection": projection}
+
+    reference_atoms_cache.clear()
+    potential = Potential(frozen_phonons, **kwargs)
+    array = potential.build(lazy=False).array
+
+    # the configurations share the transformed and sliced reference atoms
+    assert reference_atoms_cache.cache_info()["misses"] == 1
+    assert reference_atoms_cache.cache_info()["hits"] == 2
+
+    expected = Potential(frozen_phonons.to_atoms_ensemble(), **kwargs)
+    assert np.allclose(array, expected.build(lazy=False).array, rtol=1e-5, atol=1e-3)
@@ -4,9 +4,25 @@ import pytest
 from hypothesis import given, assume, reproduce_failure
 
 import strategies as abtem_st
-from abtem import GridScan, WavesDetector
+from ase import Atoms
+from ase.build import bulk
+from abtem import (
+    CTF,
+    AnnularDetector,
+    CustomScan,
+    GridScan,
+    PixelatedDetector,
+    Potential,
+    Probe,
+    SMatrix,
+    SMatrixArray,
+    WavesDetector,
+)
+from abtem import distributions
 from abtem.core.backend import cp
-from utils import gpu, assert_array_matches_device
+from abtem.prism import s_matrix as s_matrix_module
+from abtem.prism._partitioned_s_matrix import remove_tilt
+from utils import gpu, assert_array_matches_device, gaussian_transition_potential
 
 
 @given(data=st.data())
@@ -202,6 +218,257 @@ def test_prism_scan(
     # assert measurement.dtype == detector._out_dtype(probe)
 
 
+@pytest.mark.parametrize(
+    "reduction_scheme", ["no-chunks", "single-rechunk", "multiple-rechunk", "auto"]
+)
+@pytest.mark.parametrize("interpolation", [4, (4, 3)])
+def test_reduction_schemes_match_eager(reduction_scheme, interpolation):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (4, 3, 1)
+    potential = Potential(atoms, gpts=(192, 144), slice_thickness=2)
+    s_matrix = SMatrix(
+        potential=potential,
+        energy=100e3,
+        semiangle_cutoff=20,
+        interpolation=interpolation,
+    )
+    scan = GridScan((0, 0), potential.extent, gpts=(12, 9))
+    detectors = [AnnularDetector(30, 80), PixelatedDetector(max_angle=40)]
+
+    expected = s_matrix.build(lazy=False).reduce(scan=scan, detectors=detectors)
+    measurements = s_matrix.build(lazy=True, max_batch=8).reduce(
+        scan=scan, detectors=detectors, reduction_scheme=reduction_scheme
+    )
+
+    for measurement, expected_measurement in zip(measurements, expected):
+        assert np.allclose(
+            measurement.compute().array, expected_measurement.array, atol=1e-6
+        )
+
+
+@pytest.mark.parametrize("interpolation", [1, (3, 2)])
+@pytest.mark.parametrize(
+    "ctf", [None, CTF(defocus=distributions.uniform(-20, 20, 3), Cs=1e4)]
+)
+@pytest.mark.parametrize("gpts", [(7, 5), (3, 8)])
+def test_grid_scan_reduction_matches_custom_scan(interpolation, ctf, gpts):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 2, 1)
+    potential = Potential(atoms, gpts=(96, 64), slice_thickness=2)
+    s_matrix_array = SMatrix(
+        potential=potential,
+        energy=100e3,
+        semiangle_cutoff=20,
+        interpolation=interpolation,
+    ).build(lazy=False)
+
+    # the plane waves are grouped along x or y depending on the shape of the scan
+    grid_scan = GridScan((0, 0), potential.extent, gpts=gpts)
+    custom_scan = CustomScan(grid_scan.get_positions().reshape((-1, 2)))
+    kwargs = {"detectors": WavesDetector(), "max_batch_reduction": 8}
+    if ctf is not None:
+        kwargs["ctf"] = ctf
+
+    waves = s_matrix_array.reduce(scan=grid_scan, **kwargs)
+    expected = s_matrix_array.reduce(scan=custom_scan, **kwargs)
+
+    assert np.allclose(waves.array, expected.array.reshape(waves.shape), atol=1e-6)
+
+
+@pytest.mark.parametrize("aberrations", [{"defocus": 30}, {"defocus": 100, "Cs": -1e5}])
+def test_aberrations_preserve_probe_intensity(aberrations):
+    s_matrix = SMatrix(semiangle_cutoff=20, energy=100e3, extent=10, gpts=64)
+    scan = CustomScan([(5.0, 5.0)])
+
+    # the aberrations are phases, which do not change the normalized intensity unless
+    # the coefficients are normalized by the complex sum of their squares
+    expected = s_matrix.reduce(scan=scan, ctf=CTF(semiangle_cutoff=20), lazy=False)
+    aberrated = s_matrix.reduce(
+        scan=scan, ctf=CTF(semiangle_cutoff=20, **aberrations), lazy=False
+    )
+
+    assert np.isclose(
+        (np.abs(aberrated.array) ** 2).sum(), (np.abs(expected.array) ** 2).sum()
+    )
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("partitions", [None, 4])
+@pytest.mark.parametrize("scan", [GridScan(gpts=(4, 3)), CustomScan([[1, 2], [3, 1]])])
+def test_ctf_ensemble_matches_single_ctfs(lazy, partitions, scan):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 2, 1)
+    potential = Potential(atoms, gpts=(96, 64), slice_thickness=2)
+    s_matrix_array = SMatrix(
+        potential=potential,
+        energy=100e3,
+        semiangle_cutoff=20,
+        interpolation=2,
+        partitions=partitions,
+    ).build(lazy=lazy)
+
+    ctf = CTF(defocus=distributions.uniform(-20, 30, 3), Cs=1e4)
+    detector = PixelatedDetector(max_angle=30)
+
+    measurement = s_matrix_array.reduce(
+        scan=scan, ctf=ctf, detectors=detector, max_batch_reduction=5
+    ).compute()
+
+    for i, defocus in enumerate(ctf.defocus.values):
+        expected = s_matrix_array.reduce(
+            scan=scan, ctf=CTF(defocus=defocus, Cs=1e4), detectors=detector
+        ).compute()
+        assert np.allclose(measurement.array[i], expected.array, atol=1e-6)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_s_matrix_array_to_memmap(tmp_path, lazy):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 2, 1)
+    potential = Potential(atoms, gpts=(96, 64), slice_thickness=2)
+    s_matrix = SMatrix(
+        potential=potential, energy=100e3, semiangle_cutoff=20, interpolation=2
+    )
+    s_matrix_array = s_matrix.build(lazy=lazy)
+
+    filename = str(tmp_path / "s_matrix")
+    memory_mapped = s_matrix_array.to_memmap(filename)
+
+    assert memory_mapped.is_memory_mapped
+    assert not s_matrix_array.is_memory_mapped
+
+    with pytest.raises(FileExistsError):
+        s_matrix_array.to_memmap(filename)
+
+    memory_mapped = SMatrixArray.from_memmap(filename + ".npy")
+    assert memory_mapped.is_memory_mapped
+    assert np.allclose(memory_mapped.wave_vectors, s_matrix_array.wave_vectors)
+
+    scan = GridScan((0, 0), (4, 4), gpts=(5, 5))
+    detectors = [AnnularDetector(30, 60), WavesDetector()]
+    measurements = memory_mapped.reduce(scan=scan, detectors=detectors)
+    expected = s_matrix_array.reduce(scan=scan, detectors=detectors).compute()
+
+    for measurement, expected_measurement in zip(measurements, expected):
+        assert np.allclose(measurement.array, expected_measurement.array, atol=1e-6)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_partitioned_s_matrix_converges(lazy):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 3, 2)
+    potential = Potential(atoms, gpts=(128, 128), slice_thickness=2)
+    kwargs = {"energy": 100e3, "semiangle_cutoff": 25, "interpolation": 2}
+
+    s_matrix = SMatrix(potential=potential, **kwargs)
+    sampling = s_matrix.build(lazy=False).sampling
+
+    # the partitioned probes are placed at the nearest grid point
+    scan = GridScan(
+        (0, 0), (40 * sampling[0], 56 * sampling[1]), gpts=(8, 8), endpoint=False
+    )
+    expected = s_matrix.reduce(scan=scan, detectors=WavesDetector(), lazy=False)
+
+    errors = []
+    for partitions in (3, 8):
+        partitioned_s_matrix = SMatrix(
+            potential=potential, partitions=partitions, **kwargs
+        )
+        waves = partitioned_s_matrix.reduce(
+            scan=scan, detectors=WavesDetector(), lazy=lazy
+        ).compute()
+        errors.append(
+            np.abs(waves.array - expected.array).max() / np.abs(expected.array).max()
+        )
+
+    assert errors[1] < errors[0] < 0.05
+
+
+def test_partitioned_s_matrix_vacuum_is_exact():
+    atoms = Atoms(cell=(bulk("Si", "diamond", a=5.43, cubic=True) * (3, 3, 2)).cell)
+    potential = Potential(atoms, gpts=(128, 128), slice_thickness=2)
+    kwargs = {"energy": 100e3, "semiangle_cutoff": 25, "interpolation": 2}
+
+    # the probe positions are on the grid of the downsampled waves
+    scan = GridScan((0, 0), potential.extent, gpts=(2, 2), endpoint=False)
+
+    expected = SMatrix(potential=potential, **kwargs).reduce(
+        scan=scan, detectors=WavesDetector(), lazy=False
+    )
+    waves = SMatrix(potential=potential, partitions=3, **kwargs).reduce(
+        scan=scan, detectors=WavesDetector(), lazy=False
+    )
+    assert np.allclose(waves.array, expected.array, atol=1e-6)
+
+
+def test_partitioned_s_matrix_to_memmap_removes_tilt_per_batch(tmp_path, monkeypatch):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 2, 1)
+    potential = Potential(atoms, gpts=(96, 64), slice_thickness=2)
+    s_matrix_array = SMatrix(
+        potential=potential,
+        energy=100e3,
+        semiangle_cutoff=20,
+        interpolation=2,
+        partitions=4,
+    ).build(lazy=False)
+
+    memory_mapped = s_matrix_array.to_memmap(str(tmp_path / "s_matrix"))
+
+    # the scan wraps around the edges of the scattering matrix
+    scan = CustomScan([[0.1, 0.2], [15.9, 10.6], [5, 3]])
+    expected = s_matrix_array.reduce(scan=scan, detectors=WavesDetector()).compute()
+
+    shapes = []
+
+    def recording_remove_tilt(array, *args, **kwargs):
+        shapes.append(array.shape)
+        return remove_tilt(array, *args, **kwargs)
+
+    monkeypatch.setattr(s_matrix_module, "remove_tilt", recording_remove_tilt)
+
+    measurement = memory_mapped.reduce(
+        scan=scan, detectors=WavesDetector(), max_batch_reduction=1
+    )
+
+    assert np.allclose(measurement.array, expected.array, atol=1e-6)
+    assert len(shapes) == 3
+    assert all(
+        np.prod(shape[-2:]) < np.prod(s_matrix_array.shape[-2:]) for shape in shapes
+    )
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("slice_cache", [True, False])
+@pytest.mark.parametrize("widths", [(0.5, 0.8), (0.02, 0.02)])
+def test_transition_potential_scan_matches_probe(lazy, slice_cache, widths):
+    atoms = Atoms(
+        "C2Si",
+        positions=[(3, 3, 1), (5.2, 4.1, 3), (4, 6, 2)],
+        cell=(12, 12, 5),
+    )
+    potential = Potential(atoms, gpts=(64, 64), slice_thickness=1)
+
+    # the support of the broad transition potentials covers the full grid
+    transition_potential = gaussian_transition_potential(
+        potential.gpts, potential.extent, widths
+    )
+
+    scan = GridScan((0, 0), potential.extent, gpts=(6, 6))
+    detector = AnnularDetector(0, 30)
+
+    expected = Probe(semiangle_cutoff=20, energy=100e3).transition_potential_scan(
+        potential, transition_potential, scan=scan, detectors=detector, lazy=False
+    )
+
+    s_matrix = SMatrix(semiangle_cutoff=20, energy=100e3, potential=potential)
+    measurement = s_matrix.transition_potential_scan(
+        transition_potential,
+        scan=scan,
+        detectors=detector,
+        slice_cache=slice_cache,
+        lazy=lazy,
+    ).compute()
+
+    assert np.allclose(
+        measurement.array, expected.array, atol=1e-2 * expected.array.max()
+    )
+
+
 @given(data=st.data())
 @pytest.mark.parametrize("lazy", [False, True])
 @pytest.mark.skipif(cp is None, reason="no gpu")
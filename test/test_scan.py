@@ -3,7 +3,7 @@ from hypothesis import given
 from hypothesis import strategies as st
 
 import strategies as abtem_st
-from abtem.scan import LineScan
+from abtem.scan import CustomScan, LineScan, _WindowedScan
 
 
 @given(position=st.tuples(abtem_st.sensible_floats(min_value=-100, max_value=100),
@@ -29,3 +29,25 @@ def test_linescan_at_position(position, extent, angle):
 #         blocks[i] = blocks[i].values
 #
 #     assert np.allclose(concatenate_blocks(blocks), s.get_positions())
+
+
+def test_windowed_scan_sorted_into_extents():
+    positions = np.array([[7.5, 1.0], [1.0, 2.0], [6.0, 7.0], [2.5, 6.5]])
+    scan = _WindowedScan(CustomScan(positions), window_gpts=(16, 16), sampling=0.5)
+    extents = (((0.0, 5.0), (5.0, 10.0)), ((0.0, 5.0), (5.0, 10.0)))
+
+    sorted_scan, chunks = scan._sort_into_extents(extents)
+    expected_scan, expected_chunks = scan.scan._sort_into_extents(extents)
+
+    assert isinstance(sorted_scan, _WindowedScan)
+    assert chunks == expected_chunks == ((1, 1, 1, 1),)
+    assert np.allclose(sorted_scan.scan.get_positions(), expected_scan.get_positions())
+
+    # the blocks of the sorted scan are windowed scans of the sorted positions
+    for _, slics, block in sorted_scan.generate_blocks(chunks):
+        block = block.item()
+        assert isinstance(block, _WindowedScan)
+        block_positions = expected_scan.get_positions()[slics[0]]
+        assert np.allclose(block.scan.get_positions(), block_positions)
+        corners = np.rint(block_positions / 0.5 - 8)
+        assert np.allclose(block.get_positions(), block_positions - corners * 0.5)
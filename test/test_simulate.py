@@ -1,11 +1,17 @@
 import hypothesis.strategies as st
+import numpy as np
 import pytest
+from ase.build import bulk
 from hypothesis import given, reproduce_failure
 
 import strategies as abtem_st
-from abtem import PixelatedDetector, AnnularDetector
+from abtem import FrozenPhonons, PixelatedDetector, AnnularDetector, Potential, Probe
+from abtem.antialias import AntialiasAperture
+from abtem.core import config
+from abtem.multislice import SliceCache, multislice_and_detect, _shared_slice_caches
+from abtem.prism.utils import batch_crop_2d, minimum_crop, wrapped_crop_2d
 from abtem.scan import CustomScan, LineScan, GridScan
-from utils import gpu
+from utils import gaussian_transition_potential, gpu
 
 
 # @reproduce_failure('6.56.3', b'AXicY2BAAoxwhkUDA2HASppyFBtwMYEAAJNaAXw=')
@@ -222,3 +228,351 @@ def test_probe_scan(data, waves_builder, detector, scan, device, frozen_phonons,
 # #     measurements.compute()
 # #
 # #     assert_scanned_measurement_as_expected(measurements, atoms, probe, detectors, scan=scan)
+
+
+@pytest.mark.parametrize("max_bytes", ["1 GB", 0])
+@pytest.mark.parametrize("spill_to_disk", [True, False])
+def test_slice_cache_matches_transmission_functions(max_bytes, spill_to_disk):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    potential = Potential(atoms, gpts=32, slice_thickness=1.0)
+    antialias_aperture = AntialiasAperture()
+
+    cache = SliceCache(
+        potential,
+        energy=100e3,
+        antialias_aperture=antialias_aperture,
+        max_bytes=max_bytes,
+        spill_to_disk=spill_to_disk,
+    )
+
+    for _ in range(2):
+        cached = list(cache.generate_slices(first_slice=2))
+
+        for cached_slice, potential_slice in zip(
+            cached, potential.generate_slices(first_slice=2)
+        ):
+            expected = antialias_aperture.bandlimit(
+                potential_slice.transmission_function(100e3), in_place=False
+            )
+            assert np.allclose(cached_slice.array, expected.array)
+            assert cached_slice.slice_thickness == expected.slice_thickness
+
+    info = cache.cache_info()
+    num_slices = potential.num_slices - 2
+    if max_bytes or spill_to_disk:
+        assert info["hits"] == num_slices
+        assert info["misses"] == num_slices
+    else:
+        assert info["misses"] == 2 * num_slices
+
+    cache.clear()
+    assert cache.cache_info()["in_memory"] == 0
+
+
+def test_slice_cache_reused_between_chunks():
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    frozen_phonons = FrozenPhonons(atoms, num_configs=2, sigmas=0.1, seed=1)
+    potential = Potential(frozen_phonons, gpts=32, slice_thickness=1.0, exit_planes=2)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+    scan = GridScan((0, 0), (1, 1), gpts=(2, 2))
+
+    _shared_slice_caches.clear()
+
+    expected = probe.scan(potential, scan, AnnularDetector(20, 80), max_batch=1)
+    cached = probe.scan(
+        potential, scan, AnnularDetector(20, 80), max_batch=1, slice_cache=True
+    )
+
+    assert np.allclose(
+        cached.compute(scheduler="threads").array,
+        expected.compute(scheduler="threads").array,
+    )
+    assert _shared_slice_caches.cache_info()["misses"] == 2
+    assert _shared_slice_caches.cache_info()["hits"] == 6
+
+    for _, cache in _shared_slice_caches.items():
+        assert cache.cache_info()["misses"] == potential.num_slices
+        assert cache.cache_info()["hits"] == 3 * potential.num_slices
+
+
+def test_slice_cache_budget_per_call():
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    potential = Potential(atoms, gpts=32, slice_thickness=1.0)
+    max_bytes = _shared_slice_caches.max_bytes
+
+    _shared_slice_caches.clear()
+
+    # the budget of a call bounds the cache it creates, while the budget of the
+    # process-wide registry is unchanged
+    cache = SliceCache.shared(potential, 100e3, max_bytes=1)
+    list(cache.generate_slices())
+    assert cache.cache_info()["in_memory"] == 0
+    assert _shared_slice_caches.max_bytes == max_bytes
+
+    other = Potential(atoms, gpts=32, slice_thickness=2.0)
+    list(SliceCache.shared(other, 100e3).generate_slices())
+    cache = SliceCache.shared(other.copy(), 100e3)
+    assert cache.cache_info()["in_memory"] == other.num_slices
+    assert _shared_slice_caches.cache_info()["nbytes"] == cache.nbytes
+
+
+@pytest.mark.parametrize("max_bytes", [True, 1])
+def test_double_channel_slices_calculated_once(monkeypatch, max_bytes):
+    from abtem.multislice import transition_potential_multislice_and_detect
+
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    atoms.numbers[:] = 6
+    potential = Potential(atoms, gpts=32, slice_thickness=1.0)
+    transition_potential = gaussian_transition_potential(
+        potential.gpts, potential.extent
+    )
+    waves = Probe(energy=100e3, semiangle_cutoff=20)
+    waves.grid.match(potential)
+    waves = waves.build((2.0, 2.0), lazy=False)
+    detector = PixelatedDetector(max_angle=None)
+
+    expected = transition_potential_multislice_and_detect(
+        waves, potential, transition_potential, [detector], threshold=0.0
+    )
+
+    generated = []
+    generate_slices = Potential.generate_slices
+
+    def counted_generate_slices(self, first_slice=0, last_slice=None, **kwargs):
+        for potential_slice in generate_slices(self, first_slice, last_slice, **kwargs):
+            generated.append(potential_slice)
+            yield potential_slice
+
+    monkeypatch.setattr(Potential, "generate_slices", counted_generate_slices)
+
+    cached = transition_potential_multislice_and_detect(
+        waves,
+        potential,
+        transition_potential,
+        [detector],
+        threshold=0.0,
+        slice_cache=max_bytes,
+    )
+
+    # with a budget for all slices each potential slice is generated once, the outer
+    # loop takes the slices reached by the inner branches from the cache
+    if max_bytes is True:
+        assert len(generated) == potential.num_slices
+
+    assert np.allclose(cached[0].array, expected[0].array)
+
+
+def test_shared_slice_cache_keyed_by_antialias_aperture():
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    potential = Potential(atoms, gpts=32, slice_thickness=1.0)
+
+    _shared_slice_caches.clear()
+
+    cache = SliceCache.shared(potential, 100e3)
+    default = list(cache.generate_slices())
+
+    with config.set({"antialias.taper": 0.1}):
+        tapered_cache = SliceCache.shared(potential, 100e3)
+        tapered = list(tapered_cache.generate_slices())
+
+    assert tapered_cache is not cache
+    assert SliceCache.shared(potential, 100e3) is cache
+    assert not np.allclose(tapered[0].array, default[0].array)
+
+
+@pytest.mark.parametrize("transpose", [False, True])
+@pytest.mark.parametrize("conjugate", [False, True])
+def test_fused_multislice_matches_conventional(conjugate, transpose):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    potential = Potential(atoms, gpts=64, slice_thickness=1.0, exit_planes=2)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+    scan = CustomScan([(0, 0), (1, 1), (2, 2)])
+    probe.grid.match(potential)
+    waves = probe.build(scan, lazy=False)
+
+    kwargs = {"conjugate": conjugate, "transpose": transpose}
+    expected = multislice_and_detect(waves, potential, method="conventional", **kwargs)
+    fused = multislice_and_detect(waves, potential, method="fused", **kwargs)
+
+    assert np.allclose(fused[0].array, expected[0].array, atol=1e-5)
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_windowed_multislice_matches_full(lazy):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 3, 1)
+    frozen_phonons = FrozenPhonons(atoms, num_configs=2, sigmas=0.05, seed=1)
+    potential = Potential(frozen_phonons, gpts=192, slice_thickness=1.0, exit_planes=2)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+    scan = GridScan((4, 4), (6, 6), gpts=(2, 3))
+    detectors = [AnnularDetector(0, 100), PixelatedDetector(max_angle=50)]
+
+    full = probe.scan(potential, scan, detectors, lazy=lazy, max_batch=2)
+    windowed = probe.scan(
+        potential, scan, detectors, lazy=lazy, max_batch=2, window_gpts=128
+    )
+
+    if lazy:
+        full = [measurement.compute() for measurement in full]
+        windowed = [measurement.compute() for measurement in windowed]
+
+    assert windowed[0].shape == full[0].shape
+    assert np.allclose(windowed[0].array, full[0].array, rtol=1e-2)
+    assert windowed[1].shape[-2:] != full[1].shape[-2:]
+    assert np.allclose(
+        windowed[1].array.sum((-2, -1)), full[1].array.sum((-2, -1)), rtol=1e-2
+    )
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+@pytest.mark.parametrize("scan", [(5.0, 5.0), CustomScan((5.0, 5.0))])
+def test_windowed_single_position_is_squeezed(lazy, scan):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 3, 1)
+    potential = Potential(atoms, gpts=192, slice_thickness=2.0)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+    detector = PixelatedDetector(max_angle=50)
+
+    full = probe.multislice(potential, scan, detector, lazy=lazy)
+    windowed = probe.multislice(potential, scan, detector, lazy=lazy, window_gpts=128)
+
+    assert len(windowed.shape) == len(full.shape) == 2
+    assert np.allclose(
+        windowed.compute().array.sum(), full.compute().array.sum(), rtol=1e-2
+    )
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_windowed_probes_are_built_on_the_windows(lazy):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (3, 3, 1)
+    potential = Potential(atoms, gpts=192, slice_thickness=1.0)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+
+    # the windows of the scan positions wrap around the potential
+    scan = CustomScan([[0.3, 0.2], [15.0, 9.1]])
+
+    windowed = probe._validate_and_build(
+        scan, potential=potential, lazy=lazy, window_gpts=128
+    ).compute()
+    full = probe._validate_and_build(scan, potential=potential, lazy=False)
+
+    assert windowed.gpts == (128, 128)
+    assert windowed.sampling == full.sampling
+
+    crop_corner, size, corners = minimum_crop(
+        scan.positions / np.array(full.sampling), windowed.gpts
+    )
+    expected = batch_crop_2d(
+        wrapped_crop_2d(full.array, crop_corner, size), corners, windowed.gpts
+    ) * np.sqrt(np.prod(full.gpts) / np.prod(windowed.gpts))
+
+    assert np.abs(windowed.array - expected).max() < 0.05 * np.abs(expected).max()
+
+    # the offsets of the blocks of the scan axes are only shifted for the windows
+    scan_axis = GridScan((4, 4), (6, 6), gpts=(4, 3)).ensemble_axes_metadata[0]
+    blocks = scan_axis._to_blocks(((2, 2),)).compute()
+    assert [block.offset for block in blocks] == [4, 4]
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_streamed_frozen_phonons_match_ensemble_mean(lazy):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    frozen_phonons = FrozenPhonons(atoms, num_configs=3, sigmas=0.1, seed=1)
+    potential = Potential(frozen_phonons, gpts=48, slice_thickness=1.0, exit_planes=2)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+    scan = GridScan((0, 0), (1, 1), gpts=(2, 2))
+    detectors = [AnnularDetector(20, 80), PixelatedDetector(max_angle=50)]
+
+    expected = probe.scan(potential, scan, detectors, lazy=lazy, max_batch=2)
+    streamed = probe.scan(
+        potential, scan, detectors, lazy=lazy, max_batch=2, return_variance=True
+    )
+
+    if lazy:
+        expected = expected.compute()
+        streamed = streamed.compute()
+
+    probe.grid.match(potential)
+    waves = probe.build(scan, lazy=False)
+    configurations = multislice_and_detect(waves, potential, detectors)
+
+    assert len(streamed) == 2 * len(detectors)
+    for mean, variance, measurement, configuration in zip(
+        streamed[:2], streamed[2:], expected, configurations
+    ):
+        assert mean.axes_metadata == measurement.axes_metadata
+        assert np.allclose(mean.array, measurement.array, rtol=1e-5, atol=1e-7)
+
+        # the variance of the mean, i.e. the sample variance over the number of
+        # configurations
+        expected_variance = np.var(configuration.array, axis=0, ddof=1) / 3
+        assert variance.shape == mean.shape
+        atol = 1e-6 * variance.array.max()
+        assert np.allclose(variance.array, expected_variance, rtol=1e-3, atol=atol)
+
+
+def test_configurations_start_from_incoming_waves():
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    frozen_phonons = FrozenPhonons(atoms, num_configs=2, sigmas=0.0)
+    potential = Potential(frozen_phonons, gpts=48, slice_thickness=1.0)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+    probe.grid.match(potential)
+    waves = probe.build(GridScan((0, 0), (1, 1), gpts=(2, 1)), lazy=False)
+
+    # identical configurations in a single task give identical measurements
+    measurements = multislice_and_detect(waves, potential, [AnnularDetector(20, 80)])
+
+    assert np.allclose(measurements[0].array[0], measurements[0].array[1])
+
+
+def test_streamed_frozen_phonons_stop_at_precision():
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    frozen_phonons = FrozenPhonons(atoms, num_configs=4, sigmas=0.1, seed=1)
+    potential = Potential(frozen_phonons, gpts=48, slice_thickness=1.0)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+    probe.grid.match(potential)
+    waves = probe.build(GridScan((0, 0), (1, 1), gpts=(2, 1)), lazy=False)
+    detectors = [AnnularDetector(20, 80)]
+
+    configurations = multislice_and_detect(waves, potential, detectors)[0]
+    converged = multislice_and_detect(waves, potential, detectors, precision=1.0)[0]
+    streamed = multislice_and_detect(
+        waves, potential, detectors, stream_ensemble=True, precision=1e-12
+    )[0]
+
+    assert configurations.shape == (4, 2, 1)
+    assert converged.shape == (2, 1)
+    assert np.allclose(converged.array, configurations.array[:2].mean(0))
+    assert np.allclose(streamed.array, configurations.array.mean(0))
+
+
+def test_streamed_frozen_phonons_stop_per_chunk():
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True)
+    frozen_phonons = FrozenPhonons(atoms, num_configs=6, sigmas=0.1, seed=1)
+    potential = Potential(frozen_phonons, gpts=48, slice_thickness=1.0)
+    probe = Probe(energy=100e3, semiangle_cutoff=20)
+    probe.grid.match(potential)
+    scan = GridScan((0, 0), (2, 2), gpts=(2, 1))
+    detectors = [AnnularDetector(20, 80)]
+
+    waves = probe.build(scan, lazy=False)
+    configurations = multislice_and_detect(waves, potential, detectors)[0].array
+    precision = 0.005
+
+    # each chunk of probe positions stops independently, with the same result as
+    # streaming the ensemble for that chunk alone
+    streamed = probe.scan(
+        potential, scan, detectors, max_batch=1, precision=precision
+    ).compute()
+
+    num_configurations = []
+    for i in range(2):
+        chunk = multislice_and_detect(
+            waves[i : i + 1], potential, detectors, precision=precision
+        )[0]
+        assert np.allclose(streamed.array[i], chunk.array[0])
+
+        # the mean over the configurations calculated before the chunk stopped
+        means = np.cumsum(configurations[:, i, 0]) / np.arange(1, 7)
+        matches = np.flatnonzero(np.isclose(means, chunk.array[0]))
+        num_configurations.append(matches[0])
+
+    assert num_configurations[0] != num_configurations[1]
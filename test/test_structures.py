@@ -3,7 +3,14 @@ import pytest
 from ase.build import bulk
 from ase import build
 
-from abtem.atoms import orthogonalize_cell, shrink_cell, merge_close_atoms, cut_cell
+from abtem.atoms import (
+    atoms_in_cell,
+    cut_cell,
+    merge_close_atoms,
+    orthogonalize_cell,
+    pad_atoms,
+    shrink_cell,
+)
 
 
 def fcc(orthogonal=False):
@@ -101,3 +108,24 @@ def test_cut(structure):
     cut_atoms = cut_cell(atoms, cell=np.diag(orthogonalized_atoms.cell) - 1e-12)
 
     assert_atoms_close(orthogonalized_atoms, cut_atoms)
+
+
+@pytest.mark.parametrize("margins, directions", [(2.0, "xyz"), (7.0, "xyz"), (0.0, "z")])
+def test_pad_atoms_matches_repeated_atoms(margins, directions):
+    atoms = bulk("Si", "diamond", a=5.43, cubic=True) * (2, 1, 1)
+    atoms.rattle(0.3, seed=1)
+    atoms.wrap()
+
+    reps = [
+        int(1 + 2 * np.ceil(margins / atoms.cell[i, i])) if axis in directions else 1
+        for i, axis in enumerate("xyz")
+    ]
+    expected = atoms * reps
+    expected.positions[:] -= atoms.cell.sum(axis=0) * [rep // 2 for rep in reps]
+    expected.cell = atoms.cell
+    expected = atoms_in_cell(expected, margins)
+
+    padded = pad_atoms(atoms, margins=margins, directions=directions)
+
+    assert np.array_equal(padded.numbers, expected.numbers)
+    assert np.allclose(padded.positions, expected.positions)
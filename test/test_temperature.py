@@ -51,4 +51,18 @@ def test_sigmas():
 
     ensemble = frozen_phonons.to_atoms_ensemble()
 
-    assert np.abs(np.linalg.norm(ensemble.standard_deviations(), axis=1).mean() - .1) < .001
\ No newline at end of file
+    assert np.abs(np.linalg.norm(ensemble.standard_deviations(), axis=1).mean() - .1) < .001
+
+
+def test_displacements_match_randomize():
+    atoms = ase.build.bulk("Si", "diamond", a=5.43, cubic=True) * (2, 2, 2)
+    frozen_phonons = FrozenPhonons(
+        atoms, num_configs=3, sigmas={"Si": 0.1}, directions="xy", seed=3
+    )
+
+    displacements = frozen_phonons.displacements()
+
+    assert displacements.shape == (3, len(atoms), 3)
+    assert np.all(displacements[..., 2] == 0.0)
+    for configuration, displacement in zip(frozen_phonons, displacements):
+        assert np.array_equal(configuration.positions, atoms.positions + displacement)
@@ -5,7 +5,10 @@ import numpy as np
 import pytest
 from hypothesis import assume
 
+from abtem.core.axes import OrdinalAxis
 from abtem.core.backend import get_array_module, cp
+from abtem.core.grid import spatial_frequencies
+from abtem.inelastic.core_loss import TransitionPotentialArray
 from abtem.potentials.iam import Potential
 from abtem.inelastic.phonons import BaseFrozenPhonons
 from abtem.waves import Waves
@@ -22,6 +25,26 @@ def assert_array_matches_laziness(array, lazy):
         assert not isinstance(array, da.core.Array)
 
 
+def gaussian_transition_potential(gpts, extent, widths=(0.5, 0.8)):
+    # two synthetic transitions with Gaussian form factors of the given widths
+    sampling = (extent[0] / gpts[0], extent[1] / gpts[1])
+    kx, ky = spatial_frequencies(gpts, sampling)
+    k2 = kx[:, None] ** 2 + ky[None] ** 2
+    array = np.stack(
+        [
+            np.exp(-k2 / widths[0]),
+            (kx[:, None] + 1.0j * ky[None]) * np.exp(-k2 / widths[1]),
+        ]
+    )
+    return TransitionPotentialArray(
+        6,
+        array.astype(np.complex64),
+        energy=100e3,
+        extent=extent,
+        ensemble_axes_metadata=[OrdinalAxis(values=(0, 1))],
+    )
+
+
 def remove_dummy_dimensions(shape):
     return tuple(s for s in shape if s > 1)
 